@@ -38,7 +38,10 @@ def _launch_spinner(game: RPGGame):
     spinner.set_position(location.position) # type: ignore warning
 
     game.room.add_enemy(spinner)
-    spinner.move_to(_random_target(), game.map)
+
+    field = game.map.flow_field(_random_target())
+    if field:
+        spinner.follow_flow_field(field)
 
 class _enemies:
 
@@ -2,6 +2,7 @@ from pyke_pyxel import coord
 from pyke_pyxel.cell_auto.game import CellAutoGame
 from pyke_pyxel.game import Game
 from pyke_pyxel.sprite import Animation, Sprite, CompoundSprite
+from pyke_pyxel.render import LAYER
 
 from ui import UI
 
@@ -10,7 +11,7 @@ def load_level(game: CellAutoGame):
 
     mountain = Sprite("mountain", coord(1, 21), 32, 12)
     mountain.set_position(coord(4, 1))
-    game.add_sprite(mountain)
+    game.add_sprite(mountain, LAYER.STATIC)
 
     _add_plants(game)
 
@@ -25,11 +26,12 @@ def _add_plants(game: Game):
     s.fill_row(3, tile_row=11, tile_cols=[1, 2, 3, 4])
     s.fill_row(4, tile_row=12, tile_cols=[1, 2, 3, 4])
     s.set_position(coord(1, 37))
-    game.add_sprite(s)
+    game.add_sprite(s, LAYER.STATIC)
 
 def _add_base(game):
     base = Sprite("base", coord(1, 1), cols=8, rows=7)
     base.set_position(coord(16, 30))
     base.add_animation("loop", Animation(coord(1, 1), 4))
     base.activate_animation("loop")
-    game.add_sprite(base)
\ No newline at end of file
+    # Animating, so it is drawn every frame with the actors rather than baked with the static layer
+    game.add_sprite(base, LAYER.ACTORS)
\ No newline at end of file
@@ -55,7 +55,7 @@ class GameState:
             self.enemies.set_level(self.level)
 
         self.enemies.update(game)
-        self.weapons.update(game.matrix, self.enemies)
+        self.weapons.update(game.matrix, self.enemies, game.spatial)
 
     def acquire_weapon(self, type: str) -> bool:
         cost = STATS.weapon_cost(type)
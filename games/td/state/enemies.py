@@ -5,6 +5,7 @@ from pyke_pyxel import coord, log_error
 from pyke_pyxel._types import COLOURS
 from pyke_pyxel.cell_auto.game import CellAutoGame
 from pyke_pyxel.signals import Signals
+from pyke_pyxel.spatial import SpatialIndex
 from games.td.enemies.enemy import Enemy
 from games.td.enemies.bat import Bat
 from games.td.enemies.mage import Mage
@@ -24,6 +25,8 @@ launch_locations = [
 class GameEnemies:
     def __init__(self) -> None:
         self._enemies: list[Enemy] = []
+        # id(sprite) -> enemy, the sprites of dying enemies stay in the game until their animation ends
+        self._sprite_enemies: dict[int, Enemy] = {}
 
         self._level = EnemyLevel()
         self._level.activate(0)
@@ -44,15 +47,17 @@ class GameEnemies:
     def launch_bat(self, game: CellAutoGame, position: coord):
         bat = Bat()
         bat.launch(game, position)
-        self._enemies.append(bat)
+        self._add(bat)
 
     def update(self, game: CellAutoGame):
         def _remove_enemy_sprite(sprite_id: int):
             game.remove_sprite_by_id(sprite_id)
         
         field = game.matrix
+        # Check every enemy against the field before any of them change it, only those overlapping something need their cells
+        overlapping = { e for e in self._enemies if field.active_count(e._sprite.position) > 0 }
         for e in self._enemies:
-            cells = field.cells_at(e._sprite.position, include_empty=False)
+            cells = field.cells_at(e._sprite.position, include_empty=False) if e in overlapping else []
             result = e.update(cells)
             outcome = result[0]
             was_hit = result[1]
@@ -61,12 +66,12 @@ class GameEnemies:
                     pass
                 case -1: # killed
                     # log_debug(f"enemies.update() remove {e._sprite._id}")
-                    self._enemies.remove(e)
+                    self._remove(e)
                     e._sprite.activate_animation("die", on_animation_end=_remove_enemy_sprite)
                     Signals.send_with("enemy_killed", game, e.bounty)
                 case _: # win with potential multiplier
                     damage = e.damage * outcome
-                    self._enemies.remove(e)
+                    self._remove(e)
                     e._sprite.activate_animation("kill", on_animation_end=_remove_enemy_sprite)
                     Signals.send_with("enemy_attacks", game, damage)
 
@@ -80,35 +85,46 @@ class GameEnemies:
                 case "skeleton":
                     enemy = Skeleton()
                     enemy.launch(game, location)
-                    self._enemies.append(enemy)
+                    self._add(enemy)
                 case "orb":
                     enemy = Orb()
                     enemy.launch(game, location)
-                    self._enemies.append(enemy)
+                    self._add(enemy)
                 case "mage":
                     enemy = Mage()
                     enemy.launch(game, location)
-                    self._enemies.append(enemy)
+                    self._add(enemy)
                 case "tank":
                     enemy = Tank()
                     enemy.launch(game, location)
-                    self._enemies.append(enemy)
+                    self._add(enemy)
                 case _:
                     log_error(f"enemies.update invalid enemy type:{type}")
 
-    def closest_to(self, position: coord) -> Enemy|None:
+    def closest_to(self, position: coord, spatial: SpatialIndex) -> Enemy|None:
         if len(self._enemies) == 0:
             return None
 
-        closest = min(self._enemies, key=lambda enemy: enemy._sprite.position.distance_to(position))
-        return closest
+        closest = spatial.nearest(position.mid_x, position.mid_y, where=lambda s: id(s) in self._sprite_enemies)
+        if not closest:
+            return None
+        return self._sprite_enemies[id(closest[0])]
 
     def clear_all(self):
         self._enemies.clear()
+        self._sprite_enemies.clear()
 
     def set_level(self, id: int):
         self._level.activate(id)
 
+    def _add(self, enemy: Enemy):
+        self._enemies.append(enemy)
+        self._sprite_enemies[id(enemy._sprite)] = enemy
+
+    def _remove(self, enemy: Enemy):
+        self._enemies.remove(enemy)
+        self._sprite_enemies.pop(id(enemy._sprite), None)
+
     def _random_location(self) -> coord:
         pos = launch_locations[random.randint(0, (len(launch_locations)-1))]
         return pos.clone()
\ No newline at end of file
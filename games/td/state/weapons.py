@@ -5,6 +5,7 @@ from typing import Optional
 from pyke_pyxel import coord, log_debug, log_error
 from pyke_pyxel.cell_auto.matrix import Matrix
 from pyke_pyxel.signals import Signals
+from pyke_pyxel.spatial import SpatialIndex
 from pyke_pyxel.sprite import Sprite
 
 from games.td.state.stats import STATS, WeaponPowerUp
@@ -80,7 +81,7 @@ class GameWeapons:
 
         self.active: list[Weapon] = []
 
-    def update(self, field: Matrix, enemies: GameEnemies):
+    def update(self, field: Matrix, enemies: GameEnemies, spatial: SpatialIndex):
         to_remove: list[Weapon] = []
         for w in self.active:
             if _should_skip_update(w):
@@ -103,7 +104,7 @@ class GameWeapons:
             if l._type and ((now - l._previous_launch_time) > l.cooldown):
                 match l._type:
                     case "star":
-                        self._launch_star(l, field, enemies)
+                        self._launch_star(l, field, enemies, spatial)
                     case "bolt":
                         self._launch_bolt(l, field)
                     case "fungus":
@@ -155,9 +156,9 @@ class GameWeapons:
         location._active = meteor
         self.active.append(meteor)
 
-    def _launch_star(self, location: WeaponLocation, field: Matrix, enemies: GameEnemies):
+    def _launch_star(self, location: WeaponLocation, field: Matrix, enemies: GameEnemies, spatial: SpatialIndex):
         position = location.position
-        to_enemy = enemies.closest_to(position)
+        to_enemy = enemies.closest_to(position, spatial)
         
         if to_enemy:
             to = to_enemy._sprite.position
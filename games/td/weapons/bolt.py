@@ -46,12 +46,8 @@ class Bolt(Weapon):
                 cell = field.cell_at(self.position.x, self.position.y + (i*2))
             
             if cell:
-                cell.tag = self.default_propogate
-                cell.type = self.type
-                cell.colour = self.colour
-                cell.can_propogate = True
-                cell.power = self.power
                 self.cells.append(cell)
+        field.set_cells(self.cells, type=self.type_id, colour=self.colour, can_propogate=True, power=self.power, tag=self.default_propogate)
 
     def update(self, field: Matrix):
         new_cells = []
@@ -64,7 +60,7 @@ class Bolt(Weapon):
                 to = self._select_next_cell(cell, field)
                 if to:
                     # Note: Bolt does not care whether to is empty - it does not do to.store_state
-                    to.type = self.type
+                    to.type_id = self.type_id
                     to.colour = self.colour
                     to.can_propogate = True
                     to.power = self.power
@@ -91,56 +87,56 @@ class Bolt(Weapon):
         match d:
             case "up-left":
                 to = field.neighbour_W(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_NW(cell)
             case "up-right":
                 to = field.neighbour_E(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_NE(cell)
 
             case "down-left":
                 to = field.neighbour_W(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_SW(cell)
             case "down-right":
                 to = field.neighbour_E(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_SE(cell)
             
             case "left-up":
                 to = field.neighbour_N(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_NW(cell)
             case "left-down":
                 to = field.neighbour_S(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_SW(cell)
             
             case "right-up":
                 to = field.neighbour_N(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_NE(cell)
             case "right-down":
                 to = field.neighbour_S(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_SE(cell)
 
             # Jump cases
             case "up-up":
                 to = field.neighbour_N(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_N(to)
             case "down-down":
                 to = field.neighbour_S(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_S(to)
             case "left-left":
                 to = field.neighbour_W(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_W(to)
             case "right-right":
                 to = field.neighbour_E(cell)
-                if to and to.type == self.type:
+                if to and to.type_id == self.type_id:
                     to = field.neighbour_E(to)
 
             # Conflict cases
@@ -148,7 +144,7 @@ class Bolt(Weapon):
                 cell.tag = self.default_propogate
                 to = self._select_next_cell(cell, field)
                 # to = field.neighbour_SW(cell)
-                # if to and to.type == self.type:
+                # if to and to.type_id == self.type_id:
                 #     to = field.neighbour_SE(cell)
             case "down-up":
                 cell.tag = self.default_propogate
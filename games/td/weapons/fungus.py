@@ -2,6 +2,7 @@ import random
 
 from pyke_pyxel import COLOURS, coord, log_error, log_debug
 from pyke_pyxel.cell_auto.matrix import Matrix, Cell
+from pyke_pyxel.cell_auto.cell_types import CellTypes
 from .weapon import Weapon
 
 class Fungus(Weapon):
@@ -18,20 +19,23 @@ class Fungus(Weapon):
     def launch(self, field: Matrix):
         for i in range(5):
             if cell := field.cell_at(self.position.x + (i*2), self.position.y):
-                self.cells.append(self._prop(cell))
+                self.cells.append(cell)
+        self._prop(field, self.cells)
 
     def kill(self):
         self.cells = []
 
     def update(self, field: Matrix):
 
-        new_cells = []
+        new_cells: list[Cell] = []
+        claimed: set[Cell] = set() # The neighbours already grown into this update
+        spent: list[Cell] = []
 
         # log_debug(f"Fungus {len(self.cells)} active cells")
 
         for c in self.regrow:
-            if (c.type == self.type) or c.is_empty:
-                c.type = self.type
+            if (c.type_id == self.type_id) or c.is_empty:
+                c.type_id = self.type_id
                 c.can_propogate = True
                 # TODO - should we reset c.power here?
                 self.cells.append(c)
@@ -45,7 +49,7 @@ class Fungus(Weapon):
             propagate_to = 2
 
         for c in self.cells:
-            if (not c.is_empty) and (not c.type == self.type):
+            if (not c.is_empty) and (not c.type_id == self.type_id):
                 # log_debug(f"Fungus {c.x}/{c.y} got usurped by {c.type}")
                 self.regrow.append(c)
                 continue
@@ -55,23 +59,18 @@ class Fungus(Weapon):
                 # This means that an enemy ate this cell while it was still waiting to propogate
                 continue
             
-            neighbours = field.neighbours(c, filter_for_type=Cell.TYPE_EMPTY)
+            neighbours = [ n for n in field.neighbours(c, filter_for_type=CellTypes.EMPTY) if n not in claimed ]
             random.shuffle(neighbours)
 
-            for i in range(0, propagate_to):
-                if len(neighbours) > 0:
-                    n = neighbours[0]
-                    new_cells.append(self._prop(n))
-                    neighbours.remove(n)
+            grown = neighbours[:propagate_to]
+            claimed.update(grown)
+            new_cells.extend(grown)
+            spent.append(c)
 
-            c.can_propogate = False
-        
+        field.set_cells(spent, can_propogate=False)
+        self._prop(field, new_cells)
         self.cells = new_cells
     
-    def _prop(self, cell: Cell) -> Cell:
-        cell.type = self.type
-        cell.colour = self.colour
-        cell.can_propogate = True
-        cell.power = self.power
-        # log_debug(f"Fungus propagates to x:{cell.x} y:{cell.y}")
-        return cell
\ No newline at end of file
+    def _prop(self, field: Matrix, cells: list[Cell]):
+        field.set_cells(cells, type=self.type_id, colour=self.colour, can_propogate=True, power=self.power)
+        # log_debug(f"Fungus propagates to {len(cells)} cells")
\ No newline at end of file
@@ -3,6 +3,8 @@ import math
 
 from pyke_pyxel import COLOURS, coord, log_error, log_debug
 from pyke_pyxel.cell_auto.matrix import Cell, Matrix
+from pyke_pyxel.cell_auto.rules import RingStampRule, DecayRule
+from pyke_pyxel.cell_auto.layer import Layer
 
 from .weapon import Weapon
 
@@ -24,18 +26,21 @@ class Meteor(Weapon):
         self._has_landed = False
 
         self._radius = 0
+        self._layer: Layer|None = None
+        self._ring: RingStampRule|None = None
+        self._decay: DecayRule|None = None
         self._decay_rate = 4 # POWER-UP reduce decay rate
-        self._degrees_step = 4 # POWER-UP, reduce to 0.5. Generate one point for each step between 0 and 360
         # TODO - calc max_radius as a way of determining decay rate
 
     def launch(self, field: Matrix):
         self.line = field.cells_in_line(self._from, self._to)
         self.line_index = 0
+        # The meteor's footprint, whatever it passes over and lands on is restored once it has gone
+        self._layer = field.new_layer()
 
     def update(self, field: Matrix):
         if not self._has_landed:
-            for c in self.cells:
-                c.reset()
+            self._layer.restore()
 
             if self.line_index < (len(self.line)-1):
                 center = self.line[self.line_index]
@@ -51,10 +56,10 @@ class Meteor(Weapon):
     
     @property
     def is_alive(self) -> bool:
-        if self._radius == 0:
+        if not self._decay:
             return True
         else:
-            return len(self.cells) > 0
+            return self._layer.any()
 
     def _draw_star(self, center: Cell, field: Matrix):
         self.cells = []
@@ -87,15 +92,19 @@ class Meteor(Weapon):
             self._add_star_cell(field.cell_at(x-1, (y+1)))
             self._add_star_cell(field.cell_at(x-2, (y+2)))
 
+        self._layer.cover(self.cells)
+        field.set_cells(self.cells, type=self.type_id, colour=COLOURS.RED, power=self.power * 2)
+
     def _add_star_cell(self, c:  Cell|None):
         if c:
-            c.type = self.type
-            c.colour = COLOURS.RED
-            c.power = self.power * 2
             self.cells.append(c)
 
     def _update_expand(self, field: Matrix):
-        self._radius += 1
+        if not self._ring:
+            # The layer holds the cells the ring stamps, so that only those, and the landed star, decay
+            self._ring = RingStampRule(self.type, self._to.x, self._to.y, COLOURS.RED, self.power, layer=self._layer)
+            self._decay = DecayRule(self.type, self._decay_rate, palette=self._palette(), layer=self._layer)
+        self._radius = self._ring.radius
 
         # POWER-UP: decay rate increases more slowly
         decay = self._decay_rate
@@ -109,81 +118,17 @@ class Meteor(Weapon):
             decay = self._decay_rate * 2.2
         if self._radius > 200:
             decay = self._decay_rate * 2.5
-
-        new_cells: list[Cell] = []
-        for c in self.cells:
-            if c.power > 0:
-                c.power -= decay
-                self._update_cell_colour(c)
-                new_cells.append(c)
-            else:
-                c.recall_state()
-
-        # print(f"DRAW NEW {len(new_cells)}")
-
-        degrees = 0
-        prev_x = prev_y = -1
-        while degrees <= 360:
-            
-            # 1. Convert the angle to radians (required by math.cos/sin)
-            radians = math.radians(degrees)
-            degrees += self._degrees_step # make the loop safe
-            
-            # 2. Calculate the X and Y coordinates
-            x = self._to.x + round(self._radius * math.cos(radians))
-            y = self._to.y + round(self._radius * math.sin(radians))
-            if x == prev_x and y == prev_y:
-                continue # skip
-
-            prev_x, prev_y = x, y
-
-            cell = field.cell_at(x, y)
-            if cell and not cell.type == self.type:
-
-                if not cell.is_empty:
-                    cell.store_state()
-
-                cell.type = self.type
-                cell.power = self.power
-                self._update_cell_colour(cell)
-
-                new_cells.append(cell)
-                # print(f"cell: {x}/{y}")
-
-        """
-        MUCH SLOWER implementation - but draws a full (no gaps) circle
-        TOLERANCE = 0.5 
-        radius_outer_squared = (self._radius + TOLERANCE)**2
-        radius_inner_squared = (self._radius - TOLERANCE)**2
-
-        for y in range(field._height):
-            for x in range(field._width):
-                distance_squared = (x - self.position.x)**2 + (y - self.position.y)**2
-                if (distance_squared > radius_inner_squared) and (distance_squared <= radius_outer_squared):
-                    
-                    cell = field.cell_at(x, y)
-
-                    if not cell.is_empty:
-                        cell.store_state()
-
-                    cell.type = self.type
-                    cell.power = self.power
-                    self._update_cell_colour(cell)
-                    new_cells.append(cell)
-        """
-
-        self.cells = new_cells
-
-    def _update_cell_colour(self, c: Cell):
-        ratio = c.power / self.power
-
-        if ratio >= 0.9:
-            c.colour = COLOURS.RED
-        elif ratio >= 0.7:
-            c.colour = COLOURS.ORANGE
-        elif ratio >= 0.5:
-            c.colour = COLOURS.YELLOW
-        elif ratio >= 0.3:
-            c.colour = COLOURS.PINK
-        else:
-            c.colour = COLOURS.BEIGE
\ No newline at end of file
+        self._decay.amount = decay
+
+        field.apply(self._decay, self._ring)
+        if not self._layer.any():
+            self._layer.remove() # Detach the spent layer from the field
+
+    def _palette(self) -> list[tuple[float, int]]:
+        return [
+            (self.power * 0.9, COLOURS.RED),
+            (self.power * 0.7, COLOURS.ORANGE),
+            (self.power * 0.5, COLOURS.YELLOW),
+            (self.power * 0.3, COLOURS.PINK),
+            (-math.inf, COLOURS.BEIGE),
+        ]
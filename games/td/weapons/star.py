@@ -26,7 +26,7 @@ class Star(Weapon):
             if not c.is_empty:
                 still_living += 1
                 total_power += c.power
-            c.reset()
+        field.reset_cells(self.cells)
 
         if check_aliveness:
             if still_living < 4: # Half died, kill the star
@@ -74,9 +74,8 @@ class Star(Weapon):
             self._add_star_cell(field.cell_at(x-1, (y+1)))
             self._add_star_cell(field.cell_at(x-2, (y+2)))
 
+        field.set_cells(self.cells, type=self.type_id, colour=COLOURS.YELLOW, power=self.power)
+
     def _add_star_cell(self, c:  Cell|None):
         if c:
-            c.type = self.type
-            c.colour = COLOURS.YELLOW
-            c.power = self.power
             self.cells.append(c)
\ No newline at end of file
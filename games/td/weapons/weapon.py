@@ -1,11 +1,13 @@
 from pyke_pyxel import coord, log_error, log_debug
 from pyke_pyxel.cell_auto.matrix import Cell, Matrix
+from pyke_pyxel.cell_auto.cell_types import CellTypes
 from games.td.state.stats import STATS
 
 
 class Weapon:
     def __init__(self, type: str, location_id: str, position: coord) -> None:
         self.type = type
+        self.type_id = CellTypes.id_of(type)
         self._location_id = location_id
         self.position = position
 
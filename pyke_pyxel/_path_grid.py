@@ -1,11 +1,24 @@
+import heapq
+import math
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Callable, Generator
 
 from ._types import coord, GameSettings
-from ._log import log_debug
+from ._log import log_debug, log_error
+from ._path_hierarchy import _PathHierarchy
+from .signals import Signals
 
-from pathfinding.core.diagonal_movement import DiagonalMovement
-from pathfinding.core.grid import Grid
-from pathfinding.finder.a_star import AStarFinder
+# The `pathfinding` package is an optional fallback engine, see `PathSettings.engine`
+try:
+    from pathfinding.core.diagonal_movement import DiagonalMovement
+    from pathfinding.core.grid import Grid
+    from pathfinding.finder.a_star import AStarFinder
+    _HAS_PATHFINDING = True
+except ImportError:
+    _HAS_PATHFINDING = False
 
 @dataclass
 class PATH_STATUS:
@@ -14,26 +27,406 @@ class PATH_STATUS:
     PREFERRED = 1
     BLOCKED = 0
 
-class _PathGrid:
+@dataclass
+class PATH_ENGINE:
+    NATIVE = "native"
+    HIERARCHICAL = "hierarchical"
+    PATHFINDING = "pathfinding"
+
+_SQRT2 = math.sqrt(2)
+
+# (col offset, row offset, step distance)
+_STEPS_ORTHOGONAL = ((-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0))
+_STEPS_DIAGONAL = _STEPS_ORTHOGONAL + ((-1, -1, _SQRT2), (1, -1, _SQRT2), (-1, 1, _SQRT2), (1, 1, _SQRT2))
+
+_MAX_FLOW_FIELDS = 16
+
+# Number of A* expansions between checks of the frame budget when working through path requests
+_REQUEST_SLICE = 64
+
+# Number of times a sliced search restarts because the grid changed, before it is finished in one go
+_MAX_RESTARTS = 3
+
+_NOT_CACHED = object()
+
+class PathRequest:
+    """
+    A path request which is solved over one or more frames, see `Map.request_path` and `Map.find_path_async`.
+    """
+    def __init__(self, frm: coord, to: coord, allow_diagonal: bool, callback: Callable[[list[coord]|None], None]|None):
+        self._frm = frm
+        self._to = to
+        self._allow_diagonal = allow_diagonal
+        self._callback = callback
+
+        self._search: Generator[None, None, list[int]|None]|None = None
+        # Background searches, see _PathGrid.find_path_async()
+        self._future: Future[list[int]|None]|None = None
+        self._revision = -1
+        self._path: list[coord]|None = None
+        self._done = False
+        self._cancelled = False
+
+    def cancel(self):
+        """Cancel this request, the callback will not be called"""
+        self._cancelled = True
+        self._search = None
+        if future := self._future:
+            future.cancel()
+            self._future = None
+
+    @property
+    def is_done(self) -> bool:
+        """Returns True once the request has been solved"""
+        return self._done
+
+    @property
+    def path(self) -> list[coord]|None:
+        """Returns the path once the request is done or `None` if no path could be found"""
+        return self._path
+
+    def _complete(self):
+        self._done = True
+        self._search = None
+        self._future = None
+        if callback := self._callback:
+            callback(self._path)
+
+class FlowField:
+    """
+    A shared distance map towards a single target, allowing any number of actors to 
+    path towards the same target for the cost of one search.
+
+    A `FlowField` should be obtained via `Map.flow_field()`. It is recomputed lazily,
+    the first time it is used after the map's blocked/open locations have changed.
+    """
+    def __init__(self, grid: "_PathGrid", target: coord, allow_diagonal: bool):
+        self._path_grid = grid
+        self._target = target
+        self._target_index = grid._index(target)
+        self._allow_diagonal = allow_diagonal
+
+        self._distances: list[float] = []
+        self._next: list[int] = []
+        self._revision = -1
+
+    def next_step(self, position: coord) -> coord|None:
+        """
+        Return the neighbouring location which is one step closer to the target.
+
+        Returns:
+            coord|None: the next location or `None` if `position` is the target or the target cannot be reached from `position`
+        """
+        index = self._index_of(position)
+        if index is None:
+            return None
+
+        n = self._next[index]
+        if n == -1:
+            return None
+
+        cols = self._path_grid._cols
+        return coord((n % cols) + 1, (n // cols) + 1)
+
+    def distance_at(self, position: coord) -> float|None:
+        """Return the path cost from `position` to the target or `None` if the target cannot be reached"""
+        index = self._index_of(position)
+        if index is None:
+            return None
+
+        distance = self._distances[index]
+        return None if distance == math.inf else distance
+
+    @property
+    def target(self) -> coord:
+        """The target of this flow field"""
+        return self._target
+
+    def _index_of(self, position: coord) -> int|None:
+        grid = self._path_grid
+        if position._col < 1 or position._col > grid._cols or position._row < 1 or position._row > grid._rows:
+            return None
+
+        if self._revision != grid._revision:
+            grid._dijkstra(self._target_index, self._allow_diagonal, True, self._distances, self._next)
+            self._revision = grid._revision
+
+        return grid._index(position)
+
+class DistanceMap:
+    """
+    The path costs from a single source to every location, allowing the paths from one location to many others
+    for the cost of one search.
+
+    A `DistanceMap` should be obtained via `Map.distances_from()`. It is recomputed lazily,
+    the first time it is used after the map's blocked/open locations have changed.
+    """
+    def __init__(self, grid: "_PathGrid", source: coord, allow_diagonal: bool):
+        self._path_grid = grid
+        self._source = source
+        self._source_index = grid._index(source)
+        self._allow_diagonal = allow_diagonal
+
+        self._distances: list[float] = []
+        self._parents: list[int] = []
+        self._revision = -1
+
+    def distance_to(self, position: coord) -> float|None:
+        """Return the path cost from the source to `position` or `None` if `position` cannot be reached"""
+        index = self._index_of(position)
+        if index is None:
+            return None
+
+        distance = self._distances[index]
+        return None if distance == math.inf else distance
+
+    def path_to(self, position: coord) -> list[coord]|None:
+        """Return the path from the source to `position` or `None` if `position` cannot be reached"""
+        index = self._index_of(position)
+        if index is None or self._distances[index] == math.inf:
+            return None
+
+        parents = self._parents
+        path = [index]
+        while parents[path[-1]] != -1:
+            path.append(parents[path[-1]])
+        path.reverse()
+
+        cols = self._path_grid._cols
+        return [coord((i % cols) + 1, (i // cols) + 1) for i in path]
+
+    @property
+    def source(self) -> coord:
+        """The source of this distance map"""
+        return self._source
+
+    def _index_of(self, position: coord) -> int|None:
+        grid = self._path_grid
+        if position._col < 1 or position._col > grid._cols or position._row < 1 or position._row > grid._rows:
+            return None
+
+        if self._revision != grid._revision:
+            grid._dijkstra(self._source_index, self._allow_diagonal, False, self._distances, self._parents)
+            self._revision = grid._revision
+
+        return grid._index(position)
+
+class _Nodes:
+    """
+    Reusable A* node buffers, indexed by flat cell index.
+    Entries are only valid when their stamp matches the current search,
+    which avoids having to reset the buffers between searches.
+    """
+    __slots__ = ("g", "parent", "seen", "closed", "open", "search")
+
+    def __init__(self, size: int):
+        self.g: list[float] = [0.0] * size
+        self.parent: list[int] = [-1] * size
+        self.seen: list[int] = [0] * size
+        self.closed: list[int] = [0] * size
+        self.open: list[tuple[float, int, int]] = []
+        self.search = 0
+
+class _AStar:
+    """
+    A* over a flat (row-major) cost array with reusable node buffers.
+    Subclasses provide `_costs`, `_cols`, `_rows` and `_revision`.
+    """
+    def _init_buffers(self, size: int):
+        self._nodes = _Nodes(size)
+
+    def _a_star(self, start: int, end: int, allow_diagonal: bool) -> list[int]|None:
+        search = self._a_star_search(start, end, allow_diagonal, 0, self._nodes)
+        try:
+            while True:
+                next(search)
+        except StopIteration as done:
+            return done.value
+
+    def _a_star_search(self, start: int, end: int, allow_diagonal: bool, slice_size: int, nodes: _Nodes) -> Generator[None, None, list[int]|None]:
+        """
+        A* over the flat cost grid, keeping its state in `nodes`.
+        When `slice_size` is greater than 0 the search yields after every `slice_size` expansions so that it can be 
+        spread over several frames. A resumed search restarts if a cost has changed, or if another search has since
+        used `nodes`, so a sliced search needs buffers which no other search uses. After `_MAX_RESTARTS` restarts the
+        search is finished without yielding, so that a grid which changes every frame cannot hold it back forever.
+        """
+        costs = self._costs
+        cols = self._cols
+        rows = self._rows
+        end_c = end % cols
+        end_r = end // cols
+        steps = _STEPS_DIAGONAL if allow_diagonal else _STEPS_ORTHOGONAL
+
+        # block()/open() never write PREFERRED so AVAILABLE is the cheapest step
+        # which keeps the scaled heuristic admissible
+        h_scale = PATH_STATUS.AVAILABLE
+        blocked = PATH_STATUS.BLOCKED
+
+        g = nodes.g
+        parent = nodes.parent
+        seen = nodes.seen
+        closed = nodes.closed
+        open_list = nodes.open
+
+        restarts = 0
+        while True:
+            if costs[end] == blocked:
+                return None
+            if start == end:
+                return [start]
+
+            nodes.search += 1
+            search = nodes.search
+            revision = self._revision
+
+            open_list.clear()
+            g[start] = 0.0
+            parent[start] = -1
+            seen[start] = search
+            counter = 0 # FIFO tie-breaking between equal f-values
+            open_list.append((0.0, counter, start))
+
+            expansions = 0
+            interrupted = False
+            while open_list:
+                if slice_size:
+                    expansions += 1
+                    if expansions > slice_size:
+                        expansions = 0
+                        yield
+                        if nodes.search != search or self._revision != revision:
+                            interrupted = True
+                            break
+
+                _, _, current = heapq.heappop(open_list)
+                if closed[current] == search:
+                    continue # Stale heap entry
+                if current == end:
+                    return _trace(parent, end)
+                closed[current] = search
+
+                c = current % cols
+                r = current // cols
+                current_g = g[current]
+
+                for dc, dr, distance in steps:
+                    n_c = c + dc
+                    n_r = r + dr
+                    if n_c < 0 or n_c >= cols or n_r < 0 or n_r >= rows:
+                        continue
+
+                    n = n_r * cols + n_c
+                    cost = costs[n]
+                    if cost == blocked or closed[n] == search:
+                        continue
+
+                    n_g = current_g + distance * cost
+                    if seen[n] != search or n_g < g[n]:
+                        g[n] = n_g
+                        parent[n] = current
+                        seen[n] = search
+
+                        d_c = abs(n_c - end_c)
+                        d_r = abs(n_r - end_r)
+                        if allow_diagonal: # octile
+                            h = (d_c + d_r) + (_SQRT2 - 2) * min(d_c, d_r)
+                        else: # manhattan
+                            h = d_c + d_r
+
+                        counter += 1
+                        heapq.heappush(open_list, (n_g + h * h_scale, counter, n))
+
+            if not interrupted:
+                return None
+
+            restarts += 1
+            if restarts >= _MAX_RESTARTS:
+                slice_size = 0
+
+def _trace(parent: list[int], end: int) -> list[int]:
+    path = [end]
+    current = parent[end]
+    while current != -1:
+        path.append(current)
+        current = parent[current]
+    path.reverse()
+    return path
+
+class _PathSnapshot(_AStar):
+    """
+    An immutable copy of the costs of a `_PathGrid` with its own node buffers, so that it can be searched by a worker thread.
+    """
+    def __init__(self, costs: tuple[int, ...], cols: int, rows: int, revision: int):
+        self._costs = costs
+        self._cols = cols
+        self._rows = rows
+        self._revision = revision
+        self._init_buffers(len(costs))
+
+def _search_snapshot(costs: tuple[int, ...], cols: int, rows: int, revision: int, start: int, end: int, allow_diagonal: bool) -> list[int]|None:
+    return _PathSnapshot(costs, cols, rows, revision)._a_star(start, end, allow_diagonal)
+
+class _PathGrid(_AStar):
     def __init__(self, cols: int, rows: int):
         self._grid: list[list[int]] = []
+        self._cols = cols
+        self._rows = rows
 
         settings = GameSettings.get()
         self._allow_diagonal = settings.pathfinding.allow_diagonal
         self._reduce_hugging = settings.pathfinding.reduce_hugging
 
+        self._engine = settings.pathfinding.engine
+        if self._engine == PATH_ENGINE.PATHFINDING and not _HAS_PATHFINDING:
+            log_error("_PathGrid() the pathfinding package is not installed, using the native engine")
+            self._engine = PATH_ENGINE.NATIVE
+
         for _ in range(0, cols):
             path_row: list[int] = []
             for _ in range(0, rows):
                 path_row.append(PATH_STATUS.AVAILABLE)
-        
+
             self._grid.append(path_row)
 
+        # Persistent, flat (row-major) copy of self._grid used by the native A* engine.
+        # It is updated in place by block()/open() so that find_path() never has to rebuild it.
+        size = cols * rows
+        self._costs: list[int] = [PATH_STATUS.AVAILABLE] * size
+
+        self._init_buffers(size)
+
+        self._flow_fields: dict[tuple[int, int, bool], FlowField] = {}
+
+        # Bumped whenever a cost changes, cached paths and flow fields from older revisions are stale
+        self._revision = 0
+
+        # LRU cache of (from index, to index, allow_diagonal, revision) -> path indices
+        self._path_cache: OrderedDict[tuple[int, int, bool, int], tuple[int, ...]|None] = OrderedDict()
+        self._path_cache_size = settings.pathfinding.cache_size
+        self._path_cache_hits = 0
+        self._path_cache_misses = 0
+
+        self._requests: deque[PathRequest] = deque()
+        self._request_nodes: _Nodes|None = None
+        self._frame_budget_ms = settings.pathfinding.frame_budget_ms
+
+        # Background searches, the executor is only created once it is needed
+        self._executor: ThreadPoolExecutor|None = None
+        self._workers = settings.pathfinding.workers
+        self._async_requests: list[PathRequest] = []
+        self._snapshot: tuple[int, ...]|None = None
+        self._snapshot_revision = -1
+
+        self._hierarchy: _PathHierarchy|None = None
+        if self._engine == PATH_ENGINE.HIERARCHICAL:
+            self._hierarchy = _PathHierarchy(self, settings.pathfinding.cluster_size, self._allow_diagonal)
+
     def block(self, position: coord):
         # import pathfinding is whack? x/y are switched around
         c_index = position._col - 1
         r_index = position._row - 1
-        self._grid[r_index][c_index] = PATH_STATUS.BLOCKED
+        self._set(c_index, r_index, PATH_STATUS.BLOCKED)
 
         if self._reduce_hugging:
             neighbours = self._neighbours(c_index, r_index)
@@ -42,7 +435,7 @@ class _PathGrid:
                 r_index = n[1]
                 value = self._grid[r_index][c_index]
                 if value == PATH_STATUS.AVAILABLE:
-                    self._grid[r_index][c_index] = PATH_STATUS.AVOID
+                    self._set(c_index, r_index, PATH_STATUS.AVOID)
 
     def open(self, position: coord):
         # import pathfinding is whack? x/y are switched around
@@ -50,23 +443,37 @@ class _PathGrid:
         r_index = position._row - 1
         was_blocked = self._grid[r_index][c_index] == PATH_STATUS.BLOCKED
 
-        self._grid[r_index][c_index] = PATH_STATUS.AVAILABLE
+        self._set(c_index, r_index, PATH_STATUS.AVAILABLE)
 
         if self._reduce_hugging:
             if was_blocked:
                 # If this location was previously blocked then it means
                 # that its neighbours would have been AVOID
                 # and therefore, we should set this location from BLOCKED -> AVOID
-                self._grid[r_index][c_index] = PATH_STATUS.AVOID
+                self._set(c_index, r_index, PATH_STATUS.AVOID)
 
             neighbours = self._neighbours(c_index, r_index)
             for n in neighbours:
                 n_c = n[0]
                 n_r = n[1]
-                value = self._grid[n_r][n_r]
+                value = self._grid[n_r][n_c]
                 if value == PATH_STATUS.AVOID:
-                    self._grid[n_r][n_c] = PATH_STATUS.AVAILABLE
+                    self._set(n_c, n_r, PATH_STATUS.AVAILABLE)
+
+    def _set(self, c_index: int, r_index: int, value: int):
+        index = r_index * self._cols + c_index
+        if self._costs[index] == value:
+            return
 
+        self._grid[r_index][c_index] = value
+        self._costs[index] = value
+        self._revision += 1
+
+        if hierarchy := self._hierarchy:
+            hierarchy._mark_dirty(c_index, r_index)
+
+    def _index(self, position: coord) -> int:
+        return (position._row - 1) * self._cols + (position._col - 1)
 
     def _neighbours(self, c_index: int, r_index: int) -> list[tuple[int, int]]:
         result = []
@@ -85,9 +492,298 @@ class _PathGrid:
     def find_path(self, frm: coord, to: coord, allow_diagonal: bool|None = None) -> list[coord]|None:
         if allow_diagonal is None:
             allow_diagonal = self._allow_diagonal
-        
+
+        start = self._index(frm)
+        end = self._index(to)
+
+        key = (start, end, allow_diagonal, self._revision)
+        path = self._cached_path(key)
+        if path is _NOT_CACHED:
+            if self._engine == PATH_ENGINE.PATHFINDING:
+                path = self._find_path_pathfinding(frm, to, allow_diagonal)
+            elif self._hierarchy and allow_diagonal == self._allow_diagonal and self._costs[start] != PATH_STATUS.BLOCKED:
+                # The abstraction is built for the default diagonal setting only, and has no transitions out of blocked cells
+                path = self._hierarchy.find_path(start, end)
+            else:
+                path = self._a_star(start, end, allow_diagonal)
+
+            self._cache_path(key, path)
+
+        return self._to_coords(path, frm, to)
+
+    def _cached_path(self, key: tuple[int, int, bool, int]) -> tuple[int, ...]|list[int]|None|object:
+        cache = self._path_cache
+        if key in cache:
+            cache.move_to_end(key)
+            self._path_cache_hits += 1
+            return cache[key]
+
+        self._path_cache_misses += 1
+        return _NOT_CACHED
+
+    def _cache_path(self, key: tuple[int, int, bool, int], path: list[int]|None):
+        if self._path_cache_size > 0:
+            cache = self._path_cache
+            cache[key] = tuple(path) if path else None
+            if len(cache) > self._path_cache_size:
+                cache.popitem(last=False)
+
+    def _to_coords(self, path, frm: coord, to: coord) -> list[coord]|None:
+        if path:
+            # Always return new coords, callers are free to consume the path
+            cols = self._cols
+            return [coord((i % cols) + 1, (i // cols) + 1) for i in path]
+        else:
+            log_debug(f"_PathGrid.find_path() cannot find path from {frm} to {to}")
+            return None
+
+    # ===== Path requests =====
+
+    def request_path(self, frm: coord, to: coord, allow_diagonal: bool|None, callback: Callable[[list[coord]|None], None]) -> "PathRequest":
+        if allow_diagonal is None:
+            allow_diagonal = self._allow_diagonal
+
+        request = PathRequest(frm, to, allow_diagonal, callback)
+        self._requests.append(request)
+        return request
+
+    def find_path_async(self, frm: coord, to: coord, allow_diagonal: bool|None, callback: Callable[[list[coord]|None], None]|None) -> "PathRequest":
+        if allow_diagonal is None:
+            allow_diagonal = self._allow_diagonal
+
+        request = PathRequest(frm, to, allow_diagonal, callback)
+        self._submit(request)
+        self._async_requests.append(request)
+        return request
+
+    def _submit(self, request: "PathRequest"):
+        start = self._index(request._frm)
+        end = self._index(request._to)
+        request._revision = self._revision
+
+        path = self._cached_path((start, end, request._allow_diagonal, self._revision))
+        if path is not _NOT_CACHED:
+            # Delivered with the next update, like any other result
+            request._future = Future()
+            request._future.set_result(path)
+            return
+
+        if self._snapshot_revision != self._revision:
+            # Searches share the snapshot of a revision, it is immutable
+            self._snapshot = tuple(self._costs)
+            self._snapshot_revision = self._revision
+
+        if not self._executor:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, self._workers), thread_name_prefix="pyke_pyxel_path")
+
+        request._future = self._executor.submit(
+            _search_snapshot, self._snapshot, self._cols, self._rows, self._revision, start, end, request._allow_diagonal
+        )
+
+    def _update(self):
+        self._deliver_async()
+        self._update_requests()
+
+    def _deliver_async(self):
+        """Hand finished background searches back to the main thread"""
+        if not self._async_requests:
+            return
+
+        pending: list[PathRequest] = []
+        for request in self._async_requests:
+            future = request._future
+            if request._cancelled or not future:
+                continue
+            if not future.done():
+                pending.append(request)
+                continue
+
+            if request._revision != self._revision:
+                # The map changed while searching, drop the stale result and search again
+                self._submit(request)
+                pending.append(request)
+                continue
+
+            try:
+                path = future.result()
+            except Exception as e:
+                log_error(f"_PathGrid.find_path_async() search failed {e}")
+                path = None
+
+            key = (self._index(request._frm), self._index(request._to), request._allow_diagonal, self._revision)
+            if key not in self._path_cache:
+                self._cache_path(key, path)
+            request._path = self._to_coords(path, request._frm, request._to)
+
+            request._complete()
+            Signals.send_with(Signals.MAP.PATH_READY, request, request._path)
+
+        self._async_requests = pending
+
+    def _update_requests(self):
+        """Work through queued path requests until the frame budget is spent"""
+        requests = self._requests
+        if not requests:
+            return
+
+        deadline = time.perf_counter() + (self._frame_budget_ms / 1000)
+        while requests:
+            request = requests[0]
+            if request._cancelled:
+                requests.popleft()
+                continue
+
+            if self._advance_request(request):
+                requests.popleft()
+                request._complete()
+
+            if time.perf_counter() >= deadline:
+                break
+
+    def _advance_request(self, request: "PathRequest") -> bool:
+        frm = request._frm
+        to = request._to
+        start = self._index(frm)
+        end = self._index(to)
+        key = (start, end, request._allow_diagonal, self._revision)
+
+        if request._search is None:
+            path = self._cached_path(key)
+            if path is not _NOT_CACHED:
+                request._path = self._to_coords(path, frm, to)
+                return True
+
+            if self._engine != PATH_ENGINE.NATIVE:
+                # Other engines cannot be sliced, solve the request in one go
+                request._path = self.find_path(frm, to, request._allow_diagonal)
+                return True
+
+            # Requests are solved one at a time, their node buffers are separate from those of find_path() so that
+            # searches in between frames do not restart the request
+            if self._request_nodes is None:
+                self._request_nodes = _Nodes(len(self._costs))
+            request._search = self._a_star_search(start, end, request._allow_diagonal, _REQUEST_SLICE, self._request_nodes)
+
+        try:
+            next(request._search)
+            return False
+        except StopIteration as done:
+            # The key is recreated since the search restarts when the revision changes
+            key = (start, end, request._allow_diagonal, self._revision)
+            self._cache_path(key, done.value)
+            request._path = self._to_coords(done.value, frm, to)
+            return True
+
+    def flow_field(self, to: coord, allow_diagonal: bool|None = None) -> FlowField:
+        if allow_diagonal is None:
+            allow_diagonal = self._allow_diagonal
+
+        key = (to._col, to._row, allow_diagonal)
+        field = self._flow_fields.get(key)
+        if field is None:
+            if len(self._flow_fields) >= _MAX_FLOW_FIELDS:
+                # Evict the oldest field
+                del self._flow_fields[next(iter(self._flow_fields))]
+
+            field = FlowField(self, to, allow_diagonal)
+            self._flow_fields[key] = field
+        return field
+
+    def find_paths(self, sources: list[coord], to: coord, allow_diagonal: bool|None = None) -> list[list[coord]|None]:
+        if allow_diagonal is None:
+            allow_diagonal = self._allow_diagonal
+
+        end = self._index(to)
+        starts = [self._index(frm) for frm in sources]
+
+        # One search outwards from the target settles every source
+        distances: list[float] = []
+        next_cells: list[int] = []
+        self._dijkstra(end, allow_diagonal, True, distances, next_cells, set(starts))
+
+        paths: list[list[coord]|None] = []
+        for frm, start in zip(sources, starts):
+            path: list[int]|None = None
+            if distances[start] != math.inf:
+                path = [start]
+                while path[-1] != end:
+                    path.append(next_cells[path[-1]])
+
+            self._cache_path((start, end, allow_diagonal, self._revision), path)
+            paths.append(self._to_coords(path, frm, to))
+        return paths
+
+    def distances_from(self, frm: coord, allow_diagonal: bool|None = None) -> "DistanceMap":
+        if allow_diagonal is None:
+            allow_diagonal = self._allow_diagonal
+
+        return DistanceMap(self, frm, allow_diagonal)
+
+    def _dijkstra(self, source: int, allow_diagonal: bool, reverse: bool, distances: list[float], links: list[int], until: set[int]|None = None):
+        """
+        Fill `distances` with the cost of reaching every cell from `source` and `links` with the neighbour each cell
+        was reached from (-1 for the source and unreachable cells).
+
+        When `reverse` is True distances are the cost of reaching `source` from every cell instead, and `links` holds 
+        the neighbour to step to. If `until` is provided the search stops once all of its cells are settled.
+        """
+        size = self._cols * self._rows
+        if len(distances) != size:
+            distances[:] = [math.inf] * size
+            links[:] = [-1] * size
+        else:
+            for i in range(size):
+                distances[i] = math.inf
+                links[i] = -1
+
+        costs = self._costs
+        blocked = PATH_STATUS.BLOCKED
+        if costs[source] == blocked:
+            return
+
+        cols = self._cols
+        rows = self._rows
+        steps = _STEPS_DIAGONAL if allow_diagonal else _STEPS_ORTHOGONAL
+
+        remaining = set(until) if until else None
+
+        distances[source] = 0.0
+        open_list = [(0.0, source)]
+        while open_list:
+            d, current = heapq.heappop(open_list)
+            if d > distances[current]:
+                continue # Stale heap entry
+
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    break
+
+            c = current % cols
+            r = current // cols
+            current_cost = costs[current]
+
+            for dc, dr, distance in steps:
+                n_c = c + dc
+                n_r = r + dr
+                if n_c < 0 or n_c >= cols or n_r < 0 or n_r >= rows:
+                    continue
+
+                n = n_r * cols + n_c
+                cost = costs[n]
+                if cost == blocked:
+                    continue
+
+                # The cost of a step is the cost of the cell being stepped onto
+                n_d = d + distance * (current_cost if reverse else cost)
+                if n_d < distances[n]:
+                    distances[n] = n_d
+                    links[n] = current
+                    heapq.heappush(open_list, (n_d, n))
+
+    def _find_path_pathfinding(self, frm: coord, to: coord, allow_diagonal: bool) -> list[int]|None:
         grid = Grid(matrix=self._grid)
-        
+
         start = grid.node(frm._col - 1, frm._row - 1)
         end = grid.node(to._col - 1, to._row - 1)
 
@@ -99,12 +795,11 @@ class _PathGrid:
         if path and len(path) > 0:
             # log_debug(self._grid_str())
             # log_debug(grid.grid_str(path=path, start=start, end=end))
-            return [coord(p.x + 1, p.y + 1) for p in path]
+            return [p.y * self._cols + p.x for p in path]
         else:
-            log_debug(f"_PathGrid.find_path() cannot find path from {frm} to {to}")
             log_debug(grid.grid_str(path=path, start=start, end=end))
             return None
-        
+
     def _grid_str(self) -> str:
         result = ""
         for col in self._grid:
@@ -112,7 +807,3 @@ class _PathGrid:
                 result += str(row)
             result += "\n"
         return result
-
-
-
-    
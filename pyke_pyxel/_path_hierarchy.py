@@ -0,0 +1,353 @@
+import heapq
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._path_grid import _PathGrid
+
+_SQRT2 = math.sqrt(2)
+
+_BLOCKED = 0 # PATH_STATUS.BLOCKED
+_AVAILABLE = 2 # PATH_STATUS.AVAILABLE
+
+# (col offset, row offset, step distance)
+_STEPS_ORTHOGONAL = ((-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0))
+_STEPS_DIAGONAL = _STEPS_ORTHOGONAL + ((-1, -1, _SQRT2), (1, -1, _SQRT2), (-1, 1, _SQRT2), (1, 1, _SQRT2))
+
+# Entrances at least this wide get a transition at both ends rather than one in the middle
+_WIDE_ENTRANCE = 6
+
+# Sentinel abstract nodes for the start and end of a search
+_START = -1
+_END = -2
+
+class _PathHierarchy:
+    """
+    Hierarchical (HPA*) abstraction over the costs of a `_PathGrid`.
+
+    The grid is divided into square clusters which are connected by transitions along their shared borders.
+    The paths between the transitions of each cluster are precomputed, so that a search only has to
+    cross the (much smaller) graph of transitions before it is refined with the cached paths.
+
+    When a cost changes only the cluster containing it is rebuilt, along with the borders it shares
+    with its neighbours. Rebuilds are deferred until the next search.
+    """
+    def __init__(self, grid: "_PathGrid", cluster_size: int, allow_diagonal: bool):
+        self._path_grid = grid
+        self._size = max(2, cluster_size)
+        self._steps = _STEPS_DIAGONAL if allow_diagonal else _STEPS_ORTHOGONAL
+        self._allow_diagonal = allow_diagonal
+
+        self._clusters_x = math.ceil(grid._cols / self._size)
+        self._clusters_y = math.ceil(grid._rows / self._size)
+        count = self._clusters_x * self._clusters_y
+
+        # (cluster a, cluster b) -> transitions as (cell in a, cell in b)
+        self._borders: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        # cell -> cells across a border
+        self._links: dict[int, set[int]] = {}
+        # cluster -> transition cells within the cluster
+        self._nodes: list[set[int]] = [set() for _ in range(count)]
+        # cluster -> transition cell -> [(to transition cell, cost, path)]
+        self._intra: list[dict[int, list[tuple[int, float, tuple[int, ...]]]]] = [{} for _ in range(count)]
+
+        self._dirty: set[int] = set(range(count))
+
+    def _mark_dirty(self, c_index: int, r_index: int):
+        self._dirty.add(self._cluster_at(c_index, r_index))
+
+    def _cluster_at(self, c_index: int, r_index: int) -> int:
+        return (r_index // self._size) * self._clusters_x + (c_index // self._size)
+
+    def _cluster_of(self, index: int) -> int:
+        cols = self._path_grid._cols
+        return self._cluster_at(index % cols, index // cols)
+
+    def _bounds(self, cluster: int) -> tuple[int, int, int, int]:
+        x0 = (cluster % self._clusters_x) * self._size
+        y0 = (cluster // self._clusters_x) * self._size
+        return (x0, y0, min(x0 + self._size, self._path_grid._cols), min(y0 + self._size, self._path_grid._rows))
+
+    def _adjacent_clusters(self, cluster: int) -> list[int]:
+        """The clusters sharing a border with `cluster`, and with diagonal movement those sharing a corner"""
+        cx = cluster % self._clusters_x
+        cy = cluster // self._clusters_x
+        result = []
+        for dc, dr, _ in self._steps:
+            if 0 <= cx + dc < self._clusters_x and 0 <= cy + dr < self._clusters_y:
+                result.append(cluster + dr * self._clusters_x + dc)
+        return result
+
+    # ===== Abstraction =====
+
+    def _rebuild(self):
+        if not self._dirty:
+            return
+
+        dirty = self._dirty
+        self._dirty = set()
+
+        borders: set[tuple[int, int]] = set()
+        for cluster in dirty:
+            for other in self._adjacent_clusters(cluster):
+                borders.add((min(cluster, other), max(cluster, other)))
+            if self._allow_diagonal:
+                # The cells beside the corner between the clusters either side of this one are in this one
+                cx = cluster % self._clusters_x
+                cy = cluster // self._clusters_x
+                for dc, dr, _ in _STEPS_DIAGONAL[4:]:
+                    if 0 <= cx + dc < self._clusters_x and 0 <= cy + dr < self._clusters_y:
+                        h = cluster + dc
+                        v = cluster + dr * self._clusters_x
+                        borders.add((min(h, v), max(h, v)))
+
+        affected = set(dirty)
+        for a, b in borders:
+            self._build_border(a, b)
+            affected.add(a)
+            affected.add(b)
+
+        for cluster in affected:
+            nodes = self._collect_nodes(cluster)
+            # A neighbour's cached paths are only invalid if its transitions changed
+            if cluster in dirty or nodes != self._nodes[cluster]:
+                self._nodes[cluster] = nodes
+                self._build_intra(cluster)
+
+    def _build_border(self, a: int, b: int):
+        for cell_a, cell_b in self._borders.get((a, b), []):
+            self._unlink(cell_a, cell_b)
+            self._unlink(cell_b, cell_a)
+
+        grid = self._path_grid
+        costs = grid._costs
+        cols = grid._cols
+        x0, y0, x1, y1 = self._bounds(a)
+
+        transitions: list[tuple[int, int]] = []
+        dc = b % self._clusters_x - a % self._clusters_x
+        if b // self._clusters_x == a // self._clusters_x: # b is right of a
+            xa = x1 - 1
+            pairs = [(r * cols + xa, r * cols + xa + 1) for r in range(y0, y1)]
+        elif dc == 0: # b is below a
+            ya = y1 - 1
+            pairs = [(ya * cols + c, (ya + 1) * cols + c) for c in range(x0, x1)]
+        else: # b shares the bottom right (dc 1) or bottom left (dc -1) corner of a
+            xa = x1 - 1 if dc == 1 else x0
+            cell_a = (y1 - 1) * cols + xa
+            cell_b = y1 * cols + xa + dc
+            # Crossing the corner only adds a route if both cells beside it are blocked
+            if (costs[cell_a] != _BLOCKED and costs[cell_b] != _BLOCKED and
+                costs[(y1 - 1) * cols + xa + dc] == _BLOCKED and costs[y1 * cols + xa] == _BLOCKED):
+                transitions.append((cell_a, cell_b))
+            pairs = []
+
+        segment: list[tuple[int, int]] = []
+        for pair in pairs + [(-1, -1)]:
+            if pair[0] != -1 and costs[pair[0]] != _BLOCKED and costs[pair[1]] != _BLOCKED:
+                segment.append(pair)
+                continue
+
+            if segment:
+                if len(segment) < _WIDE_ENTRANCE:
+                    transitions.append(segment[len(segment) // 2])
+                else:
+                    transitions.append(segment[0])
+                    transitions.append(segment[-1])
+                segment = []
+
+        if self._allow_diagonal:
+            # As for corners, a diagonal step across the border only adds a route if both cells beside it are blocked
+            for (a0, b0), (a1, b1) in zip(pairs, pairs[1:]):
+                if costs[b0] == _BLOCKED and costs[a1] == _BLOCKED and costs[a0] != _BLOCKED and costs[b1] != _BLOCKED:
+                    transitions.append((a0, b1))
+                if costs[a0] == _BLOCKED and costs[b1] == _BLOCKED and costs[a1] != _BLOCKED and costs[b0] != _BLOCKED:
+                    transitions.append((a1, b0))
+
+        self._borders[(a, b)] = transitions
+        for cell_a, cell_b in transitions:
+            self._links.setdefault(cell_a, set()).add(cell_b)
+            self._links.setdefault(cell_b, set()).add(cell_a)
+
+    def _unlink(self, frm: int, to: int):
+        if links := self._links.get(frm):
+            links.discard(to)
+            if not links:
+                del self._links[frm]
+
+    def _collect_nodes(self, cluster: int) -> set[int]:
+        nodes: set[int] = set()
+        for other in self._adjacent_clusters(cluster):
+            key = (min(cluster, other), max(cluster, other))
+            for cell_a, cell_b in self._borders.get(key, []):
+                nodes.add(cell_a if key[0] == cluster else cell_b)
+        return nodes
+
+    def _build_intra(self, cluster: int):
+        bounds = self._bounds(cluster)
+        nodes = self._nodes[cluster]
+
+        intra: dict[int, list[tuple[int, float, tuple[int, ...]]]] = {}
+        for u in nodes:
+            distances, parents = self._local_search(u, bounds, False)
+            intra[u] = [
+                (v, distances[v], self._trace_forward(parents, v)) for v in nodes if v != u and v in distances
+            ]
+        self._intra[cluster] = intra
+
+    def _local_search(self, source: int, bounds: tuple[int, int, int, int], reverse: bool) -> tuple[dict[int, float], dict[int, int]]:
+        """
+        Dijkstra search restricted to `bounds`.
+        When `reverse` is True distances are the cost of reaching `source` rather than of leaving it.
+        """
+        grid = self._path_grid
+        costs = grid._costs
+        cols = grid._cols
+        x0, y0, x1, y1 = bounds
+
+        distances = {source: 0.0}
+        parents = {source: -1}
+        open_list = [(0.0, source)]
+        while open_list:
+            d, current = heapq.heappop(open_list)
+            if d > distances[current]:
+                continue # Stale heap entry
+
+            c = current % cols
+            r = current // cols
+            current_cost = costs[current]
+
+            for dc, dr, distance in self._steps:
+                n_c = c + dc
+                n_r = r + dr
+                if n_c < x0 or n_c >= x1 or n_r < y0 or n_r >= y1:
+                    continue
+
+                n = n_r * cols + n_c
+                cost = costs[n]
+                if cost == _BLOCKED:
+                    continue
+
+                n_d = d + distance * (current_cost if reverse else cost)
+                if n_d < distances.get(n, math.inf):
+                    distances[n] = n_d
+                    parents[n] = current
+                    heapq.heappush(open_list, (n_d, n))
+
+        return distances, parents
+
+    def _trace_forward(self, parents: dict[int, int], to: int) -> tuple[int, ...]:
+        path = [to]
+        current = parents[to]
+        while current != -1:
+            path.append(current)
+            current = parents[current]
+        path.reverse()
+        return tuple(path)
+
+    def _trace_reverse(self, parents: dict[int, int], frm: int) -> tuple[int, ...]:
+        path = [frm]
+        current = parents[frm]
+        while current != -1:
+            path.append(current)
+            current = parents[current]
+        return tuple(path)
+
+    # ===== Search =====
+
+    def find_path(self, start: int, end: int) -> list[int]|None:
+        """
+        Search the abstract graph and refine the result into a full path of cell indices.
+        Returns `None` if there is no route, the abstract graph connects every cell that a full search can reach.
+        """
+        grid = self._path_grid
+        costs = grid._costs
+        if costs[end] == _BLOCKED:
+            return None
+        if start == end:
+            return [start]
+
+        self._rebuild()
+
+        cols = grid._cols
+        start_cluster = self._cluster_of(start)
+        end_cluster = self._cluster_of(end)
+
+        # Temporarily connect start and end to the transitions of their clusters
+        start_distances, start_parents = self._local_search(start, self._bounds(start_cluster), False)
+        end_distances, end_parents = self._local_search(end, self._bounds(end_cluster), True)
+        end_nodes = self._nodes[end_cluster]
+
+        end_c = end % cols
+        end_r = end // cols
+        allow_diagonal = self._allow_diagonal
+        def heuristic(cell: int) -> float:
+            d_c = abs((cell % cols) - end_c)
+            d_r = abs((cell // cols) - end_r)
+            if allow_diagonal: # octile
+                return ((d_c + d_r) + (_SQRT2 - 2) * min(d_c, d_r)) * _AVAILABLE
+            else: # manhattan
+                return (d_c + d_r) * _AVAILABLE
+
+        g: dict[int, float] = {_START: 0.0}
+        # node -> (previous node, path segment or None if it is traced from the start/end searches)
+        came_from: dict[int, tuple[int, tuple[int, ...]|None]] = {}
+        closed: set[int] = set()
+        counter = 0
+        open_list = [(heuristic(start), counter, _START)]
+
+        while open_list:
+            _, _, u = heapq.heappop(open_list)
+            if u in closed:
+                continue
+            if u == _END:
+                return self._assemble(start, end, came_from, start_parents, end_parents)
+            closed.add(u)
+
+            edges: list[tuple[int, float, tuple[int, ...]|None]] = []
+            if u == _START:
+                for v in self._nodes[start_cluster]:
+                    if v in start_distances:
+                        edges.append((v, start_distances[v], None))
+                if start_cluster == end_cluster and end in start_distances:
+                    edges.append((_END, start_distances[end], None))
+            else:
+                edges.extend(self._intra[self._cluster_of(u)].get(u, ()))
+                for w in self._links.get(u, ()):
+                    distance = _SQRT2 if (u % cols != w % cols and u // cols != w // cols) else 1.0
+                    edges.append((w, distance * costs[w], (u, w)))
+                if u in end_nodes and u in end_distances:
+                    edges.append((_END, end_distances[u], None))
+
+            g_u = g[u]
+            for v, cost, segment in edges:
+                if v in closed:
+                    continue
+
+                g_v = g_u + cost
+                if g_v < g.get(v, math.inf):
+                    g[v] = g_v
+                    came_from[v] = (u, segment)
+                    counter += 1
+                    heapq.heappush(open_list, (g_v + (0 if v == _END else heuristic(v)), counter, v))
+
+        return None
+
+    def _assemble(self, start: int, end: int, came_from: dict[int, tuple[int, tuple[int, ...]|None]], start_parents: dict[int, int], end_parents: dict[int, int]) -> list[int]:
+        segments: list[tuple[int, ...]] = []
+        node = _END
+        while node != _START:
+            previous, segment = came_from[node]
+            if segment is None:
+                if previous == _START:
+                    segment = self._trace_forward(start_parents, end if node == _END else node)
+                else:
+                    segment = self._trace_reverse(end_parents, previous)
+            segments.append(segment)
+            node = previous
+        segments.reverse()
+
+        path = [start]
+        for segment in segments:
+            path.extend(segment[1:])
+        return path
@@ -2,6 +2,7 @@ import math
 import enum
 
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class FpsSettings:
@@ -12,6 +13,12 @@ class FpsSettings:
 class SizeSettings:
     window:int  = 160
     tile: int = 8
+    world: int = 0
+
+    @property
+    def world_size(self) -> int:
+        """The width and height of the world in pixels, `world` or the `window` if it is not set"""
+        return max(self.world, self.window)
 
 @dataclass
 class ColourSettings:
@@ -28,6 +35,18 @@ class DisplaySettings:
 class PathSettings:
     allow_diagonal: bool = True
     reduce_hugging: bool = True
+    engine: str = "native"
+    cache_size: int = 256
+    cluster_size: int = 10
+    frame_budget_ms: float = 4.0
+    deferred: bool = False
+    workers: int = 2
+
+@dataclass
+class CellAutoSettings:
+    processes: int = 0
+    bands: int = 0
+    seed: Optional[int] = None
 
 class GameSettings:
     """
@@ -43,6 +62,7 @@ class GameSettings:
         debug (bool): defaults to False
         size.window (int): defaults to 160
         size.tile (int): defaults to 8
+        size.world (int): the width and height of the world in pixels, which the `Camera` scrolls over when it is larger than the window; defaults to 0, the size of the window
         colours.sprite_transparency (int): defaults to COLOURS.BLACK
         colours.background (int): defaults to COLOURS.BLACK
         colours.debug (int): defaults to COLOURS.BEIGE
@@ -52,6 +72,15 @@ class GameSettings:
         display.full_screen (bool): defaults to False
         pathfinding.allow_diagonal (bool): whether to allow diagonal movement; defaults to True
         pathfinding.reduce_hugging (bool): whether to reduce tight hugging to obstacle boundaries, defaults to True
+        pathfinding.engine (str): the A* engine, `"native"`, `"hierarchical"` (HPA*, for large maps) or `"pathfinding"` (requires the optional `pathfinding` package); defaults to `"native"`
+        pathfinding.cache_size (int): the number of `Map.find_path` results to cache, `0` disables the cache; defaults to 256
+        pathfinding.cluster_size (int): the size, in tiles, of the clusters used by the `"hierarchical"` engine; defaults to 10
+        pathfinding.frame_budget_ms (float): the time, in milliseconds, spent on `Map.request_path` requests each frame; defaults to 4.0
+        pathfinding.deferred (bool): whether `MovableActor.move_to` queues its path request rather than solving it immediately; defaults to False
+        pathfinding.workers (int): the number of worker threads used by `Map.find_path_async`; defaults to 2
+        cell_auto.processes (int): the number of worker processes `CellAutoGame` uses to apply the matrix rules, `0` applies them in the main process; defaults to 0
+        cell_auto.bands (int): the number of horizontal bands the matrix is divided into when `cell_auto.processes` is set, `0` uses one per process; defaults to 0
+        cell_auto.seed (int, optional): the seed of the random numbers used by the rules when `cell_auto.processes` is set; defaults to None
         mouse_enabled (bool): defaults to False
     """
     _instance = None
@@ -63,6 +92,7 @@ class GameSettings:
         self.colours = ColourSettings()
         self.display = DisplaySettings()
         self.pathfinding = PathSettings()
+        self.cell_auto = CellAutoSettings()
         self.mouse_enabled = False
 
     @classmethod
@@ -134,15 +164,18 @@ class coord:
         self._x: int = (self._col - 1) * self.size
         self._y: int = (self._row - 1) * self.size
 
+        # The items of a SpatialIndex positioned at this coord, which are re-filed when it moves
+        self._watchers: list|None = None
+
     @staticmethod
     def with_map_bounds(col: int, row: int, size: int|None = None) -> "coord":
         """
         Create a coord that is bounded to the min/max col/row values of 
-        the map as determined by based on `GameSettings.size.window` and `GameSettings.size.tile`
+        the map as determined by based on `GameSettings.size.world_size` and `GameSettings.size.tile`
         """
         sz = GameSettings.get().size
         min = 1
-        max = math.floor(sz.window / sz.tile) + 1
+        max = math.floor(sz.world_size / sz.tile) + 1
 
         if col < min: col = min
         if row < min: row = min
@@ -263,6 +296,10 @@ class coord:
         self._col = math.floor(self.mid_x / self.size) + 1
         self._row = math.floor(self.y / self.size) + 1
 
+        if watchers := self._watchers:
+            for item in watchers:
+                item._spatial._update(item)
+
     def clone(self):
         """Return a shallow copy of this coord (same grid location and size)."""
         # Use self._x/_y rather than self._col/_row
@@ -496,12 +533,12 @@ class area:
     def with_map_bounds(from_col: int, to_col: int, from_row: int, to_row: int, tile_size: int|None = None) -> "area":
         """
         Create an area that is bounded to the min/max col/row values of 
-        the map as determined by based on `GameSettings.size.window` and `GameSettings.size.tile`
+        the map as determined by based on `GameSettings.size.world_size` and `GameSettings.size.tile`
         """
 
         size = GameSettings.get().size
         min = 1
-        max = math.floor(size.window / size.tile) # + 1
+        max = math.floor(size.world_size / size.tile) # + 1
 
         if from_col < min: from_col = min
         if to_col < min: to_col = min
@@ -519,7 +556,7 @@ class area:
         Grid column/row positions are calculated from the center position.
 
         The from- and to- column/row values are bounded to remain within the allowable values of the 
-        map based on `GameSettings.size.window` and `GameSettings.size.tile`
+        map based on `GameSettings.size.world_size` and `GameSettings.size.tile`
 
         TODO - ugly bug:
         If I have the following:
@@ -537,7 +574,7 @@ class area:
         """
 
         size = GameSettings.get().size
-        max_x = max_y = size.window * size.tile
+        max_x = max_y = size.world_size * size.tile
 
         half_width = math.floor(cols * size.tile / 2)
         half_height = math.floor(rows * size.tile / 2)
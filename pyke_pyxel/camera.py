@@ -0,0 +1,105 @@
+from typing import Any
+
+import pyxel
+
+from ._types import GameSettings
+
+class Camera:
+    """
+    The window-sized view onto a world of `GameSettings.size.world` pixels, drawn with `pyxel.camera`.
+
+    Sprites, the `TileMap` and the `Map` are positioned in world pixels, the camera decides which part of the world
+    is on the screen. The camera is kept within the world, so in a world no larger than the window it never moves.
+    The HUD is drawn in screen pixels and mouse signals pass screen pixels, see `to_world`.
+
+    This class should be accessed through the `Game` instance via `game.camera`.
+    """
+    def __init__(self, settings: GameSettings) -> None:
+        self._size = settings.size.window
+        self._world = settings.size.world_size
+        self._x = 0
+        self._y = 0
+        self._following: Any = None
+        # The offset of the camera shake effect, applied to the world and the screen
+        self._shake_x = 0
+        self._shake_y = 0
+
+    @property
+    def x(self) -> int:
+        """The left of the view in world pixels"""
+        return self._x
+
+    @property
+    def y(self) -> int:
+        """The top of the view in world pixels"""
+        return self._y
+
+    @property
+    def view(self) -> tuple[int, int, int, int]:
+        """The rectangle (x, y, width, height) of the world on the screen"""
+        return (self._x, self._y, self._size, self._size)
+
+    @property
+    def following(self) -> Any:
+        """The sprite the camera is centered on after every update, or None"""
+        return self._following
+
+    def move_to(self, x: int, y: int):
+        """
+        Move the top-left of the view to (x, y) in world pixels, as far as the edges of the world allow.
+
+        Args:
+            x (int): the left of the view
+            y (int): the top of the view
+        """
+        furthest = max(self._world - self._size, 0)
+        self._x = min(max(int(x), 0), furthest)
+        self._y = min(max(int(y), 0), furthest)
+
+    def center_on(self, x: int, y: int):
+        """Move the view so that (x, y), in world pixels, is in its center, as far as the edges of the world allow"""
+        half = self._size // 2
+        self.move_to(x - half, y - half)
+
+    def follow(self, sprite: Any):
+        """
+        Keep the view centered on a sprite, as far as the edges of the world allow.
+
+        Args:
+            sprite (Sprite | CompoundSprite | None): the sprite to follow, or None to stop following
+        """
+        self._following = sprite
+        self._update()
+
+    def to_world(self, x: int, y: int) -> tuple[int, int]:
+        """Convert (x, y) in screen pixels, for example the position of a mouse signal, to world pixels"""
+        return (x + self._x, y + self._y)
+
+    def to_screen(self, x: int, y: int) -> tuple[int, int]:
+        """Convert (x, y) in world pixels to screen pixels"""
+        return (x - self._x, y - self._y)
+
+    def _update(self):
+        sprite = self._following
+        if sprite is None:
+            return
+        position = getattr(sprite, "_position", None)
+        if position is not None:
+            self.center_on(position._x + sprite._width // 2, position._y + sprite._height // 2)
+
+    def _reset(self):
+        self._following = None
+        self._x = 0
+        self._y = 0
+        self._shake_x = 0
+        self._shake_y = 0
+
+    def _shake(self, x: int, y: int):
+        self._shake_x = x
+        self._shake_y = y
+
+    def _draw_world(self):
+        pyxel.camera(self._x + self._shake_x, self._y + self._shake_y)
+
+    def _draw_screen(self):
+        pyxel.camera(self._shake_x, self._shake_y)
@@ -0,0 +1,181 @@
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+
+from .cell_types import CellTypes
+from .rules import Rule
+
+if TYPE_CHECKING:
+    from .matrix import Matrix
+
+# The per-cell arrays of a Matrix, these are exchanged at the edges of the bands
+_CELL_ARRAYS = ("_types", "_colours", "_can_propogate", "_powers", "_tags",
+                "_stored_types", "_stored_colours", "_stored_can_propogate", "_stored_powers", "_stored_tags")
+
+# The per-row arrays of a Matrix, each band only ever reads and writes its own rows
+_ROW_ARRAYS = ("_active", "_dirty_min_x", "_dirty_max_x")
+
+# (offset, shape, dtype) of an array in shared memory
+_Spec = tuple[int, tuple[int, ...], str]
+
+class _BandStepper:
+    """
+    Steps the rules of a `Matrix` in a pool of processes.
+
+    The field is divided into horizontal bands, one per task. Each array of the matrix has a copy in shared memory
+    in which the rows of every band lie between two halo rows, so that a band and its halo are contiguous and a worker
+    applies a rule to a view of them. Before each rule is applied the halo rows are refreshed from the edges of the
+    neighbouring bands, so that a band can read its neighbours' edges while they are being written. The rows are copied
+    into shared memory before a step and back out after it.
+
+    Every band has its own random number generator, seeded from the seed, the step, the rule and the band,
+    so the result of a step does not depend on the order the processes run in.
+    """
+    def __init__(self, matrix: "Matrix", processes: int, bands: int, seed: Optional[int]):
+        self._matrix: "Matrix" = weakref.proxy(matrix) # The matrix holds the stepper
+        self._seed = seed if seed is not None else int(np.random.SeedSequence().entropy) # type: ignore
+        self._step = 0
+
+        width = matrix._width
+        height = matrix._height
+        bands = max(1, min(bands, height))
+        edges = np.linspace(0, height, bands + 1).astype(int).tolist()
+        self._bands = [ (edges[i], edges[i + 1]) for i in range(bands) ]
+
+        # Band i starts at shared row y0 + 2 * i + 1, below its top halo row
+        self._halo_rows: list[int] = []
+        self._halo_sources: list[int] = []
+        for index, (y0, y1) in enumerate(self._bands):
+            if y0 > 0: # The last row of the band above
+                self._halo_rows.append(y0 + 2 * index)
+                self._halo_sources.append(y0 + 2 * index - 2)
+            if y1 < height: # The first row of the band below
+                self._halo_rows.append(y1 + 2 * index + 1)
+                self._halo_sources.append(y1 + 2 * index + 3)
+
+        # Every array is in one block of shared memory, so that a worker attaches to it once per band
+        self._specs: dict[str, _Spec] = {}
+        size = 0
+        for name in _CELL_ARRAYS + _ROW_ARRAYS:
+            array = getattr(matrix, name)
+            shape = (height + 2 * bands,) + ((width,) if name in _CELL_ARRAYS else array.shape[1:])
+            self._specs[name] = (size, shape, array.dtype.str)
+            size += -(-int(np.prod(shape)) * array.dtype.itemsize // 8) * 8
+
+        self._memory = shared_memory.SharedMemory(create=True, size=size)
+        self._shared: dict[str, np.ndarray] = {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=self._memory.buf, offset=offset)
+            for name, (offset, shape, dtype) in self._specs.items()
+        }
+
+        self._pool = ProcessPoolExecutor(max_workers=processes, mp_context=get_context("spawn"))
+        self._finalizer = weakref.finalize(self, _release, self._pool, self._memory)
+
+    def apply(self, rules: tuple[Rule, ...]):
+        matrix = self._matrix
+        width = matrix._width
+        height = matrix._height
+        self._step += 1
+
+        self._scatter()
+        for position, rule in enumerate(rules):
+            if rule.is_done:
+                continue
+
+            extents = [ self._extent(y0, y1) for y0, y1 in self._bands ]
+            bands = [ rule._band(e0 * width, e1 * width) for e0, e1 in extents ]
+            if any(b is None for b in bands):
+                # Applied to the whole matrix
+                self._gather()
+                rule.apply(matrix)
+                self._scatter()
+                continue
+
+            self._exchange_halos()
+            futures = [
+                self._pool.submit(_apply_band, self._memory.name, self._specs, tuple(CellTypes._names), width,
+                                  y0 + 2 * index + 1 - int(y0 > 0), y1 + 2 * index + 1 + int(y1 < height),
+                                  band, (self._seed, self._step, position, index))
+                for index, ((y0, y1), band) in enumerate(zip(self._bands, bands))
+            ]
+            for (y0, y1), (e0, _), future in zip(self._bands, extents, futures):
+                band = future.result()
+                offset = (y0 - e0) * width
+                rule._merge(band, y0 * width, y1 * width, offset)
+                rule.is_done = rule.is_done or band.is_done
+        self._gather()
+
+        matrix._summed_dirty = True
+
+    def _extent(self, y0: int, y1: int) -> tuple[int, int]:
+        """The rows of a band including its halo"""
+        return (max(y0 - 1, 0), min(y1 + 1, self._matrix._height))
+
+    def _scatter(self):
+        """Copy the rows of the matrix into the bands in shared memory"""
+        matrix = self._matrix
+        for name, shared in self._shared.items():
+            rows = getattr(matrix, name).reshape((matrix._height,) + shared.shape[1:])
+            for index, (y0, y1) in enumerate(self._bands):
+                shared[y0 + 2 * index + 1:y1 + 2 * index + 1] = rows[y0:y1]
+
+    def _gather(self):
+        """Copy the rows of the bands in shared memory back into the matrix"""
+        matrix = self._matrix
+        for name, shared in self._shared.items():
+            rows = getattr(matrix, name).reshape((matrix._height,) + shared.shape[1:])
+            for index, (y0, y1) in enumerate(self._bands):
+                rows[y0:y1] = shared[y0 + 2 * index + 1:y1 + 2 * index + 1]
+
+    def _exchange_halos(self):
+        for name, shared in self._shared.items():
+            if name in _CELL_ARRAYS:
+                shared[self._halo_rows] = shared[self._halo_sources]
+            else:
+                shared[self._halo_rows] = 0 # The rows outside of a band are not active or dirty
+
+    def close(self):
+        """Shut the pool down and release the shared memory, the matrix keeps its own arrays"""
+        self._shared.clear()
+        self._finalizer()
+
+def _release(pool: ProcessPoolExecutor, memory: shared_memory.SharedMemory):
+    pool.shutdown(wait=True, cancel_futures=True)
+    memory.close()
+    memory.unlink()
+
+# ===== Worker processes =====
+
+def _apply_band(memory_name: str, specs: dict[str, _Spec], types: tuple[str, ...], width: int, start: int, stop: int,
+                rule: Rule, seed: tuple[int, ...]) -> Rule:
+    """Apply `rule` to the shared rows [start, stop), which are the rows of a band and its halo"""
+    # The workers are spawned, they only know the cell types which the main process has sent them
+    if len(CellTypes._names) != len(types):
+        CellTypes._names = list(types)
+        CellTypes._ids = { name: type_id for type_id, name in enumerate(types) }
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        _apply_views(memory, specs, width, start, stop, rule, seed)
+    finally:
+        # The views of the shared memory are gone once _apply_views returns
+        memory.close()
+    return rule
+
+def _apply_views(memory: shared_memory.SharedMemory, specs: dict[str, _Spec], width: int, start: int, stop: int,
+                 rule: Rule, seed: tuple[int, ...]):
+    from .matrix import Matrix
+
+    # A matrix of the rows of the band plus its halo, which the rule is applied to as if it were the whole field
+    band = Matrix.__new__(Matrix)
+    band._width = width
+    band._height = stop - start
+    for name, (offset, shape, dtype) in specs.items():
+        rows = np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf, offset=offset)[start:stop]
+        setattr(band, name, rows.reshape(-1) if name in _CELL_ARRAYS else rows)
+    band._summed_dirty = True
+    band._rng = np.random.default_rng(seed)
+
+    rule.apply(band)
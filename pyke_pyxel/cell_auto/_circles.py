@@ -0,0 +1,70 @@
+import math
+from functools import lru_cache
+import numpy as np
+
+# The number of offset tables kept by each cache, an expanding ring asks for a new radius every frame
+_CACHE_SIZE = 256
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _annulus_offsets(inner: float, outer: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (dx, dy) offsets of the cells whose distance from the center is greater than `inner` and
+    no greater than `outer`, in row-major order. A negative `inner` includes the center.
+
+    The offsets are built one row at a time, from the span of each row which lies within the annulus, so the
+    cost is proportional to the number of cells rather than the area of the bounding square.
+    The returned arrays are shared by every caller and are read-only.
+    """
+    outer_sq = outer * outer
+    inner_sq = inner * inner if inner >= 0 else -1.0
+    reach = math.floor(outer) if outer >= 0 else -1
+
+    dys = np.arange(-reach, reach + 1, dtype=np.int64)
+    outer_remaining = outer_sq - dys * dys
+    inner_remaining = inner_sq - dys * dys
+
+    # The largest dx where dx * dx <= outer_remaining, corrected for any rounding in sqrt()
+    x1 = np.floor(np.sqrt(outer_remaining)).astype(np.int64)
+    x1[(x1 + 1) * (x1 + 1) <= outer_remaining] += 1
+    x1[x1 * x1 > outer_remaining] -= 1
+
+    # The smallest dx >= 0 where dx * dx > inner_remaining
+    x0 = np.floor(np.sqrt(np.maximum(inner_remaining, 0))).astype(np.int64) + 1
+    x0[(x0 - 1) * (x0 - 1) > inner_remaining] -= 1
+    x0[x0 * x0 <= inner_remaining] += 1
+    x0[inner_remaining < 0] = 0
+
+    counts = np.maximum(x1 - x0 + 1, 0)
+    ends = np.cumsum(counts)
+    rows = np.repeat(dys, counts)
+    dxs = np.arange(ends[-1] if len(ends) else 0, dtype=np.int64) - np.repeat(ends - counts - x0, counts)
+
+    # Mirror the right hand half of every row
+    mirrored = dxs > 0
+    dxs = np.concatenate((dxs, -dxs[mirrored]))
+    rows = np.concatenate((rows, rows[mirrored]))
+
+    order = np.lexsort((dxs, rows))
+    dxs = dxs[order]
+    rows = rows[order]
+    dxs.setflags(write=False)
+    rows.setflags(write=False)
+    return dxs, rows
+
+def _ring_offsets(radius: float) -> tuple[np.ndarray, np.ndarray]:
+    """Return the offsets of the one cell wide, gap free, ring at `radius`"""
+    return _annulus_offsets(max(radius - 0.5, 0), radius + 0.5)
+
+def _disc_offsets(radius: float) -> tuple[np.ndarray, np.ndarray]:
+    """Return the offsets of the filled disc of `radius`, including the center"""
+    return _annulus_offsets(-1, radius + 0.5)
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _unit_circle(degrees_step: float) -> tuple[np.ndarray, np.ndarray]:
+    """Return the cosines and sines of the angles from 0 to 360 degrees, every `degrees_step` degrees"""
+    radians = np.radians(np.arange(0, 360 + degrees_step, degrees_step))
+    cos = np.cos(radians)
+    sin = np.sin(radians)
+    cos.setflags(write=False)
+    sin.setflags(write=False)
+    return cos, sin
@@ -0,0 +1,38 @@
+from pyke_pyxel import log_error
+
+# Types are stored as uint8
+_MAX_TYPE_ID = 255
+
+class CellTypes:
+    """
+    Registry of cell types, shared by every `Matrix`.
+
+    Cell types are interned to small integers so that type checks are integer comparisons
+    and the matrix can store types in a compact array. The empty type is always `CellTypes.EMPTY`.
+
+    Usage:
+    >>>FUNGUS = CellTypes.id_of("fungus")
+    >>>if cell.type_id == FUNGUS:
+    """
+    EMPTY = 0
+
+    _names: list[str] = ["empty"]
+    _ids: dict[str, int] = { "empty": 0 }
+
+    @staticmethod
+    def id_of(name: str) -> int:
+        """Return the id of the named cell type, registering it if required"""
+        type_id = CellTypes._ids.get(name)
+        if type_id is None:
+            type_id = len(CellTypes._names)
+            if type_id > _MAX_TYPE_ID:
+                log_error(f"CellTypes.id_of() too many cell types, cannot add {name}")
+                return CellTypes.EMPTY
+            CellTypes._ids[name] = type_id
+            CellTypes._names.append(name)
+        return type_id
+
+    @staticmethod
+    def name_of(type_id: int) -> str:
+        """Return the name of a cell type id"""
+        return CellTypes._names[type_id]
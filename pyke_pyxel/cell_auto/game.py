@@ -1,8 +1,9 @@
 from pyke_pyxel import GameSettings
 
-from .. import GameSettings
+from .. import GameSettings, log_error
 from ..game import Game
 from .matrix import Matrix
+from .snapshot import SnapshotRing
 
 class CellAutoGame(Game):
     """
@@ -10,6 +11,7 @@ class CellAutoGame(Game):
         
         Attributes:
             matrix(Matrix): read-only access to the cellular automaton matrix
+            frame(int): read-only, the number of frames updated while the game was not paused
     """
 
     def __init__(self, settings: GameSettings, title: str, resources: str):
@@ -20,18 +22,78 @@ class CellAutoGame(Game):
             resources (str): The path to the resources directory.
         """
         super().__init__(settings, title, resources)
+        self._bake_tilemap = False # The matrix is drawn between the tilemap and the sprites
         
-        # TODO - support non-square fields
-        size = GameSettings.get().size.window
-        self._matrix = Matrix(size, size)
+        self._matrix = self._new_matrix()
+
+        self._frame = 0
+        self._capture: SnapshotRing|None = None
+        self._capture_every = 0
 
     def clear_all(self):
         super().clear_all()
-        size = GameSettings.get().size.window
-        self._matrix = Matrix(size, size)
+        self._matrix.use_processes(0) # Release the worker processes
+        self._matrix = self._new_matrix()
+
+    def _new_matrix(self) -> Matrix:
+        settings = GameSettings.get()
+        # TODO - support non-square fields
+        size = settings.size.world_size
+        matrix = Matrix(size, size)
+        if settings.cell_auto.processes > 0:
+            matrix.use_processes(settings.cell_auto.processes, settings.cell_auto.bands, settings.cell_auto.seed)
+        return matrix
+
+    # Snapshots
+
+    def start_capture(self, path: str, every: int = 30, slots: int = 64) -> SnapshotRing:
+        """
+        Snapshot the matrix every `every` frames into a ring of `slots` snapshots, in a memory-mapped file at `path`.
+        Each snapshot is stamped with the `frame` it was taken on, see `rewind`.
+
+        Args:
+            path (str): the file, it is replaced if it exists
+            every (int): the number of frames between snapshots
+            slots (int): the number of snapshots kept, once full the oldest is overwritten
+
+        Returns:
+            SnapshotRing: the ring, which can also be read after the game with `SnapshotRing(path)`
+        """
+        self.stop_capture()
+        matrix = self._matrix
+        self._capture = SnapshotRing(path, slots, SnapshotRing.slot_size_for(matrix._width, matrix._height))
+        self._capture_every = max(1, every)
+        return self._capture
+
+    def stop_capture(self):
+        """Stop capturing snapshots and close the ring file"""
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
+    def rewind(self, frame: int) -> bool:
+        """Restore the matrix from the latest snapshot captured at or before `frame`, returns False if there is none"""
+        if self._capture is None:
+            log_error("CellAutoGame.rewind() not capturing, call start_capture()")
+            return False
+
+        snapshot = self._capture.at(frame)
+        if snapshot is None:
+            log_error(f"CellAutoGame.rewind() no snapshot at or before frame {frame}")
+            return False
+        return self._matrix.restore(snapshot)
 
     # Lifecycle methods
 
+    def _update(self):
+        super()._update()
+        if self._paused:
+            return
+
+        self._frame += 1
+        if self._capture is not None and self._frame % self._capture_every == 0:
+            self._capture.write(self._frame, self._matrix.snapshot())
+
     def _draw(self):
         super()._draw_background()
 
@@ -47,4 +109,8 @@ class CellAutoGame(Game):
 
     @property
     def matrix(self) -> Matrix:
-        return self._matrix
\ No newline at end of file
+        return self._matrix
+
+    @property
+    def frame(self) -> int:
+        return self._frame
\ No newline at end of file
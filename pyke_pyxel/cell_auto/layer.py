@@ -0,0 +1,159 @@
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from .matrix import Matrix, Cell
+
+# The state saved for each covered cell, the name of each array on both the layer and the matrix
+_SAVED = ("_types", "_colours", "_can_propogate", "_powers", "_tags")
+
+class Layer:
+    """
+    A temporary overlay of cells on a `Matrix`, create one with `Matrix.new_layer`.
+
+    Covering a cell saves the state underneath it into the layer, the cell can then be changed freely.
+    Uncovering cells restores the saved state with a few array copies, so a weapon's whole footprint
+    can be composited and removed in bulk, without storing and recalling the state of each cell.
+
+    Only the covered cells are held, as a sorted array of cell indices with the saved state alongside,
+    so the memory of a layer, and the cost of uncovering its cells, grows with the cells it covers rather than the matrix.
+
+    Layers may overlap. A cell covered by several layers is restored to the state underneath all of them
+    once every layer has been removed, whatever order they are removed in.
+
+    The matrix does not keep its layers alive, a layer which is dropped without being removed leaves its cells as they are.
+
+    Attributes:
+        mask (np.ndarray): read-only, a new mask each time, with one flag per cell which is set for the cells covered by the layer
+    """
+    def __init__(self, matrix: "Matrix"):
+        # The matrix only holds weak references to its layers, so a layer outlives a matrix which has been replaced
+        self._matrix: "Matrix" = matrix
+
+        # The sorted indices of the covered cells, the arrays below are parallel to it
+        self._indices = np.zeros(0, dtype=np.int64)
+        # When each cell was covered, a cell covered by two layers belongs to the later one first
+        self._covered_at = np.zeros(0, dtype=np.uint32)
+
+        self._types = np.zeros(0, dtype=matrix._types.dtype)
+        self._colours = np.zeros(0, dtype=matrix._colours.dtype)
+        self._can_propogate = np.zeros(0, dtype=matrix._can_propogate.dtype)
+        self._powers = np.zeros(0, dtype=matrix._powers.dtype)
+        self._tags = np.zeros(0, dtype=matrix._tags.dtype)
+
+    def cover(self, cells: "list[Cell]|np.ndarray"):
+        """Save the state underneath `cells` (a list of `Cell` or a mask), cells already covered are left alone"""
+        if isinstance(cells, np.ndarray):
+            indices = np.flatnonzero(cells)
+        else:
+            indices = np.array([ c._index for c in cells ], dtype=np.int64)
+        self._cover(indices)
+
+    def uncover(self, cells: "list[Cell]|np.ndarray"):
+        """Restore the state underneath `cells` (a list of `Cell` or a mask) and remove them from the layer"""
+        if isinstance(cells, np.ndarray):
+            indices = np.flatnonzero(cells)
+        else:
+            indices = np.array([ c._index for c in cells ], dtype=np.int64)
+        self._uncover(indices)
+
+    def restore(self):
+        """Restore the state underneath every cell of the layer, the layer can go on to cover other cells"""
+        self._uncover(self._indices.copy())
+
+    def remove(self):
+        """Restore the state underneath every cell of the layer and detach it from the matrix"""
+        self.restore()
+        self._matrix._layers.discard(self)
+
+    def any(self) -> bool:
+        """Whether the layer covers any cells"""
+        return len(self._indices) > 0
+
+    @property
+    def mask(self) -> np.ndarray:
+        m = self._matrix
+        mask = np.zeros(m._width * m._height, dtype=np.bool_)
+        mask[self._indices] = True
+        return mask
+
+    def _find(self, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The position in self._indices of each of `indices`, and whether it is covered at all"""
+        positions = np.searchsorted(self._indices, indices)
+        found = positions < len(self._indices)
+        found[found] = self._indices[positions[found]] == indices[found]
+        return positions, found
+
+    def _cover(self, indices: np.ndarray):
+        indices = np.unique(indices)
+        _, found = self._find(indices)
+        indices = indices[~found]
+        if len(indices) == 0:
+            return
+
+        m = self._matrix
+        m._layer_clock += 1
+        merged = np.concatenate((self._indices, indices))
+        order = np.argsort(merged, kind="stable")
+        self._indices = merged[order]
+        self._covered_at = np.concatenate((self._covered_at, np.full(len(indices), m._layer_clock, dtype=np.uint32)))[order]
+        for name in _SAVED:
+            saved = np.concatenate((getattr(self, name), getattr(m, name)[indices]))
+            setattr(self, name, saved[order])
+
+    def _uncover(self, indices: np.ndarray):
+        positions, found = self._find(indices)
+        indices = indices[found]
+        positions = positions[found]
+        if len(indices) == 0:
+            return
+
+        # Cells which were covered again by a later layer hand their saved state up to the next of those layers,
+        # the live state belongs to it
+        m = self._matrix
+        covered_at = self._covered_at[positions]
+        nearest = np.full(len(indices), np.iinfo(np.uint32).max, dtype=np.uint32)
+        owner = np.full(len(indices), -1, dtype=np.int64)
+        owner_positions = np.zeros(len(indices), dtype=np.int64)
+        layers = list(m._layers)
+        for number, layer in enumerate(layers):
+            if layer is self or not layer.any():
+                continue
+            at, covered = layer._find(indices)
+            stamps = np.zeros(len(indices), dtype=np.uint32)
+            stamps[covered] = layer._covered_at[at[covered]]
+            later = covered & (stamps > covered_at) & (stamps < nearest)
+            nearest[later] = stamps[later]
+            owner[later] = number
+            owner_positions[later] = at[later]
+
+        for number in np.unique(owner[owner >= 0]).tolist():
+            layer = layers[number]
+            handed = owner == number
+            to = owner_positions[handed]
+            frm = positions[handed]
+            for name in _SAVED:
+                getattr(layer, name)[to] = getattr(self, name)[frm]
+
+        restoring = owner < 0
+        restore = indices[restoring]
+        frm = positions[restoring]
+        m._set_types(restore, self._types[frm])
+        m._set_colours(restore, self._colours[frm])
+        m._can_propogate[restore] = self._can_propogate[frm]
+        m._powers[restore] = self._powers[frm]
+        m._tags[restore] = self._tags[frm]
+
+        keep = np.ones(len(self._indices), dtype=np.bool_)
+        keep[positions] = False
+        self._indices = self._indices[keep]
+        self._covered_at = self._covered_at[keep]
+        for name in _SAVED:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _clear(self):
+        """Forget every covered cell without restoring it"""
+        self._indices = self._indices[:0]
+        self._covered_at = self._covered_at[:0]
+        for name in _SAVED:
+            setattr(self, name, getattr(self, name)[:0])
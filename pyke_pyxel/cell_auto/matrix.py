@@ -1,16 +1,46 @@
+from collections import OrderedDict
 from typing import Any, Optional
+import weakref
+import numpy as np
 import pyxel
 
-from pyke_pyxel import coord
+from pyke_pyxel import coord, log_error
 from pyke_pyxel.signals import Signals
 
-"""
-    Note: another option for a matrix is
-    
-    import numpy as np
-    rows, cols = 2, 3
-    grid = np.empty((rows, cols), dtype=object)
-"""
+from .cell_types import CellTypes
+from .layer import Layer
+from .snapshot import MatrixSnapshot, _tag_dtype
+from .rules import Rule
+from ._bands import _BandStepper
+from ._circles import _annulus_offsets, _disc_offsets, _ring_offsets
+
+# The number of line traces kept by the line cache
+_LINE_CACHE_SIZE = 128
+
+# Width of the row chunks in which non-empty cells are counted
+_ACTIVE_CHUNK = 16
+
+# The least number of new tags between sweeps of the unused tags
+_TAG_SWEEP = 256
+
+# The default of Matrix.set_cells(tag), None is a valid tag
+_UNCHANGED: Any = object()
+
+# Neighbour (x, y) offsets in the order they are returned: N, NW, NE, S, SW, SE, E, W
+_NEIGHBOURS = ((0, -1), (-1, -1), (1, -1), (0, 1), (-1, 1), (1, 1), (1, 0), (-1, 0))
+
+def _neighbour_offsets(width: int, height: int) -> list[tuple[tuple[int, int, int], ...]]:
+    """Return the (x, y, flat index) offsets of the in-bounds neighbours for each combination of edges (left, right, top, bottom bits)
+
+    Plain tuples of ints, single cell queries are cheaper in Python than with NumPy.
+    """
+    tables: list[tuple[tuple[int, int, int], ...]] = []
+    for edges in range(16):
+        tables.append(tuple(
+            (dx, dy, dy * width + dx) for dx, dy in _NEIGHBOURS
+            if not ((dx < 0 and edges & 1) or (dx > 0 and edges & 2) or (dy < 0 and edges & 4) or (dy > 0 and edges & 8))
+        ))
+    return tables
 
 class Cell:
     """
@@ -18,37 +48,30 @@ class Cell:
     Each cell has a position (x, y) in a 2D grid and maintains both current and stored state.
     The cell can be rendered to a pyxel Image and tracks properties like type, color, propagation,
     and power for use in cellular automaton simulations.
+
+    A Cell is a thin view onto a single index of its :class:`Matrix`, which holds the
+    state of every cell in flat arrays. Views are created on demand and compare equal
+    when they refer to the same index of the same matrix.
     
     Attributes:
         x (int): The x-coordinate of the cell in the grid.
         y (int): The y-coordinate of the cell in the grid.
         type (str): The current type/state of the cell (default: "empty").
+        type_id (int): The interned id of ``type``, see :class:`CellTypes`; comparing ids is cheaper than comparing names.
         colour (int): The current color value of the cell (default: 0).
         can_propogate (bool): Whether this cell can propagate its state (default: False).
         power (float): A power or intensity value for the cell (default: 0).
-        tag (Any): An optional tag for custom data association (default: None).
+        tag (Any): An optional tag for custom data association, any object, kept by identity (default: None).
     """
     TYPE_EMPTY = "empty"
 
-    def __init__(self, x: int, y: int, img: pyxel.Image) -> None:
+    __slots__ = ("x", "y", "_index", "_matrix")
+
+    def __init__(self, x: int, y: int, matrix: "Matrix") -> None:
         self.x: int = x
         self.y: int = y
-        self._neighbours: list[Cell] = []
-
-        self._img = img
-
-        # state
-        self.type: str = "empty"
-        self._colour: int = 0
-        self.can_propogate: bool = False
-        self.power: float = 0
-        self.tag: Any = None
-
-        self._stored_type: str = "empty"
-        self._stored_colour: int = 0
-        self._stored_can_propogate: bool = False
-        self._stored_power: float = 0
-        self._stored_tag: Any = None
+        self._index = y * matrix._width + x
+        self._matrix = matrix
 
     def reset(self):
         """Reset this Cell to the default empty state and store it.
@@ -70,11 +93,13 @@ class Cell:
         Stored values are used by :meth:`recall_state` to restore a
         previously saved state.
         """
-        self._stored_type = self.type
-        self._stored_colour = self._colour
-        self._stored_can_propogate = self.can_propogate
-        self._stored_power = self.power
-        self._stored_tag = self.tag
+        m = self._matrix
+        i = self._index
+        m._stored_types[i] = m._types[i]
+        m._stored_colours[i] = m._colours[i]
+        m._stored_can_propogate[i] = m._can_propogate[i]
+        m._stored_powers[i] = m._powers[i]
+        m._stored_tags[i] = m._tags[i]
     
     def recall_state(self):
         """Restore the cell's live state from previously stored values.
@@ -82,31 +107,87 @@ class Cell:
         After restoring, the stored slots are cleared to their default
         'empty' values.
         """
-        self.type = self._stored_type
-        self.colour = self._stored_colour
-        self.can_propogate = self._stored_can_propogate
-        self.power = self._stored_power
-        self.tag = self._stored_tag
-
-        self._stored_type = "empty"
-        self._stored_colour = 0
-        self._stored_can_propogate = False
-        self._stored_power = 0
-        self._stored_tag = None
+        m = self._matrix
+        i = self._index
+        m._set_type(i, m._stored_types.item(i))
+        self.colour = int(m._stored_colours[i])
+        m._can_propogate[i] = m._stored_can_propogate[i]
+        m._powers[i] = m._stored_powers[i]
+        m._tags[i] = m._stored_tags[i]
+        m._summed_dirty = True
+
+        m._stored_types[i] = 0
+        m._stored_colours[i] = 0
+        m._stored_can_propogate[i] = False
+        m._stored_powers[i] = 0
+        m._stored_tags[i] = 0
+
+    @property
+    def type(self) -> str:
+        return CellTypes._names[self._matrix._types.item(self._index)]
+
+    @type.setter
+    def type(self, value: str):
+        type_id = CellTypes._ids.get(value)
+        if type_id is None:
+            type_id = CellTypes.id_of(value)
+        self._matrix._set_type(self._index, type_id)
+
+    @property
+    def type_id(self) -> int:
+        """The interned id of this cell's type, see `CellTypes`"""
+        return self._matrix._types.item(self._index)
+
+    @type_id.setter
+    def type_id(self, value: int):
+        self._matrix._set_type(self._index, value)
 
     @property
     def colour(self) -> int:
-        return self._colour
+        return self._matrix._colours.item(self._index)
     
     @colour.setter
     def colour(self, value: int):
         # setter docstring intentionally shared with the getter
-        self._colour = value
-        self._img.pset(self.x, self.y, value)
+        m = self._matrix
+        m._colours[self._index] = value
+        # Only the index is noted, the image is written once per frame, see Matrix._flush()
+        m._dirty_cells.append(self._index)
+
+    @property
+    def can_propogate(self) -> bool:
+        return self._matrix._can_propogate.item(self._index)
+
+    @can_propogate.setter
+    def can_propogate(self, value: bool):
+        self._matrix._can_propogate[self._index] = value
+
+    @property
+    def power(self) -> float:
+        return self._matrix._powers.item(self._index)
+
+    @power.setter
+    def power(self, value: float):
+        self._matrix._powers[self._index] = value
+        self._matrix._summed_dirty = True
+
+    @property
+    def tag(self) -> Any:
+        return self._matrix._tag_values[self._matrix._tags.item(self._index)]
+
+    @tag.setter
+    def tag(self, value: Any):
+        self._matrix._tags[self._index] = self._matrix._tag_id(value)
     
     @property
     def is_empty(self):
-        return self.type == "empty"
+        return self._matrix._types.item(self._index) == 0
+
+    def __eq__(self, other):
+        return isinstance(other, Cell) and self._index == other._index and self._matrix is other._matrix
+
+    def __hash__(self) -> int:
+        return self._index
     
     def __str__(self):
         return f"{self.x}/{self.y}"
@@ -116,6 +197,10 @@ class Matrix:
     Matrix(width: int = 0, height: int = 0)
     A rectangular grid container that manages Cell objects and provides
     utility methods for neighbour lookup, region queries and line tracing.
+
+    The state of the cells is held as a struct of flat NumPy arrays, one
+    per :class:`Cell` attribute, indexed by ``y * width + x``. Cell types
+    (see :class:`CellTypes`) and tags are interned to small integers.
     
     Parameters
     ----------
@@ -142,26 +227,414 @@ class Matrix:
         self._width = width
         self._height = height
 
-        self._cells: list[ list[Cell] ] = []
+        size = width * height
+        self._types = np.zeros(size, dtype=np.uint8)
+        self._colours = np.zeros(size, dtype=np.uint8)
+        self._can_propogate = np.zeros(size, dtype=np.bool_)
+        self._powers = np.zeros(size, dtype=np.float64)
+        self._tags = np.zeros(size, dtype=np.int32)
+
+        self._stored_types = np.zeros(size, dtype=np.uint8)
+        self._stored_colours = np.zeros(size, dtype=np.uint8)
+        self._stored_can_propogate = np.zeros(size, dtype=np.bool_)
+        self._stored_powers = np.zeros(size, dtype=np.float64)
+        self._stored_tags = np.zeros(size, dtype=np.int32)
+
+        # The number of non-empty cells in each chunk of _ACTIVE_CHUNK cells of each row
+        self._active = np.zeros((height, -(-width // _ACTIVE_CHUNK)), dtype=np.int32)
+
+        # Summed-area tables of occupancy and power, rebuilt lazily after the field changes
+        self._summed_occupancy = np.zeros((height + 1, width + 1), dtype=np.int32)
+        self._summed_powers = np.zeros((height + 1, width + 1), dtype=np.float64)
+        self._summed_dirty = False
+
+        # Flat index offsets of the neighbours of a cell, keyed by which edges the cell lies on
+        self._neighbour_offsets = _neighbour_offsets(width, height)
+        # Cell views, created the first time each cell is asked for and shared from then on
+        self._views: list[Cell|None] = [None] * size
+
+        # Interned tags, 0 is always None. Tags are keyed by identity, and freed once unused, see _sweep_tags()
+        self._tag_values: list[Any] = [None]
+        self._tag_ids: dict[int, int] = {}
+        self._free_tags: list[int] = []
+        self._tags_until_sweep = _TAG_SWEEP
 
         self._img: pyxel.Image = pyxel.Image(width, height) # Use a pyxel.Image to optimise _draw()
-        self.clear()
+
+        # Per-row span of colours which have not yet been written to the image
+        self._dirty_min_x = np.full(height, width, dtype=np.int32)
+        self._dirty_max_x = np.full(height, -1, dtype=np.int32)
+        # Cells set one at a time are only noted, they are folded into the row spans and active counts by _fold_pending()
+        self._dirty_cells: list[int] = []
+        self._activated: list[int] = []
+        self._emptied: list[int] = []
+        self._pixels_written = 0
+
+        self._rules: list[Rule] = []
+        self._rng = np.random.default_rng()
+        self._stepper: Optional[_BandStepper] = None
+
+        self._layers: weakref.WeakSet[Layer] = weakref.WeakSet()
+        self._layer_clock = 0
+
+        # LRU cache of (from x, from y, to x, to y, extend to matrix end) -> cell indices
+        self._line_cache: OrderedDict[tuple[int, int, int, int, bool], np.ndarray] = OrderedDict()
+        self._line_cache_hits = 0
+        self._line_cache_misses = 0
 
     def clear(self):
-        """Re-initialise internal cell grid to a fresh width-by-height matrix.
+        """Reset every cell, and its stored state, to empty."""
+        for array in (self._types, self._colours, self._can_propogate, self._powers, self._tags,
+                      self._stored_types, self._stored_colours, self._stored_can_propogate, self._stored_powers, self._stored_tags):
+            array.fill(0)
+
+        self._img.cls(0)
+        self._active.fill(0)
+        for layer in self._layers:
+            layer._clear()
+        self._summed_dirty = True
+        self._dirty_min_x.fill(self._width)
+        self._dirty_max_x.fill(-1)
+        self._dirty_cells = []
+        self._activated = []
+        self._emptied = []
+
+        self._tag_values = [None]
+        self._tag_ids = {}
+        self._free_tags = []
+        self._tags_until_sweep = _TAG_SWEEP
+
+    # Vectorised rules
+
+    def add_rule(self, rule: Rule) -> Rule:
+        """Register ``rule`` to be applied to the whole matrix on every :meth:`step`."""
+        self._rules.append(rule)
+        return rule
+
+    def remove_rule(self, rule: Rule):
+        """Unregister a rule previously added with :meth:`add_rule`."""
+        if rule in self._rules:
+            self._rules.remove(rule)
+
+    def step(self):
+        """Apply every registered rule, in the order they were added.
+
+        This should be called once per frame, for example from a
+        ``GAME.UPDATE`` listener. Rules which are done are removed.
+        """
+        self.apply(*self._rules)
+        self._rules = [ r for r in self._rules if not r.is_done ]
+        self._fold_pending()
+        self._sweep_tags()
+
+    def apply(self, *rules: Rule):
+        """Apply ``rules`` to the whole matrix immediately, without registering them."""
+        if self._stepper:
+            self._stepper.apply(rules)
+            return
+
+        for rule in rules:
+            if not rule.is_done:
+                rule.apply(self)
+
+    def use_processes(self, processes: int, bands: int = 0, seed: Optional[int] = None):
+        """Apply rules in a pool of ``processes`` worker processes, or in the main process if ``processes`` is 0.
+
+        The cells are copied into shared memory on every step and divided
+        into ``bands`` horizontal bands (by default one per process) which
+        are stepped in parallel. Rules which cannot be divided into bands,
+        such as :class:`RingStampRule`, are still applied in the main
+        process. Results are reproducible for a given ``seed`` and
+        number of bands. Worth it only for large fields, each rule costs
+        a round trip to the pool. The processes are spawned, so the
+        game's main script must be guarded by ``if __name__ == "__main__":``.
+        """
+        if self._stepper:
+            self._stepper.close()
+            self._stepper = None
+        if processes > 0:
+            self._stepper = _BandStepper(self, processes, bands or processes, seed)
+
+    # Snapshots
+
+    def snapshot(self) -> MatrixSnapshot:
+        """Return a copy of the type, colour, propagation flag, power and tag of every cell.
+
+        Only the tags which are in use are kept, so the tag indices are
+        stored in the smallest integer type which fits them. The stored
+        state of cells and any layers are not part of the snapshot.
+        """
+        used_types = np.flatnonzero(np.bincount(self._types, minlength=1))
+        type_lookup = np.zeros(256, dtype=np.uint8)
+        type_lookup[used_types] = np.arange(len(used_types))
+
+        tag_counts = np.bincount(self._tags, minlength=1)
+        tag_counts[0] = 1 # None is always tag 0
+        used_tags = np.flatnonzero(tag_counts)
+        tag_lookup = np.zeros(len(tag_counts), dtype=_tag_dtype(len(used_tags)))
+        tag_lookup[used_tags] = np.arange(len(used_tags))
+        tags = tag_lookup[self._tags]
+
+        return MatrixSnapshot(
+            self._width, self._height,
+            type_lookup[self._types], [ CellTypes.name_of(t) for t in used_types.tolist() ],
+            self._colours.copy(), self._can_propogate.copy(), self._powers.copy(),
+            tags, [ self._tag_values[t] for t in used_tags.tolist() ]
+        )
+
+    def restore(self, snapshot: MatrixSnapshot|None) -> bool:
+        """Restore every cell from ``snapshot``, returns False if the snapshot does not fit this matrix.
+
+        The whole image is redrawn on the next frame.
         """
-        self._cells = [[Cell(x, y, self._img) for x in range(self._width)] for y in range(self._height)]
+        if snapshot is None:
+            log_error("Matrix.restore() no snapshot")
+            return False
+        if snapshot.width != self._width or snapshot.height != self._height:
+            log_error(f"Matrix.restore() snapshot is {snapshot.width}x{snapshot.height}, the matrix is {self._width}x{self._height}")
+            return False
+
+        type_lookup = np.array([ CellTypes.id_of(name) for name in snapshot._type_names ], dtype=np.uint8)
+        tag_lookup = np.array([ self._tag_id(tag) for tag in snapshot._tag_values ], dtype=np.int32)
+
+        self._types[:] = type_lookup[snapshot._types]
+        self._colours[:] = snapshot._colours
+        self._can_propogate[:] = snapshot._can_propogate
+        self._powers[:] = snapshot._powers
+        self._tags[:] = tag_lookup[snapshot._tags]
+
+        occupied = np.zeros((self._height, self._active.shape[1] * _ACTIVE_CHUNK), dtype=np.int32)
+        occupied[:, :self._width] = self._types.reshape(self._height, self._width) != 0
+        self._active[:] = occupied.reshape(self._height, -1, _ACTIVE_CHUNK).sum(axis=2)
+        self._activated.clear()
+        self._emptied.clear()
+        self._summed_dirty = True
+
+        self._dirty_min_x.fill(0)
+        self._dirty_max_x.fill(self._width - 1)
+        return True
+
+    def new_layer(self) -> Layer:
+        """Return a new :class:`Layer`, used to overlay cells temporarily and later restore what was underneath.
+
+        Restoring a layer is a masked array copy, so it is much cheaper
+        than calling :meth:`Cell.store_state` and :meth:`Cell.recall_state`
+        for each cell, and overlapping layers restore correctly in any order.
+        """
+        layer = Layer(self)
+        self._layers.add(layer)
+        return layer
 
-        # for y in range(0, self._height):
-        #    row: list[Cell] = []
-        #    for x in range(0, self._width):
-        #        row.append(Cell(x, y, self._img))
-        #    self._cells.append(row)
+    def new_mask(self, cells: Optional[list[Cell]] = None) -> np.ndarray:
+        """Return a mask, with one flag per cell, used to restrict rules to a set of cells.
 
+        The flags of ``cells`` are set, all others are clear.
+        """
+        mask = np.zeros(self._width * self._height, dtype=np.bool_)
+        if cells:
+            mask[[ c._index for c in cells ]] = True
+        return mask
+
+    def set_cells(self, cells: "list[Cell]|np.ndarray", type: Optional[str|int] = None, colour: Optional[int] = None,
+                  can_propogate: Optional[bool] = None, power: Optional[float] = None, tag: Any = _UNCHANGED):
+        """Set the state of many cells at once, ``cells`` is a list of :class:`Cell` or a mask.
+
+        Only the given attributes are changed, ``type`` is a type name or a
+        :class:`CellTypes` id. Each attribute is one array write for all of
+        the cells, so this is much cheaper than setting them cell by cell.
+        """
+        self._set_cells(self._indices_of(cells), type, colour, can_propogate, power, tag)
+
+    def reset_cells(self, cells: "list[Cell]|np.ndarray"):
+        """Reset many cells at once, as :meth:`Cell.reset`, ``cells`` is a list of :class:`Cell` or a mask."""
+        indices = self._indices_of(cells)
+        self._set_cells(indices, CellTypes.EMPTY, 0, False, 0, None)
+        for array in (self._stored_types, self._stored_colours, self._stored_can_propogate, self._stored_powers, self._stored_tags):
+            array[indices] = 0
+
+    def _set_cells(self, indices: np.ndarray, type: Optional[str|int], colour: Optional[int],
+                   can_propogate: Optional[bool], power: Optional[float], tag: Any):
+        if len(indices) == 0:
+            return
+        # The changes to the row spans and active counts are noted like those of single cells, see _fold_pending()
+        if type is not None:
+            type_id = CellTypes.id_of(type) if isinstance(type, str) else type
+            was_empty = self._types[indices] == 0
+            self._types[indices] = type_id
+            self._summed_dirty = True
+            if type_id == 0:
+                self._emptied.extend(indices[~was_empty].tolist())
+            else:
+                self._activated.extend(indices[was_empty].tolist())
+        if colour is not None:
+            self._colours[indices] = colour
+            self._dirty_cells.extend(indices.tolist())
+        if can_propogate is not None:
+            self._can_propogate[indices] = can_propogate
+        if power is not None:
+            self._powers[indices] = power
+            self._summed_dirty = True
+        if tag is not _UNCHANGED:
+            self._tags[indices] = self._tag_id(tag)
+
+    def _indices_of(self, cells: "list[Cell]|np.ndarray") -> np.ndarray:
+        if isinstance(cells, np.ndarray):
+            return np.flatnonzero(cells)
+        # A cell listed twice must only be counted once
+        return np.unique(np.array([ c._index for c in cells ], dtype=np.int64))
+
+    def _set_colours(self, indices: np.ndarray, colours: np.ndarray|int):
+        self._colours[indices] = colours
+        if len(indices):
+            ys, xs = np.divmod(indices, self._width)
+            np.minimum.at(self._dirty_min_x, ys, xs)
+            np.maximum.at(self._dirty_max_x, ys, xs)
+
+    def _set_type(self, index: int, type_id: int):
+        was = self._types.item(index)
+        if was == type_id:
+            return
+        self._types[index] = type_id
+        self._summed_dirty = True
+        if was == 0:
+            self._activated.append(index)
+        elif type_id == 0:
+            self._emptied.append(index)
+
+    def _set_types(self, indices: np.ndarray, type_ids: np.ndarray|int):
+        was_empty = self._types[indices] == 0
+        self._types[indices] = type_ids
+        self._summed_dirty = True
+        # +1 for cells which became active, -1 for cells which became empty
+        delta = was_empty.astype(np.int32) - (self._types[indices] == 0)
+        changed = np.flatnonzero(delta)
+        if len(changed):
+            ys, xs = np.divmod(indices[changed], self._width)
+            np.add.at(self._active, (ys, xs // _ACTIVE_CHUNK), delta[changed])
+
+    def _store_cells(self, indices: np.ndarray):
+        self._stored_types[indices] = self._types[indices]
+        self._stored_colours[indices] = self._colours[indices]
+        self._stored_can_propogate[indices] = self._can_propogate[indices]
+        self._stored_powers[indices] = self._powers[indices]
+        self._stored_tags[indices] = self._tags[indices]
+
+    def _recall_cells(self, indices: np.ndarray):
+        self._set_types(indices, self._stored_types[indices])
+        self._set_colours(indices, self._stored_colours[indices])
+        self._can_propogate[indices] = self._stored_can_propogate[indices]
+        self._powers[indices] = self._stored_powers[indices]
+        self._tags[indices] = self._stored_tags[indices]
+
+        for array in (self._stored_types, self._stored_colours, self._stored_can_propogate, self._stored_powers, self._stored_tags):
+            array[indices] = 0
+
+    def _reset_cells(self, indices: np.ndarray):
+        self._set_types(indices, 0)
+        self._set_colours(indices, 0)
+        self._can_propogate[indices] = False
+        self._powers[indices] = 0
+        self._tags[indices] = 0
+
+    def _tag_id(self, tag: Any) -> int:
+        if tag is None:
+            return 0
+
+        # By identity, so any value can be a tag and cell.tag is always the object assigned
+        tag_id = self._tag_ids.get(id(tag))
+        if tag_id is None:
+            if self._free_tags:
+                tag_id = self._free_tags.pop()
+                self._tag_values[tag_id] = tag
+            else:
+                tag_id = len(self._tag_values)
+                self._tag_values.append(tag)
+            self._tag_ids[id(tag)] = tag_id
+            self._tags_until_sweep -= 1
+        return tag_id
+
+    def _sweep_tags(self):
+        """Free the tags which no cell, stored state or layer refers to, once enough new tags have been added"""
+        if self._tags_until_sweep > 0:
+            return
+
+        used = np.zeros(len(self._tag_values), dtype=np.bool_)
+        used[0] = True
+        for tags in [self._tags, self._stored_tags] + [ layer._tags for layer in self._layers ]:
+            used[tags] = True
+        used[self._free_tags] = True # Already free
+
+        for tag_id in np.flatnonzero(~used).tolist():
+            del self._tag_ids[id(self._tag_values[tag_id])]
+            self._tag_values[tag_id] = None
+            self._free_tags.append(tag_id)
+
+        # The cost of a sweep is spread over at least as many new tags as there are live ones
+        self._tags_until_sweep = max(_TAG_SWEEP, len(self._tag_values) - len(self._free_tags))
+
+    def _cell(self, index: int) -> Cell:
+        cell = self._views[index]
+        if cell is None:
+            cell = self._views[index] = Cell(index % self._width, index // self._width, self)
+        return cell
+
+    def _view(self, x: int, y: int) -> Cell:
+        index = y * self._width + x
+        cell = self._views[index]
+        if cell is None:
+            cell = self._views[index] = Cell(x, y, self)
+        return cell
 
     # Lifecycle methods
 
+    def _fold_pending(self):
+        if self._dirty_cells:
+            ys, xs = np.divmod(np.array(self._dirty_cells, dtype=np.int64), self._width)
+            self._dirty_cells = []
+            np.minimum.at(self._dirty_min_x, ys, xs)
+            np.maximum.at(self._dirty_max_x, ys, xs)
+
+        for pending, delta in ((self._activated, 1), (self._emptied, -1)):
+            if pending:
+                ys, xs = np.divmod(np.array(pending, dtype=np.int64), self._width)
+                np.add.at(self._active, (ys, xs // _ACTIVE_CHUNK), delta)
+                pending.clear()
+
+    def _flush(self) -> int:
+        """Write the dirty spans of each row to the image, returning the number of pixels written."""
+        self._fold_pending()
+        self._sweep_tags()
+        dirty_max_x = self._dirty_max_x
+        rows = np.flatnonzero(dirty_max_x >= 0)
+        if len(rows) == 0:
+            self._pixels_written = 0
+            return 0
+
+        shape = (self._height, self._width)
+        pixels = np.ctypeslib.as_array(self._img.data_ptr()).reshape(shape)
+        colours = self._colours.reshape(shape)
+        dirty_min_x = self._dirty_min_x
+
+        written = 0
+        for y in rows.tolist():
+            x0 = dirty_min_x.item(y)
+            x1 = dirty_max_x.item(y) + 1
+            pixels[y, x0:x1] = colours[y, x0:x1]
+            written += x1 - x0
+
+        dirty_min_x[rows] = self._width
+        dirty_max_x[rows] = -1
+
+        self._pixels_written = written
+        return written
+
+    @property
+    def pixels_written(self) -> int:
+        """The number of pixels written to the image by the most recent frame."""
+        return self._pixels_written
+
     def _draw(self):
+        self._flush()
         pyxel.blt(0, 0, self._img, 0, 0, self._width, self._height, colkey=0)
 
         """
@@ -177,115 +650,98 @@ class Matrix:
     def neighbour_N(self, cell: Cell) -> Cell|None:
         """Return the northern neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.y > 0:
-            return self._cells[cell.y - 1][cell.x]
+            return self._view(cell.x, cell.y - 1)
         return None
     
     def neighbour_S(self, cell: Cell) -> Cell|None:
         """Return the southern neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.y < self._height - 1:
-            return self._cells[cell.y + 1][cell.x]
+            return self._view(cell.x, cell.y + 1)
         return None
     
     def neighbour_E(self, cell: Cell) -> Cell|None:
         """Return the eastern neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.x < self._width - 1:
-            return self._cells[cell.y][cell.x + 1]
+            return self._view(cell.x + 1, cell.y)
         return None
     
     def neighbour_W(self, cell: Cell) -> Cell|None:
         """Return the western neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.x > 0:
-            return self._cells[cell.y][cell.x - 1]
+            return self._view(cell.x - 1, cell.y)
         return None
     
     def neighbour_NE(self, cell: Cell) -> Cell|None:
         """Return the north-east neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.x < self._width - 1 and cell.y > 0:
-            return self._cells[cell.y - 1][cell.x + 1]
+            return self._view(cell.x + 1, cell.y - 1)
         return None
     
     def neighbour_NW(self, cell: Cell) -> Cell|None:
         """Return the north-west neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.x > 0 and cell.y > 0:
-            return self._cells[cell.y - 1][cell.x - 1]
+            return self._view(cell.x - 1, cell.y - 1)
         return None
     
     def neighbour_SE(self, cell: Cell) -> Cell|None:
         """Return the south-east neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.x < self._width - 1 and cell.y < self._height - 1:
-            return self._cells[cell.y + 1][cell.x + 1]
+            return self._view(cell.x + 1, cell.y + 1)
         return None
     
     def neighbour_SW(self, cell: Cell) -> Cell|None:
         """Return the south-west neighbour of ``cell`` or ``None`` if out of bounds."""
         if cell.x > 0 and cell.y < self._height - 1:
-            return self._cells[cell.y + 1][cell.x - 1]
+            return self._view(cell.x - 1, cell.y + 1)
         return None
 
-    def neighbours(self, cell: Cell, filter_for_type: Optional[str] = None) -> list[Cell]:
+    def neighbours(self, cell: Cell, filter_for_type: Optional[str|int] = None) -> list[Cell]:
         """Return the 8-connected neighbours of ``cell``.
 
-        The neighbour list is cached on the :class:`Cell` object as
-        ``cell._neighbours`` and is only populated once; subsequent calls
-        return a copy of that list so callers may mutate the result without
-        affecting the cache. If ``filter_for_type`` is provided the result
-        is filtered by each neighbour's ``type`` attribute.
+        Neighbours are found with precomputed flat index offsets and are
+        returned as shared cell views, a new list is returned on each call
+        so callers may mutate the result. If ``filter_for_type`` (a type name
+        or a :class:`CellTypes` id) is provided the result is filtered by
+        each neighbour's type.
         """
-
-        if len(cell._neighbours) == 0:
-            x = cell.x
-            y = cell.y
-
-            max_x = self._width - 1
-            max_y = self._height - 1
-
-            neighbours = cell._neighbours
-
-            if y > 0: # N
-                n = self._cells[y - 1][x]
-                neighbours.append(n)
-                if x > 0: # NW
-                    n = self._cells[y - 1][x-1]
-                    neighbours.append(n)
-                if x < max_x: # NE
-                    n = self._cells[y - 1][x+1]
-                    neighbours.append(n)
-            
-            if y < max_y: # S
-                n = self._cells[y + 1][x]
-                neighbours.append(n)
-                if x > 0: # SW
-                    n = self._cells[y + 1][x-1]
-                    neighbours.append(n)
-                if x < max_x: # SE
-                    n = self._cells[y + 1][x+1]
-                    neighbours.append(n)
-
-            if x < max_x: # E
-                n = self._cells[y][x+1]
-                neighbours.append(n)
-            
-            if x > 0: # W
-                n = self._cells[y][x-1]
-                neighbours.append(n)
-        
-        if filter_for_type == None:
-            return cell._neighbours.copy() # copy is to allow modification of the cached neighbours
-        else:
-            return [
-                n for n in cell._neighbours if n.type == filter_for_type
-            ]
+        x = cell.x
+        y = cell.y
+        index = cell._index
+        edges = (x == 0) | ((x == self._width - 1) << 1) | ((y == 0) << 2) | ((y == self._height - 1) << 3)
+
+        type_id = -1
+        if filter_for_type is not None:
+            if isinstance(filter_for_type, str):
+                type_id = CellTypes._ids.get(filter_for_type, -1)
+                if type_id < 0:
+                    return [] # No cell has ever been of this type
+            else:
+                type_id = filter_for_type
+
+        # Single cells are cheaper in plain Python, NumPy only pays for itself on the whole field
+        types = self._types
+        views = self._views
+        neighbours: list[Cell] = []
+        for dx, dy, offset in self._neighbour_offsets[edges]:
+            i = index + offset
+            if type_id >= 0 and types.item(i) != type_id:
+                continue
+            n = views[i]
+            if n is None:
+                n = views[i] = Cell(x + dx, y + dy, self)
+            neighbours.append(n)
+        return neighbours
 
     def cell_at(self, x: int, y: int) -> Cell|None:
         """Safe indexed access to the cell at grid coordinates (x, y).
 
         Returns ``None`` if the coordinates are out of bounds.
         """
-        if y < 0 or y >= len(self._cells):
+        if y < 0 or y >= self._height:
             return None
-        if x < 0 or x >= len(self._cells[0]):
+        if x < 0 or x >= self._width:
             return None
-        return self._cells[y][x]
+        return self._view(x, y)
     
     def cells_at(self, position: coord, include_empty: bool = False) -> list[Cell]:
         """Return cells within the rectangular region described by ``position``.
@@ -296,56 +752,212 @@ class Matrix:
         cells (where ``c.is_empty`` is True) are excluded unless
         ``include_empty`` is True.
         """
-        cells: list[Cell] = []
+        bounds = self._clip(position)
+        if bounds is None:
+            return []
+
+        if include_empty:
+            min_x, min_y, max_x, max_y = bounds
+            return [ self._view(x, y) for y in range(min_y, max_y) for x in range(min_x, max_x) ]
+
+        return self._cells(self._active_indices(bounds))
+
+    # ===== Active cells =====
 
+    def active_count(self, position: Optional[coord] = None) -> int:
+        """Return the number of non-empty cells, optionally within the region described by ``position``.
+
+        Region counts are read from a summed-area table, so once the
+        table has been rebuilt for the current state of the field each
+        query is O(1) regardless of the size of the region.
+        """
+        self._fold_pending()
+        if position is None:
+            return int(self._active.sum())
+        bounds = self._clip(position)
+        if bounds is None:
+            return 0
+        return int(self._summed(self._summed_occupancy, bounds))
+
+    def power_in(self, position: coord) -> float:
+        """Return the total power of the cells within the region described by ``position``.
+
+        Like :meth:`active_count` this is an O(1) summed-area table lookup.
+        """
+        bounds = self._clip(position)
+        if bounds is None:
+            return 0.0
+        return float(self._summed(self._summed_powers, bounds))
+
+    def _summed(self, table: np.ndarray, bounds: tuple[int, int, int, int]):
+        if self._summed_dirty:
+            self._build_summed()
+        min_x, min_y, max_x, max_y = bounds
+        return table[max_y, max_x] - table[min_y, max_x] - table[max_y, min_x] + table[min_y, min_x]
+
+    def _build_summed(self):
+        shape = (self._height, self._width)
+        occupied = self._types.reshape(shape) != 0
+        np.cumsum(occupied, axis=0, dtype=np.int32, out=self._summed_occupancy[1:, 1:])
+        np.cumsum(self._summed_occupancy[1:, 1:], axis=1, out=self._summed_occupancy[1:, 1:])
+
+        powers = np.where(occupied, self._powers.reshape(shape), 0.0)
+        np.cumsum(powers, axis=0, out=self._summed_powers[1:, 1:])
+        np.cumsum(self._summed_powers[1:, 1:], axis=1, out=self._summed_powers[1:, 1:])
+        self._summed_dirty = False
+
+    def active_cells(self, position: Optional[coord] = None) -> list[Cell]:
+        """Return the non-empty cells, optionally within the region described by ``position``.
+
+        Only rows which contain non-empty cells are scanned, so the cost
+        scales with the number of live cells rather than the size of the
+        matrix.
+        """
+        if position is None:
+            bounds = (0, 0, self._width, self._height)
+        else:
+            bounds = self._clip(position)
+            if bounds is None:
+                return []
+        return self._cells(self._active_indices(bounds))
+
+    def _clip(self, position: coord) -> tuple[int, int, int, int]|None:
         min_y = position.min_y if position.min_y > 0 else 0
         min_x = position.min_x if position.min_x > 0 else 0
         max_y = position.max_y if position.max_y < self._height else self._height
         max_x = position.max_x if position.max_x < self._width else self._width
+        if min_x >= max_x or min_y >= max_y:
+            return None
+        return (min_x, min_y, max_x, max_y)
+
+    def _active_indices(self, bounds: tuple[int, int, int, int]) -> np.ndarray:
+        self._fold_pending()
+        min_x, min_y, max_x, max_y = bounds
+        chunks = self._active[min_y:max_y, min_x // _ACTIVE_CHUNK:(max_x - 1) // _ACTIVE_CHUNK + 1]
+        rows = np.flatnonzero(chunks.any(axis=1)) + min_y
+        if len(rows) == 0:
+            return rows
+
+        region = self._types.reshape(self._height, self._width)[rows, min_x:max_x]
+        ys, xs = np.nonzero(region)
+        return rows[ys] * self._width + xs + min_x
+
+    def cells_in_ring(self, x: int, y: int, radius: float) -> list[Cell]:
+        """Return the in-bounds cells of the one cell wide ring of ``radius`` around (x, y).
+
+        The cells of rings of consecutive radii neither overlap nor leave
+        gaps. Offsets are cached by radius, so no trigonometry is needed
+        and the cost is proportional to the circumference.
+        """
+        dxs, dys = _ring_offsets(radius)
+        return self._cells(self._offset_indices(x + dxs, y + dys))
+
+    def cells_in_disc(self, x: int, y: int, radius: float) -> list[Cell]:
+        """Return the in-bounds cells of the filled disc of ``radius`` around (x, y)."""
+        dxs, dys = _disc_offsets(radius)
+        return self._cells(self._offset_indices(x + dxs, y + dys))
+
+    def cells_in_annulus(self, x: int, y: int, inner: float, outer: float) -> list[Cell]:
+        """Return the in-bounds cells further than ``inner`` and no further than ``outer`` from (x, y)."""
+        dxs, dys = _annulus_offsets(inner, outer)
+        return self._cells(self._offset_indices(x + dxs, y + dys))
 
-        for y in range(min_y, max_y):
-            for x in range(min_x, max_x):
-                cells.append(self._cells[y][x])
+    def _offset_indices(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        inside = (xs >= 0) & (xs < self._width) & (ys >= 0) & (ys < self._height)
+        return ys[inside] * self._width + xs[inside]
 
-        if not include_empty:
-            cells = [ c for c in cells if not c.is_empty ]
-        return cells
+    def _cells(self, indices: np.ndarray) -> list[Cell]:
+        cell = self._cell
+        return [ cell(i) for i in indices.tolist() ]
 
     def cells_in_line(self, from_position: coord, to_position: coord, extend_to_matrix_end: bool = False) -> list[Cell]:
         """Return the sequence of cells forming a discrete line between two coords.
 
-        The result includes both endpoints.
+        The result includes both endpoints. Out of bounds points are
+        skipped, unless ``extend_to_matrix_end`` is True in which case the
+        line continues past ``to_position`` until it leaves the matrix.
+        Traces are cached, as compact index arrays, by their endpoints.
         """
-        cells: list[Cell] = []
+        return self._cells(self._line_indices(from_position.x, from_position.y, to_position.x, to_position.y, extend_to_matrix_end))
 
-        from_x = from_position.x
-        from_y = from_position.y
-        to_x = to_position.x
-        to_y = to_position.y
+    def cells_in_lines(self, lines: list[tuple[coord, coord]], extend_to_matrix_end: bool = False) -> list[list[Cell]]:
+        """Return the cells of several lines, as :meth:`cells_in_line`, in the same order as ``lines``.
 
+        Lines which are not already cached are traced together, one step
+        of every line at a time, which is cheaper than tracing them one
+        by one when launching many lines in the same frame.
+        """
+        keys = [ (frm.x, frm.y, to.x, to.y, extend_to_matrix_end) for frm, to in lines ]
+        traces = { key: self._cached_line(key) for key in keys }
+
+        missing = [ key for key, trace in traces.items() if trace is None ]
+        if missing:
+            for key, trace in zip(missing, self._trace_lines(missing, extend_to_matrix_end)):
+                self._cache_line(key, trace)
+                traces[key] = trace
+
+        return [ self._cells(traces[key]) for key in keys ] # type: ignore
+
+    @property
+    def line_cache_hits(self) -> int:
+        """Number of line traces answered from the line cache"""
+        return self._line_cache_hits
+
+    @property
+    def line_cache_misses(self) -> int:
+        """Number of line traces which had to be traced"""
+        return self._line_cache_misses
+
+    def _line_indices(self, from_x: int, from_y: int, to_x: int, to_y: int, extend_to_matrix_end: bool) -> np.ndarray:
+        key = (from_x, from_y, to_x, to_y, extend_to_matrix_end)
+        trace = self._cached_line(key)
+        if trace is None:
+            trace = self._trace_line(*key)
+            self._cache_line(key, trace)
+        return trace
+
+    def _cached_line(self, key: tuple[int, int, int, int, bool]) -> np.ndarray|None:
+        cache = self._line_cache
+        if key in cache:
+            cache.move_to_end(key)
+            self._line_cache_hits += 1
+            return cache[key]
+
+        self._line_cache_misses += 1
+        return None
+
+    def _cache_line(self, key: tuple[int, int, int, int, bool], trace: np.ndarray):
+        trace.setflags(write=False) # Shared by every caller
+        cache = self._line_cache
+        cache[key] = trace
+        if len(cache) > _LINE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _trace_line(self, from_x: int, from_y: int, to_x: int, to_y: int, extend_to_matrix_end: bool) -> np.ndarray:
         # Create a line on the grid between (from_x, from_y) and (to_x, to_y) using Bresenham's algorithm.
         # This implementation handles all octants.
-        
-        # Ensure coordinates are within bounds for the simple example
-        # In a real application, you'd add robust clipping/boundary checks.
+        width = self._width
+        height = self._height
+        indices: list[int] = []
+
         distance_x = abs(to_x - from_x)
         distance_y = abs(to_y - from_y)
-        
+        if distance_x == 0 and distance_y == 0:
+            extend_to_matrix_end = False # There is no direction to extend in
+
         # Determine direction of step
         step_x = 1 if from_x < to_x else -1
         step_y = 1 if from_y < to_y else -1
 
         # Initial decision parameter (simplified for this general case)
         err = distance_x - distance_y
-        
+
         current_x, current_y = from_x, from_y
 
         # Main loop iterates until the end point is reached
         while True:
-            # Draw the pixel at the current coordinates (y is row, x is column)
-            if 0 <= current_y < len(self._cells) and 0 <= current_x < len(self._cells[0]):
-                # print(f"Draw x:{current_x} y:{current_y}")
-                cells.append(self._cells[current_y][current_x])
+            if 0 <= current_y < height and 0 <= current_x < width:
+                indices.append(current_y * width + current_x)
             elif extend_to_matrix_end:
                 break # Exit condition: the end of the matrix
 
@@ -354,13 +966,44 @@ class Matrix:
 
             # Calculate the next step
             e2 = 2 * err
-            
+
             if e2 > -distance_y:  # Move in x-direction
                 err -= distance_y
                 current_x += step_x
-            
+
             if e2 < distance_x:  # Move in y-direction
                 err += distance_x
                 current_y += step_y
 
-        return cells
\ No newline at end of file
+        return np.array(indices, dtype=np.int32)
+
+    def _trace_lines(self, keys: list[tuple[int, int, int, int, bool]], extend_to_matrix_end: bool) -> list[np.ndarray]:
+        """Trace every line with the same steps as :meth:`_trace_line`, advancing all of them at once"""
+        width = self._width
+        height = self._height
+
+        x, y, to_x, to_y = np.array([ key[:4] for key in keys ], dtype=np.int64).T.copy()
+        distance_x = np.abs(to_x - x)
+        distance_y = np.abs(to_y - y)
+        step_x = np.where(x < to_x, 1, -1)
+        step_y = np.where(y < to_y, 1, -1)
+        err = distance_x - distance_y
+        extend = extend_to_matrix_end & ((distance_x > 0) | (distance_y > 0))
+
+        steps: list[np.ndarray] = []
+        live = np.ones(len(keys), dtype=np.bool_)
+        while live.any():
+            inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            live &= inside | ~extend
+            steps.append(np.where(live & inside, y * width + x, -1))
+            live &= extend | (x != to_x) | (y != to_y)
+
+            e2 = 2 * err
+            move_x = e2 > -distance_y
+            move_y = e2 < distance_x
+            err += np.where(move_y, distance_x, 0) - np.where(move_x, distance_y, 0)
+            x += np.where(move_x, step_x, 0)
+            y += np.where(move_y, step_y, 0)
+
+        traced = np.stack(steps, axis=1)
+        return [ row[row >= 0].astype(np.int32) for row in traced ]
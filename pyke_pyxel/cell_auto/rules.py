@@ -0,0 +1,241 @@
+import copy
+import math
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+
+from .cell_types import CellTypes
+from .layer import Layer
+from ._circles import _ring_offsets, _unit_circle
+
+if TYPE_CHECKING:
+    from .matrix import Matrix
+
+class Rule:
+    """
+    Base class for a vectorised rule which is applied to the whole `Matrix` in a single call.
+
+    Rules are either registered with `Matrix.add_rule` and applied by `Matrix.step`, once per frame,
+    or applied directly with `Matrix.apply`.
+
+    Attributes:
+        type (str): the cell type the rule applies to
+        is_done (bool): set by the rule once it has no further effect, done rules are removed by `Matrix.step`
+    """
+    def __init__(self, type: str):
+        self.type = type
+        self.is_done = False
+
+    def apply(self, matrix: "Matrix"):
+        raise NotImplementedError("Rule.apply() implement in your class")
+
+    def _band(self, start: int, stop: int) -> "Rule|None":
+        """
+        Return the rule to apply to a band of the cells [start, stop) when the matrix is stepped by `Matrix.use_processes`,
+        or None if the rule can only be applied to the whole matrix, in the main process
+        """
+        return None
+
+    def _merge(self, band: "Rule", start: int, stop: int, offset: int):
+        """Copy the state of `band`, for the cells [start, stop) which are at `offset` in the band, back into this rule"""
+        pass
+
+class PropagateRule(Rule):
+    """
+    Cells of `type` which can propagate spread into each of their empty 8-connected neighbours with
+    the given probability. New cells can propagate on the next step, the source cells cannot.
+
+    Args:
+        type (str): the cell type which propagates
+        colour (int): the colour of new cells
+        probability (float): the chance of spreading into each empty neighbour, per neighbouring source cell
+        power (float): the power of new cells
+    """
+    def __init__(self, type: str, colour: int, probability: float, power: float = 0):
+        super().__init__(type)
+        self.colour = colour
+        self.probability = probability
+        self.power = power
+
+    def apply(self, matrix: "Matrix"):
+        type_id = CellTypes.id_of(self.type)
+        shape = (matrix._height, matrix._width)
+        types = matrix._types.reshape(shape)
+        can_propogate = matrix._can_propogate.reshape(shape)
+
+        sources = (types == type_id) & can_propogate
+        if not sources.any():
+            return
+
+        counts = _neighbour_counts(sources)
+        chance = 1 - (1 - self.probability) ** counts
+        spread = (types == 0) & (counts > 0) & (matrix._rng.random(shape) < chance)
+
+        can_propogate[sources] = False
+
+        indices = np.flatnonzero(spread)
+        matrix._set_types(indices, type_id)
+        matrix._can_propogate[indices] = True
+        matrix._powers[indices] = self.power
+        matrix._set_colours(indices, self.colour)
+
+    def _band(self, start: int, stop: int) -> Rule|None:
+        return self # Nothing to merge
+
+class DecayRule(Rule):
+    """
+    The power of cells of `type` is reduced by `amount` on every step. Cells whose power 
+    falls to 0 or below are reset to empty, or have their stored state recalled.
+
+    Args:
+        type (str): the cell type which decays
+        amount (float): the power lost per step
+        recall_state (bool): recall the stored state of expired cells rather than resetting them to empty
+        palette (list[tuple[float, int]], optional): (minimum power, colour) pairs used to recolour the remaining cells,
+            checked in order, cells below every minimum keep their colour
+        mask (np.ndarray, optional): restrict the rule to these cells, see `Matrix.new_mask`. Expired cells, and cells 
+            which are no longer of `type`, are removed from the mask
+        layer (Layer, optional): restrict the rule to the cells covered by this layer, see `Matrix.new_layer`.
+            Expired cells are uncovered, restoring the state underneath them, rather than reset or recalled
+    """
+    def __init__(self, type: str, amount: float, recall_state: bool = False, palette: Optional[list[tuple[float, int]]] = None, 
+                 mask: Optional[np.ndarray] = None, layer: Optional[Layer] = None):
+        super().__init__(type)
+        self.amount = amount
+        self.recall_state = recall_state
+        self.palette = palette
+        self.mask = mask
+        self.layer = layer
+
+    def apply(self, matrix: "Matrix"):
+        live = matrix._types == CellTypes.id_of(self.type)
+        if self.mask is not None:
+            self.mask &= live
+            live = self.mask
+        if self.layer is not None:
+            covered = self.layer._indices
+            indices = covered[live[covered]]
+        else:
+            indices = np.flatnonzero(live)
+        if len(indices) == 0:
+            return
+
+        powers = matrix._powers
+        powers[indices] -= self.amount
+        matrix._summed_dirty = True
+
+        expired = powers[indices] <= 0
+        dead = indices[expired]
+        if self.mask is not None:
+            self.mask[dead] = False
+        if self.layer is not None:
+            self.layer._uncover(dead)
+        elif self.recall_state:
+            matrix._recall_cells(dead)
+        else:
+            matrix._reset_cells(dead)
+
+        if self.palette:
+            remaining = indices[~expired]
+            remaining_powers = powers[remaining]
+            colours = matrix._colours[remaining].copy()
+            matched = np.zeros(len(remaining), dtype=np.bool_)
+            for minimum, colour in self.palette:
+                selected = ~matched & (remaining_powers >= minimum)
+                colours[selected] = colour
+                matched |= selected
+
+            changed = colours != matrix._colours[remaining]
+            matrix._set_colours(remaining[changed], colours[changed])
+
+    def _band(self, start: int, stop: int) -> Rule|None:
+        if self.layer is not None:
+            return None # Layers are not shared with the worker processes
+        band = copy.copy(self)
+        if self.mask is not None:
+            band.mask = self.mask[start:stop].copy()
+        return band
+
+    def _merge(self, band: Rule, start: int, stop: int, offset: int):
+        if self.mask is not None:
+            self.mask[start:stop] = band.mask[offset:offset + (stop - start)]
+
+class RingStampRule(Rule):
+    """
+    Stamps a ring of cells of `type` around a center, growing the radius on every step.
+    Cells which are already of `type` are left alone, other non-empty cells have their state stored first.
+
+    Args:
+        type (str): the cell type to stamp
+        center_x (int): the x position of the center
+        center_y (int): the y position of the center
+        colour (int): the colour of the stamped cells
+        power (float): the power of the stamped cells
+        radius (float): the radius of the first ring
+        growth (float): the increase in radius per step
+        degrees_step (float, optional): stamp one point every `degrees_step` degrees, rather than a full gap free ring
+        store_state (bool): store the state of non-empty cells before they are stamped
+        mask (np.ndarray, optional): stamped cells are added to this mask, see `Matrix.new_mask`
+        layer (Layer, optional): stamped cells are covered by this layer, which saves the state underneath them,
+            rather than storing their state, see `Matrix.new_layer`
+    """
+    def __init__(self, type: str, center_x: int, center_y: int, colour: int, power: float, radius: float = 1, growth: float = 1,
+                 degrees_step: Optional[float] = None, store_state: bool = True, mask: Optional[np.ndarray] = None,
+                 layer: Optional[Layer] = None):
+        super().__init__(type)
+        self.center_x = center_x
+        self.center_y = center_y
+        self.colour = colour
+        self.power = power
+        self.radius = radius
+        self.growth = growth
+        self.degrees_step = degrees_step
+        self.store_state = store_state
+        self.mask = mask
+        self.layer = layer
+
+    def apply(self, matrix: "Matrix"):
+        width = matrix._width
+        height = matrix._height
+
+        # Once the ring is larger than the matrix it has no further effect
+        max_radius = math.hypot(max(self.center_x, width - self.center_x), max(self.center_y, height - self.center_y)) + 1
+        if self.radius > max_radius:
+            self.is_done = True
+            return
+
+        if self.degrees_step:
+            cos, sin = _unit_circle(self.degrees_step)
+            xs = self.center_x + np.round(self.radius * cos).astype(np.int64)
+            ys = self.center_y + np.round(self.radius * sin).astype(np.int64)
+            indices = np.unique(matrix._offset_indices(xs, ys))
+        else:
+            dxs, dys = _ring_offsets(self.radius)
+            indices = matrix._offset_indices(self.center_x + dxs, self.center_y + dys)
+
+        self.radius += self.growth
+
+        type_id = CellTypes.id_of(self.type)
+        types = matrix._types[indices]
+        indices = indices[types != type_id]
+        if len(indices) == 0:
+            return
+
+        if self.layer is not None:
+            self.layer._cover(indices)
+        elif self.store_state:
+            matrix._store_cells(indices[matrix._types[indices] != 0])
+
+        matrix._set_types(indices, type_id)
+        matrix._powers[indices] = self.power
+        matrix._set_colours(indices, self.colour)
+        if self.mask is not None:
+            self.mask[indices] = True
+
+def _neighbour_counts(mask: np.ndarray) -> np.ndarray:
+    """Return the number of 8-connected neighbours of each cell which are set in `mask`"""
+    padded = np.pad(mask, 1).astype(np.uint8)
+    return (
+        padded[:-2, :-2] + padded[:-2, 1:-1] + padded[:-2, 2:] +
+        padded[1:-1, :-2] +                    padded[1:-1, 2:] +
+        padded[2:, :-2] + padded[2:, 1:-1] + padded[2:, 2:]
+    )
@@ -0,0 +1,192 @@
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from typing import Any, Optional
+import numpy as np
+
+from pyke_pyxel import log_error
+
+from .cell_types import CellTypes
+
+# width, height, length of the pickled type names and tags
+_SNAPSHOT_HEADER = struct.Struct("<III")
+
+# magic, version, slots, slot size, number of snapshots written
+_RING_HEADER = struct.Struct("<4sIIIQ")
+_RING_MAGIC = b"PKMS"
+_RING_VERSION = 1
+
+# frame, length of the snapshot bytes
+_SLOT_HEADER = struct.Struct("<qI")
+
+class MatrixSnapshot:
+    """
+    The state of every cell of a `Matrix` at one moment, take one with `Matrix.snapshot` and restore it with `Matrix.restore`.
+
+    The state is kept as compact arrays of type id, colour, propagation flag, power and tag index.
+    Type ids and tags are stored with their own tables so that a snapshot can be restored in another session.
+    The stored state of cells and any layers are not part of a snapshot.
+
+    Attributes:
+        width (int): the width of the matrix
+        height (int): the height of the matrix
+    """
+    def __init__(self, width: int, height: int, types: np.ndarray, type_names: list[str], colours: np.ndarray,
+                 can_propogate: np.ndarray, powers: np.ndarray, tags: np.ndarray, tag_values: list[Any]):
+        self.width = width
+        self.height = height
+        self._types = types
+        self._type_names = type_names
+        self._colours = colours
+        self._can_propogate = can_propogate
+        self._powers = powers
+        self._tags = tags
+        self._tag_values = tag_values
+
+    def to_bytes(self, level: int = 1) -> bytes:
+        """Return the snapshot compressed with zlib at `level`, restore it with `MatrixSnapshot.from_bytes`"""
+        tables = pickle.dumps((self._type_names, self._tag_values))
+        arrays = b"".join((
+            self._types.tobytes(),
+            self._colours.tobytes(),
+            np.packbits(self._can_propogate).tobytes(),
+            self._powers.tobytes(),
+            self._tags.tobytes(),
+        ))
+        return _SNAPSHOT_HEADER.pack(self.width, self.height, len(tables)) + tables + zlib.compress(arrays, level)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "MatrixSnapshot":
+        """
+        Return the snapshot written by `MatrixSnapshot.to_bytes`.
+        The tags are unpickled, so only read snapshots from a trusted source
+        """
+        width, height, tables_length = _SNAPSHOT_HEADER.unpack_from(data)
+        start = _SNAPSHOT_HEADER.size
+        type_names, tag_values = pickle.loads(data[start:start + tables_length])
+        arrays = zlib.decompress(data[start + tables_length:])
+
+        size = width * height
+        offset = 0
+        def take(dtype, count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(arrays, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        types = take(np.uint8, size)
+        colours = take(np.uint8, size)
+        can_propogate = np.unpackbits(take(np.uint8, (size + 7) // 8), count=size).astype(np.bool_)
+        powers = take(np.float64, size)
+        tags = take(_tag_dtype(len(tag_values)), size)
+        return MatrixSnapshot(width, height, types, type_names, colours, can_propogate, powers, tags, tag_values)
+
+class SnapshotRing:
+    """
+    A fixed number of `MatrixSnapshot` slots in a memory-mapped file, each stamped with a frame number.
+    Once every slot has been written the oldest snapshot is overwritten.
+
+    Args:
+        path (str): the file, it is created, or replaced, if `slots` is given, otherwise an existing ring is opened
+        slots (int, optional): the number of snapshots kept
+        slot_size (int, optional): the largest compressed snapshot, in bytes, which can be written
+
+    Usage:
+    >>>ring = SnapshotRing("td.snapshots", slots=64, slot_size=SnapshotRing.slot_size_for(320, 320))
+    >>>ring.write(frame, matrix.snapshot())
+    >>>matrix.restore(ring.at(frame))
+    """
+    def __init__(self, path: str, slots: Optional[int] = None, slot_size: int = 0):
+        self.path = path
+
+        if slots is not None:
+            if slot_size <= 0:
+                raise ValueError("SnapshotRing() slot_size is required to create a ring")
+            with open(path, "wb") as f:
+                f.truncate(_RING_HEADER.size + slots * (_SLOT_HEADER.size + slot_size))
+                f.write(_RING_HEADER.pack(_RING_MAGIC, _RING_VERSION, slots, slot_size, 0))
+
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self._slots, self._slot_size, self._written = _RING_HEADER.unpack_from(self._map)
+        if magic != _RING_MAGIC or version != _RING_VERSION:
+            self.close()
+            raise ValueError(f"SnapshotRing() {path} is not a snapshot ring")
+
+    @staticmethod
+    def slot_size_for(width: int, height: int) -> int:
+        """Return a slot size which fits a snapshot of a `width` x `height` matrix whatever it contains, apart from the tags"""
+        size = width * height
+        raw = size * 2 + (size + 7) // 8 + size * 8 + size * 4
+        return _SNAPSHOT_HEADER.size + 4096 + raw + raw // 1000 + 64
+
+    def write(self, frame: int, snapshot: MatrixSnapshot) -> bool:
+        """Write `snapshot`, stamped with `frame`, over the oldest slot. Returns False if it does not fit in a slot"""
+        data = snapshot.to_bytes()
+        if len(data) > self._slot_size:
+            log_error(f"SnapshotRing.write() snapshot of {len(data)} bytes does not fit in a slot of {self._slot_size}")
+            return False
+
+        offset = self._slot_offset(self._written % self._slots)
+        _SLOT_HEADER.pack_into(self._map, offset, frame, len(data))
+        start = offset + _SLOT_HEADER.size
+        self._map[start:start + len(data)] = data
+
+        self._written += 1
+        _RING_HEADER.pack_into(self._map, 0, _RING_MAGIC, _RING_VERSION, self._slots, self._slot_size, self._written)
+        return True
+
+    def frames(self) -> list[int]:
+        """Return the frames of the snapshots in the ring, oldest first"""
+        return [ frame for frame, _ in self._entries() ]
+
+    def at(self, frame: int) -> MatrixSnapshot|None:
+        """Return the latest snapshot taken at or before `frame`, or None if there is none"""
+        best: tuple[int, int]|None = None
+        for entry in self._entries():
+            if entry[0] <= frame and (best is None or entry[0] >= best[0]):
+                best = entry
+        if best is None:
+            return None
+        return self._read(best[1])
+
+    def latest(self) -> MatrixSnapshot|None:
+        """Return the most recent snapshot, or None if the ring is empty"""
+        if self._written == 0:
+            return None
+        return self._read((self._written - 1) % self._slots)
+
+    def close(self):
+        """Flush and close the file"""
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return min(self._written, self._slots)
+
+    def _entries(self) -> list[tuple[int, int]]:
+        """(frame, slot) of each snapshot, oldest first"""
+        count = len(self)
+        first = self._written - count
+        entries = []
+        for n in range(first, self._written):
+            slot = n % self._slots
+            frame, _ = _SLOT_HEADER.unpack_from(self._map, self._slot_offset(slot))
+            entries.append((frame, slot))
+        return entries
+
+    def _read(self, slot: int) -> MatrixSnapshot:
+        offset = self._slot_offset(slot)
+        _, length = _SLOT_HEADER.unpack_from(self._map, offset)
+        start = offset + _SLOT_HEADER.size
+        return MatrixSnapshot.from_bytes(self._map[start:start + length])
+
+    def _slot_offset(self, slot: int) -> int:
+        return _RING_HEADER.size + slot * (_SLOT_HEADER.size + self._slot_size)
+
+def _tag_dtype(count: int):
+    return np.uint8 if count <= 0xFF else np.uint16 if count <= 0xFFFF else np.uint32
@@ -0,0 +1,136 @@
+from typing import Any, TYPE_CHECKING
+from dataclasses import dataclass
+
+from pyke_pyxel.signals import Signals
+
+if TYPE_CHECKING:
+    from pyke_pyxel.game import Game
+
+@dataclass
+class _body:
+    sprite: Any
+    layer: int
+    mask: int
+    order: int # When the body was added, the earlier of a pair is always passed first
+
+class Collisions:
+    """
+    Sprite-vs-sprite collision detection between the sprites which have been added with `add`.
+
+    Once per update the sprites which share a cell of the game's `SpatialIndex` (the broadphase) are checked
+    for overlapping bounding boxes, using each sprite's `width` and `height` (the narrowphase).
+    Pairs of sprites are only checked when each one's `layer` is in the other's `mask`.
+
+    For every pair of overlapping sprites one of the following signals is sent, with the game as the sender
+    and the pair `(sprite, other)` as the value, where `sprite` is the one which was added first:
+    - `Signals.COLLISION.ENTER` on the first update the pair overlap
+    - `Signals.COLLISION.STAY` on every following update they still overlap
+    - `Signals.COLLISION.EXIT` on the first update they no longer overlap, or when either is removed
+
+    This class should be accessed through the `Game` instance via `game.collisions`.
+    Sprites must also be added to the game to take part.
+    """
+    ALL = 0xFFFFFFFF
+
+    def __init__(self, game: "Game") -> None:
+        self._game = game
+        self._index = game.spatial
+        self._bodies: dict[int, _body] = {}
+        self._order = 0
+        # (order, order) -> (sprite, other) of the pairs which overlapped on the previous update
+        self._contacts: dict[tuple[int, int], tuple[Any, Any]] = {}
+
+    def add(self, sprite: Any, layer: int = 1, mask: int = ALL):
+        """
+        Add a sprite to collision detection, or change the layer and mask of a sprite already added.
+
+        Args:
+            sprite (Sprite | CompoundSprite): the sprite
+            layer (int): the bits of the layers the sprite is on, defaults to layer 1
+            mask (int): the bits of the layers the sprite collides with, defaults to all layers
+        """
+        body = self._bodies.get(id(sprite))
+        if body is not None:
+            body.layer = layer
+            body.mask = mask
+            return
+        self._order += 1
+        self._bodies[id(sprite)] = _body(sprite, layer, mask, self._order)
+
+    def remove(self, sprite: Any):
+        """Remove a sprite from collision detection, `Signals.COLLISION.EXIT` is sent for any sprites it overlaps"""
+        body = self._bodies.pop(id(sprite), None)
+        if body is None:
+            return
+        for key in [ k for k in self._contacts if body.order in k ]:
+            Signals.send_with(Signals.COLLISION.EXIT, self._game, self._contacts.pop(key))
+
+    def colliding_with(self, sprite: Any) -> list[Any]:
+        """Return the sprites which overlapped `sprite` on the last update"""
+        body = self._bodies.get(id(sprite))
+        if body is None:
+            return []
+        return [ b if a is sprite else a for (a, b) in self._contacts.values() if a is sprite or b is sprite ]
+
+    def is_colliding(self, sprite: Any, other: Any) -> bool:
+        """Return True if `sprite` and `other` overlapped on the last update"""
+        a = self._bodies.get(id(sprite))
+        b = self._bodies.get(id(other))
+        if a is None or b is None:
+            return False
+        return _pair_key(a, b) in self._contacts
+
+    def __contains__(self, sprite: Any) -> bool:
+        return id(sprite) in self._bodies
+
+    def _clear_all(self):
+        self._bodies.clear()
+        self._contacts.clear()
+
+    def _update(self):
+        bodies = self._bodies
+        contacts: dict[tuple[int, int], tuple[Any, Any]] = {}
+        checked: set[tuple[int, int]] = set()
+
+        for cell in self._index._cells.values():
+            if len(cell) < 2:
+                continue
+            in_cell = [ bodies[k] for k in cell if k in bodies ]
+            count = len(in_cell)
+            for i in range(count - 1):
+                a = in_cell[i]
+                for j in range(i + 1, count):
+                    b = in_cell[j]
+                    if not (a.layer & b.mask and b.layer & a.mask):
+                        continue
+                    key = _pair_key(a, b)
+                    if key in checked:
+                        continue # The pair share more than one cell
+                    checked.add(key)
+                    if _overlaps(a.sprite, b.sprite):
+                        contacts[key] = (a.sprite, b.sprite) if a.order < b.order else (b.sprite, a.sprite)
+
+        # Listeners may remove sprites, a pair is only announced while both of its sprites are still added
+        # and self._contacts only ever holds pairs which have been announced
+        previous = self._contacts
+        self._contacts = { k: p for k, p in contacts.items() if k in previous }
+
+        for key, pair in previous.items():
+            if key not in contacts:
+                Signals.send_with(Signals.COLLISION.EXIT, self._game, pair)
+        for key, pair in contacts.items():
+            if key in previous:
+                if key in self._contacts:
+                    Signals.send_with(Signals.COLLISION.STAY, self._game, pair)
+            elif id(pair[0]) in bodies and id(pair[1]) in bodies:
+                self._contacts[key] = pair
+                Signals.send_with(Signals.COLLISION.ENTER, self._game, pair)
+
+def _pair_key(a: _body, b: _body) -> tuple[int, int]:
+    return (a.order, b.order) if a.order < b.order else (b.order, a.order)
+
+def _overlaps(sprite: Any, other: Any) -> bool:
+    p = sprite._position
+    q = other._position
+    return (p._x < q._x + other._width and q._x < p._x + sprite._width and
+            p._y < q._y + other._height and q._y < p._y + sprite._height)
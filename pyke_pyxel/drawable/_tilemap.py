@@ -1,35 +1,73 @@
+from collections import OrderedDict
+import math
 import pyxel
 
 from pyke_pyxel import coord, GameSettings
 
+# The width and height in pixels of the chunks the world is drawn in
+_CHUNK_SIZE = 128
+
 class TileMap:
+    """
+    A tilemap pattern repeated across the world.
+
+    The world is drawn in square chunks, each chunk is rendered into an image the first time it comes into view and
+    the images are kept in a least-recently-used cache, so only the chunks around the camera are held in memory.
+    """
 
     def __init__(self, resource_position: coord, tiles_wide: int, tiles_high: int, resource_index: int, settings: GameSettings):
         super().__init__()
-        screen_width = settings.size.window
-        screen_height = settings.size.window
-        
-        # Cache the rendered map into an image
-        repeat_cols = (screen_width // (tiles_wide * settings.size.tile)) + 1
-        repeat_rows = (screen_height // (tiles_high * settings.size.tile)) + 1
-
-        tm = pyxel.tilemaps[resource_index]
-        tm_x = resource_position.x
-        tm_y = resource_position.y
-        tm_w = tiles_wide * settings.size.tile
-        tm_h = tiles_high * settings.size.tile
-
-        self._img = pyxel.Image(screen_width, screen_height)
-        for col in range(repeat_cols):
-            for row in range(repeat_rows):
-                x = col * tm_w
-                y = row * tm_h
-
-                self._img.bltm(x, y, tm, tm_x, tm_y, tm_w, tm_h, settings.colours.sprite_transparency)
-
-    def _draw(self, settings: GameSettings):
-        screen_width = settings.size.window
-        screen_height = settings.size.window
-    
-        pyxel.blt(0, 0, self._img, 0, 0, screen_width, screen_height, settings.colours.sprite_transparency)
-    
\ No newline at end of file
+        self._tm = pyxel.tilemaps[resource_index]
+        self._tm_x = resource_position.x
+        self._tm_y = resource_position.y
+        self._tm_w = tiles_wide * settings.size.tile
+        self._tm_h = tiles_high * settings.size.tile
+        self._colkey = settings.colours.sprite_transparency
+
+        self._world = settings.size.world_size
+        self._chunk_size = min(_CHUNK_SIZE, self._world)
+        self._chunks_wide = math.ceil(self._world / self._chunk_size)
+
+        # Enough chunks to cover the window twice over, so panning back and forth does not re-render them
+        per_side = math.ceil(settings.size.window / self._chunk_size) + 1
+        self._max_chunks = per_side * per_side * 2
+        self._chunks: OrderedDict[tuple[int, int], pyxel.Image] = OrderedDict()
+
+    def _draw(self, settings: GameSettings, view: tuple[int, int, int, int], target: pyxel.Image|None = None):
+        """Draw the chunks within `view` (x, y, width, height), at their position in the world"""
+        canvas = pyxel if target is None else target
+        size = self._chunk_size
+        x, y, width, height = view
+
+        from_col = max(x // size, 0)
+        to_col = min(math.ceil((x + width) / size), self._chunks_wide)
+        from_row = max(y // size, 0)
+        to_row = min(math.ceil((y + height) / size), self._chunks_wide)
+        for row in range(from_row, to_row):
+            for col in range(from_col, to_col):
+                canvas.blt(col * size, row * size, self._chunk(col, row), 0, 0, size, size, self._colkey)
+
+    def _chunk(self, col: int, row: int) -> pyxel.Image:
+        key = (col, row)
+        img = self._chunks.get(key)
+        if img is not None:
+            self._chunks.move_to_end(key)
+            return img
+
+        size = self._chunk_size
+        if len(self._chunks) >= self._max_chunks:
+            img = self._chunks.popitem(last=False)[1] # Re-use the image of the least recently drawn chunk
+            img.cls(0)
+        else:
+            img = pyxel.Image(size, size)
+
+        # Repeat the pattern over the chunk, offset by the position of the chunk in the world
+        x = col * size
+        y = row * size
+        for pattern_col in range(x // self._tm_w, (x + size - 1) // self._tm_w + 1):
+            for pattern_row in range(y // self._tm_h, (y + size - 1) // self._tm_h + 1):
+                img.bltm(pattern_col * self._tm_w - x, pattern_row * self._tm_h - y,
+                         self._tm, self._tm_x, self._tm_y, self._tm_w, self._tm_h, self._colkey)
+
+        self._chunks[key] = img
+        return img
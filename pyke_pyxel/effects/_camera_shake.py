@@ -1,12 +1,16 @@
-import pyxel
+from typing import TYPE_CHECKING
 
 from pyke_pyxel import GameSettings, DIRECTION
 from ._effect import _Effect
 
+if TYPE_CHECKING:
+    from pyke_pyxel.camera import Camera
+
 class _CameraShakeEffect(_Effect):
 
-    def __init__(self, duration: float, direction: DIRECTION, completion_signal: str|None = None):
+    def __init__(self, duration: float, direction: DIRECTION, camera: "Camera", completion_signal: str|None = None):
         super().__init__(completion_signal)
+        self._camera = camera
 
         fps = GameSettings.get().fps.game
         self._frames = round(duration * fps)
@@ -26,11 +30,11 @@ class _CameraShakeEffect(_Effect):
                 self._shake_y = 2
 
     def _do(self):
-        pyxel.camera(self._shake_x, self._shake_y)
+        self._camera._shake(self._shake_x, self._shake_y)
         self._shake_x *= -1
         self._shake_y *= -1
 
         self._frame_counter += 1
         if self._frame_counter >= self._frames:
-            pyxel.camera()
+            self._camera._shake(0, 0)
             self._complete()
\ No newline at end of file
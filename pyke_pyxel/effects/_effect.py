@@ -4,6 +4,7 @@ class _Effect:
     def __init__(self, completion_signal: str|None):
         self._completion_signal: str | None = completion_signal
         self._active = True
+        self._in_world = False # Drawn in world pixels under the camera, rather than in screen pixels
 
     def _complete(self):
         self._active = False
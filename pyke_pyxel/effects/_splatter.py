@@ -5,6 +5,7 @@ from ._effect import _Effect
 class _SplatterEffect(_Effect):
     def __init__(self, position: coord, colour: int):
         super().__init__(None)
+        self._in_world = True
         self._colour = colour
         self._position = position
         self._frame = 0
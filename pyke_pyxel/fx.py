@@ -1,3 +1,5 @@
+from typing import TYPE_CHECKING
+
 from ._types import coord, GameSettings, DIRECTION
 from .drawable import Image
 from .sprite import Sprite
@@ -9,6 +11,9 @@ from .effects._splatter import _SplatterEffect
 from .effects._scale_in_out import _ScaleInOutEffect
 from .effects._camera_shake import _CameraShakeEffect
 
+if TYPE_CHECKING:
+    from .camera import Camera
+
 class FX:
     """
     FX class for managing visual effects in the game, specifically circular wipe transitions that can open or close,
@@ -17,8 +22,9 @@ class FX:
     This class should be accessed through the `Game` instance via `game.fx`.
     """
 
-    def __init__(self, settings: GameSettings):
+    def __init__(self, settings: GameSettings, camera: "Camera"):
         self._settings = settings
+        self._camera = camera
         self._updates: list[_Effect] = []
         self._drawables: list[_Effect] = []
 
@@ -87,7 +93,7 @@ class FX:
             direction (DIRECTION): the direction to shake the camera in
             completion_signal (str|None): an optional signal to send once the effect is complete
         """
-        effect = _CameraShakeEffect(duration, direction, completion_signal)
+        effect = _CameraShakeEffect(duration, direction, self._camera, completion_signal)
         self._updates.append(effect)
 
     def _clear_all(self):
@@ -103,6 +109,10 @@ class FX:
     def _draw(self):
         # TODO - should FX have its own separate _update() so that FX are not updated if game.pause()?
         for effect in self._drawables:
+            if effect._in_world:
+                self._camera._draw_world()
+            else:
+                self._camera._draw_screen()
             effect._do()
             if not effect._active:
                 self._drawables.remove(effect)
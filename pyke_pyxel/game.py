@@ -1,9 +1,10 @@
 from typing import Optional
+from bisect import bisect_right
 import pyxel
 
 
 from ._types import GameSettings, coord, GameSettings
-from ._log import log_debug
+from ._log import log_debug, log_error
 from ._keyboard import Keyboard
 from .drawable._tilemap import TileMap
 from .signals import Signals
@@ -12,6 +13,10 @@ from .sprite import Sprite, CompoundSprite
 from .hud import HUD
 from .fx import FX
 from .timer import Timer
+from .spatial import SpatialIndex
+from .collisions import Collisions
+from .camera import Camera
+from .render import LAYER, RenderLayer, _DEFAULT_LAYERS, _in_view
 
 class Game:
     """
@@ -26,9 +31,10 @@ class Game:
         - 1.2 Mouse Events
     - 2 Lifecycle (if not paused)
         - 2.1 Timers
-        - 2.2 `GAME.UPDATE` signal
-        - 2.3 Internal sprite, HUD & FX status updates
-        - 2.4 Internal drawing routines
+        - 2.2 `Map.find_path_async` results and queued `Map.request_path` requests
+        - 2.3 `GAME.UPDATE` signal
+        - 2.4 Internal sprite, HUD & FX status updates
+        - 2.5 Internal drawing routines
     
     Signals:
     - `GAME.WILL_START`: Emitted before the game loop begins.
@@ -51,6 +57,7 @@ class Game:
         _settings.debug = settings.debug
         _settings.size.window = settings.size.window
         _settings.size.tile = settings.size.tile
+        _settings.size.world = settings.size.world
         _settings.fps.game = settings.fps.game
         _settings.fps.animation = settings.fps.animation
         _settings.colours.sprite_transparency = settings.colours.sprite_transparency
@@ -59,12 +66,54 @@ class Game:
         _settings.display.full_screen = settings.display.full_screen
         _settings.pathfinding.allow_diagonal = settings.pathfinding.allow_diagonal
         _settings.pathfinding.reduce_hugging = settings.pathfinding.reduce_hugging
+        _settings.pathfinding.engine = settings.pathfinding.engine
+        _settings.pathfinding.cache_size = settings.pathfinding.cache_size
+        _settings.pathfinding.cluster_size = settings.pathfinding.cluster_size
+        _settings.pathfinding.frame_budget_ms = settings.pathfinding.frame_budget_ms
+        _settings.pathfinding.deferred = settings.pathfinding.deferred
+        _settings.pathfinding.workers = settings.pathfinding.workers
+        _settings.cell_auto.processes = settings.cell_auto.processes
+        _settings.cell_auto.bands = settings.cell_auto.bands
+        _settings.cell_auto.seed = settings.cell_auto.seed
         _settings.mouse_enabled = settings.mouse_enabled
 
 
         self._settings = settings
 
         self._sprites: list[Sprite|CompoundSprite] = []
+        # sprite id -> index in self._sprites
+        self._sprite_slots: dict[int, int] = {}
+        # The ids of the sprites to remove from self._sprites at the end of the update
+        self._sprites_to_remove: set[int] = set()
+        # sprite id -> collision (layer, mask) of the sprites to remove, restored if they are added back in the update
+        self._removed_bodies: dict[int, tuple[int, int]] = {}
+
+        # The render layers, in drawing order
+        self._layers: list[RenderLayer] = []
+        self._layers_by_name: dict[str, RenderLayer] = {}
+        for name, z, static in _DEFAULT_LAYERS:
+            self.add_layer(name, z, static)
+        # sprite id -> the layer the sprite is drawn in and its key within the layer
+        self._sprite_layers: dict[int, tuple[RenderLayer, tuple[int, int]]] = {}
+        self._sprite_order = 0
+
+        # The static layers, and the tilemap, are baked into one image which is re-baked when they change, see _bake_static()
+        self._bake_tilemap = True
+        self._static_img: pyxel.Image|None = None
+        self._static_tilemap = False # Whether the tilemap is in self._static_img
+        self._static_layers: list[RenderLayer] = []
+        self._static_ids: set[int] = set()
+        self._static_live: list[Sprite|CompoundSprite] = [] # The sprites of the static layers which are animating
+        self._static_live_ids: set[int] = set()
+        self._static_state: tuple = ()
+        self._static_dirty = True
+        self._spatial = SpatialIndex(settings.size.tile)
+        self._spatial._on_update = self._sprite_moved
+
+        # The rectangle (x, y, width, height) of the world which is drawn, sprites outside of it are culled
+        self._camera = Camera(settings)
+        self._view = self._camera.view
+        self._culled = 0
         self._frames_per_animation_tick = round(settings.fps.game / settings.fps.animation)
         self._animation_tick = 0
 
@@ -75,6 +124,7 @@ class Game:
         self._hud: HUD|None = None
         self._fx: FX|None = None
         self._timer: Timer|None = None
+        self._collisions: Collisions|None = None
 
         self._keyboard = Keyboard()
 
@@ -118,9 +168,18 @@ class Game:
     def clear_all(self):
         """Clear all sprites, TileMap, HUD and FX"""
         self._sprites.clear()
+        self._sprite_slots.clear()
+        self._sprites_to_remove.clear()
+        self._removed_bodies.clear()
+        for layer in self._layers:
+            layer._clear()
+        self._sprite_layers.clear()
+        self._static_dirty = True
+        self._spatial.clear()
         self._sprite_id =0
 
         self._tile_map = None
+        self._camera._reset()
 
         if hud := self._hud:
             hud._clear_all()
@@ -131,21 +190,117 @@ class Game:
         if timer := self._timer:
             timer._clear_all()
 
-    def add_sprite(self, sprite: Sprite|CompoundSprite):
+        if collisions := self._collisions:
+            collisions._clear_all()
+
+    def add_sprite(self, sprite: Sprite|CompoundSprite, layer: str = LAYER.ACTORS, z: int = 0):
         """
         Add a sprite to the game's sprite collection.
+        Adding a sprite which has been removed in this update, and is yet to be compacted away, keeps it in the game,
+        in `layer` and with the collision layer and mask it had.
 
         Parameters:
             sprite (Sprite | CompoundSprite): The sprite object to add to the game.
                 Can be either a single Sprite or a CompoundSprite containing multiple sprites.
+            layer (str): The name of the render layer to draw the sprite in, defaults to `LAYER.ACTORS`
+            z (int): The drawing order of the sprite within the layer, sprites with the same `z` are drawn in the order they were added
         """
+        render_layer = self._layers_by_name.get(layer)
+        if render_layer is None:
+            log_error(f"Game.add_sprite() invalid layer:{layer}")
+            return
+
+        if self._sprite_at(sprite._id) is sprite:
+            if sprite._id in self._sprites_to_remove:
+                self._sprites_to_remove.discard(sprite._id)
+                self._spatial.insert(sprite)
+                if body := self._removed_bodies.pop(sprite._id, None):
+                    self.collisions.add(sprite, *body)
+                self.set_sprite_layer(sprite, layer, z)
+            return
+
         self._sprite_id += 1
         sprite._id = self._sprite_id
+        self._sprite_slots[sprite._id] = len(self._sprites)
         self._sprites.append(sprite)
+        self._spatial.insert(sprite)
+        self._insert_in_layer(sprite, render_layer, z)
+        if render_layer.static:
+            self._static_dirty = True
+
+    def set_sprite_layer(self, sprite: Sprite|CompoundSprite, layer: str, z: int = 0):
+        """
+        Move a sprite which has been added to the game to another render layer, or to another `z` within its layer.
+
+        Parameters:
+            sprite (Sprite | CompoundSprite): The sprite to move.
+            layer (str): The name of the render layer to draw the sprite in
+            z (int): The drawing order of the sprite within the layer
+        """
+        render_layer = self._layers_by_name.get(layer)
+        if render_layer is None:
+            log_error(f"Game.set_sprite_layer() invalid layer:{layer}")
+            return
+        current = self._sprite_layers.get(sprite._id)
+        if current is None or self._sprite_at(sprite._id) is not sprite:
+            log_error(f"Game.set_sprite_layer() sprite {sprite._id} has not been added")
+            return
+
+        current[0]._remove(sprite, current[1])
+        self._insert_in_layer(sprite, render_layer, z)
+        if current[0].static or render_layer.static:
+            self._static_dirty = True
+
+    def add_layer(self, name: str, z: int, static: bool = False) -> RenderLayer|None:
+        """
+        Add a render layer, drawn above the layers with a lower `z`.
+        Every game starts with the layers of `LAYER`: background (0), static (100), actors (200), projectiles (300) and overlay (400).
+
+        Parameters:
+            name (str): The name of the layer
+            z (int): The drawing order of the layer, layers with the same `z` are drawn in the order they were added
+            static (bool): Whether the sprites of the layer are baked into a single image, see `invalidate_static`
+
+        Returns:
+            RenderLayer: the new layer, or None if a layer with the name already exists
+        """
+        if name in self._layers_by_name:
+            log_error(f"Game.add_layer() layer:{name} already exists")
+            return None
+
+        layer = RenderLayer(name, z, static)
+        index = bisect_right([ l.z for l in self._layers ], z)
+        self._layers.insert(index, layer)
+        self._layers_by_name[name] = layer
+        return layer
+
+    def layer(self, name: str) -> RenderLayer|None:
+        """Returns the render layer with the name, or None if there is none"""
+        return self._layers_by_name.get(name)
+
+    def invalidate_static(self):
+        """
+        Re-bake the static layers before the next draw.
+
+        The sprites of the static layers which are not animating are baked, together with the tilemap, into a single
+        image which is drawn with one blt. The image is re-baked automatically when a sprite is added to, removed from
+        or moved within those layers, or when a layer's `static` or `visible` changes. Call this after changing the frame,
+        rotation, scale or colours of a baked sprite, or after starting an animation on one.
+        """
+        self._static_dirty = True
+
+    def _insert_in_layer(self, sprite: Sprite|CompoundSprite, layer: RenderLayer, z: int):
+        self._sprite_order += 1
+        key = (z, self._sprite_order)
+        layer._insert(sprite, key)
+        self._sprite_layers[sprite._id] = (layer, key)
 
     def remove_sprite(self, sprite: Sprite|CompoundSprite|int):
         """
         Remove a sprite from the game's active sprite collection.
+
+        The sprite is removed from `spatial` and `collisions` immediately, it is drawn and animated
+        until the end of the current update, when all of the removed sprites are compacted away at once.
         
         Parameters:
         sprite : Sprite | CompoundSprite
@@ -157,31 +312,37 @@ class Game:
             self.remove_sprite_by_id(sprite)
             return
 
-        # TODO
-        # for both here, in remove_sprite_by_id and _sprite_removed
-        # it might be cleaner to mark sprite._to_be_removed = True
-        # and then removing them in update()
-        #
-        if sprite in self._sprites:
-            self._sprites.remove(sprite)
+        if self._sprite_at(sprite._id) is sprite:
+            self._mark_removed(sprite)
             # log_debug(f"GAME.remove_sprite() {sprite.name} {sprite._id}")
 
     def remove_sprite_by_id(self, sprite_id: int):
-        """Remove the first sprite with the specified identifier from the game's sprite list.
+        """Remove the sprite with the specified identifier from the game's sprite list, see `remove_sprite`.
 
         Parameters:
         sprite_id : int
             The identifier of the sprite to remove.
         """
+        if match := self._sprite_at(sprite_id):
+            self._mark_removed(match)
 
-        match = next((s for s in self._sprites if s._id == sprite_id), None)
-        if match:
-            self._sprites.remove(match)
+    def _sprite_at(self, sprite_id: int) -> Sprite|CompoundSprite|None:
+        slot = self._sprite_slots.get(sprite_id)
+        if slot is None:
+            return None
+        return self._sprites[slot]
 
-        # for s in self._sprites:
-        #    if s._id == sprite_id:
-        #        self._sprites.remove(s)
-        #        return
+    def _mark_removed(self, sprite: Sprite|CompoundSprite):
+        if sprite._id in self._sprites_to_remove:
+            return
+        self._sprites_to_remove.add(sprite._id)
+        self._spatial.remove(sprite)
+        if sprite._id in self._static_ids or sprite._id in self._static_live_ids:
+            self._static_dirty = True
+        if collisions := self._collisions:
+            if body := collisions._bodies.get(id(sprite)):
+                self._removed_bodies[sprite._id] = (body.layer, body.mask)
+            collisions.remove(sprite)
 
     def set_tilemap(self, resource_position: coord, tiles_wide: int, tiles_high: int, resource_tilemap_index: int = 0):
         """
@@ -204,6 +365,7 @@ class Game:
             The index of the tilemap in the resource bundle
         """
         self._tile_map = TileMap(resource_position, tiles_wide, tiles_high, resource_tilemap_index, self._settings)
+        self._static_dirty = True
         # log_debug(f"GAME.add_tilemap() at {resource_position.x},{resource_position.y} size {tiles_wide}x{tiles_high}")
 
     def pause(self):
@@ -251,14 +413,36 @@ class Game:
     def fx(self) -> FX:
         """Returns the `FX` instance for this game"""
         if self._fx is None:
-            self._fx = FX(self._settings)
+            self._fx = FX(self._settings, self._camera)
         return self._fx
     
+    @property
+    def camera(self) -> Camera:
+        """Returns the `Camera` instance for this game"""
+        return self._camera
+
     @property
     def keyboard(self) -> Keyboard:
         """Returns the `Keyboard` instance for this game"""
         return self._keyboard
     
+    @property
+    def spatial(self) -> SpatialIndex:
+        """Returns the `SpatialIndex` of this game's sprites, which is kept up to date as sprites are added, moved and removed"""
+        return self._spatial
+
+    @property
+    def culled_sprites(self) -> int:
+        """Returns the number of sprites which were not drawn in the last frame because they were outside of the view"""
+        return self._culled
+
+    @property
+    def collisions(self) -> Collisions:
+        """Returns the `Collisions` instance of this game"""
+        if self._collisions is None:
+            self._collisions = Collisions(self)
+        return self._collisions
+
     @property
     def timer(self) -> Timer:
         """Returns the `Timer` instance of this game"""
@@ -274,6 +458,7 @@ class Game:
 
         Signals:
             - GAME.UPDATE: Sent every update.
+            - COLLISION.ENTER, COLLISION.STAY, COLLISION.EXIT: Sent after GAME.UPDATE for the sprites added to `collisions`.
             - MOUSE.MOVE: Emitted when mouse position changes (if mouse_enabled).
             - MOUSE.DOWN: Emitted on left mouse button press (if mouse_enabled).
             - MOUSE.UP: Emitted on left mouse button release (if mouse_enabled).
@@ -296,20 +481,34 @@ class Game:
                 Signals.send(Signals.MOUSE.UP, self)
 
         if self._paused:
+            self._remove_sprites()
             return
         
         self._update_timer()
 
+        self._update_map()
+
         Signals.send(Signals.GAME.UPDATE, self)
 
+        self._update_collisions()
+
         self._update_fx()
 
         self._update_animations()
 
+        self._remove_sprites()
+
     def _update_timer(self):
         if timer := self._timer:
             timer._update()
 
+    def _update_map(self):
+        self._map._update()
+
+    def _update_collisions(self):
+        if collisions := self._collisions:
+            collisions._update()
+
     def _update_fx(self):
         if self._fx and self._fx.requires_update:
             self._fx._update()
@@ -319,10 +518,39 @@ class Game:
             self._animation_tick += 1
         else:
             self._animation_tick = 0
-            for sprite in self._sprites:
-                if isinstance(sprite, Sprite):
-                    sprite._update_frame()
-                # TODO support CompoundSprite animations?
+            for layer in self._layers:
+                if not layer.updates:
+                    continue
+                for sprite in layer._sprites:
+                    if isinstance(sprite, Sprite):
+                        sprite._update_frame()
+                    # TODO support CompoundSprite animations?
+
+    def _remove_sprites(self):
+        """Compact the removed sprites out of the sprite list, keeping the drawing order of the rest"""
+        to_remove = self._sprites_to_remove
+        if not to_remove:
+            return
+
+        sprites = self._sprites
+        slots = self._sprite_slots
+        first = min(slots.pop(sprite_id) for sprite_id in to_remove)
+        kept = first
+        for index in range(first, len(sprites)):
+            sprite = sprites[index]
+            if sprite._id in to_remove:
+                continue
+            sprites[kept] = sprite
+            slots[sprite._id] = kept
+            kept += 1
+        del sprites[kept:]
+
+        layers = { id(self._sprite_layers.pop(sprite_id)[0]) for sprite_id in to_remove }
+        for layer in self._layers:
+            if id(layer) in layers:
+                layer._remove_ids(to_remove)
+        to_remove.clear()
+        self._removed_bodies.clear()
 
     def _draw(self):    
         """
@@ -341,19 +569,126 @@ class Game:
         self._draw_fx()
 
     def _draw_background(self):
+        camera = self._camera
+        camera._update()
+        self._view = camera.view
+        camera._draw_world()
+
         pyxel.cls(self._settings.colours.background)
 
-        if self._tile_map:
-            self._tile_map._draw(self._settings)
+        self._bake_static()
+        if self._static_tilemap and self._static_img is not None:
+            size = self._settings.size.window
+            pyxel.blt(0, 0, self._static_img, 0, 0, size, size)
+        elif self._tile_map:
+            self._tile_map._draw(self._settings, self._view)
 
     def _draw_map_debug(self):
-        self._map._draw_debug(self._settings)
+        self._map._draw_debug(self._settings, self._view)
 
     def _draw_sprites(self):
-        for sprite in self._sprites:
-            sprite._draw(self._settings)
+        settings = self._settings
+        if self._static_img is not None and not self._static_tilemap:
+            size = settings.size.window
+            pyxel.blt(0, 0, self._static_img, 0, 0, size, size, settings.colours.sprite_transparency)
+
+        layers = [layer for layer in self._layers[len(self._static_layers):] if layer.visible]
+
+        # A world which fits the window is always in view, so every sprite is drawn
+        if settings.size.world_size <= settings.size.window:
+            for sprite in self._static_live:
+                sprite._draw(settings)
+            for layer in layers:
+                for sprite in layer._sprites:
+                    sprite._draw(settings)
+            self._culled = 0
+            return
+
+        # Otherwise the sprites outside the view are culled, with the spatial index when it has fewer cells to
+        # visit than there are sprites to check, along with any scaled or rotated into the view
+        view = self._view
+        spatial = self._spatial
+        count = len(self._static_live) + sum(len(layer._sprites) for layer in layers)
+        c0, r0, c1, r1 = spatial._span(*view)
+        indexed: set[int]|None = None
+        if count > (c1 - c0 + 1) * (r1 - r0 + 1):
+            indexed = { id(sprite) for sprite in spatial.query_rect(*view) }
+
+        culled = 0
+        for sprite in self._static_live:
+            if _in_view(sprite, view, indexed):
+                sprite._draw(settings)
+            else:
+                culled += 1
+
+        for layer in layers:
+            for sprite in layer._sprites:
+                if _in_view(sprite, view, indexed):
+                    sprite._draw(settings)
+                else:
+                    culled += 1
+        self._culled = culled
+
+    def _sprite_moved(self, sprite: Sprite|CompoundSprite):
+        if sprite._id in self._static_ids:
+            self._static_dirty = True
+
+    def _bake_static(self):
+        """
+        Bake the sprites of the static layers below every other layer, and the tilemap, into self._static_img.
+        Sprites which are animating are not baked, they are drawn every frame above the baked image.
+        """
+        state = tuple((layer.static, layer.visible) for layer in self._layers)
+        if not self._static_dirty and state == self._static_state:
+            return
+        self._static_dirty = False
+        self._static_state = state
+
+        settings = self._settings
+        layers: list[RenderLayer] = []
+        # The baked image covers the window, in a world larger than the window the static layers are culled like the rest
+        fits = settings.size.world_size <= settings.size.window
+        if fits:
+            for layer in self._layers:
+                if not layer.static:
+                    break
+                layers.append(layer)
+        self._static_layers = layers
+
+        baked: list[Sprite|CompoundSprite] = []
+        self._static_live = []
+        for layer in layers:
+            if not layer.visible:
+                continue
+            for sprite in layer._sprites:
+                if isinstance(sprite, CompoundSprite) or (isinstance(sprite, Sprite) and sprite._animation is None):
+                    baked.append(sprite)
+                else:
+                    self._static_live.append(sprite)
+        self._static_ids = { sprite._id for sprite in baked }
+        self._static_live_ids = { sprite._id for sprite in self._static_live }
+
+        tile_map = self._tile_map if self._bake_tilemap and fits else None
+        if not baked and tile_map is None:
+            self._static_img = None
+            self._static_tilemap = False
+            return
+
+        if self._static_img is None:
+            self._static_img = pyxel.Image(settings.size.window, settings.size.window)
+        img = self._static_img
+        if tile_map is not None:
+            img.cls(settings.colours.background)
+            tile_map._draw(settings, self._view, img)
+        else:
+            img.cls(settings.colours.sprite_transparency)
+        for sprite in baked:
+            sprite._draw(settings, img)
+        self._static_tilemap = tile_map is not None
 
     def _draw_hud(self):
+        # The HUD, and the FX drawn after it, are in screen pixels
+        self._camera._draw_screen()
         if hud := self._hud:
             hud._draw(self._settings)
 
@@ -1,6 +1,7 @@
 from ._types import GameSettings
 from .drawable import Drawable, Image, Button, Rect
 from .sprite import CompoundSprite, Sprite, TextSprite
+from .render import _in_view
 
 class HUD:
    """
@@ -85,8 +86,11 @@ class HUD:
       for i in self._bg:
           i._draw(settings)
 
+      # The HUD is drawn in screen space, sprites moved off the screen are skipped
+      screen = (0, 0, settings.size.window, settings.size.window)
       for s in self._sprites:
-         s._draw(settings)
+         if _in_view(s, screen):
+            s._draw(settings)
 
       for b in self._buttons:
          b._draw(settings)
@@ -1,6 +1,7 @@
 
 from dataclasses import dataclass
 import enum
+from typing import Callable
 
 import math
 import random
@@ -8,7 +9,7 @@ import pyxel
 
 from ._log import log_debug, log_error
 from ._types import GameSettings, coord, area
-from ._path_grid import _PathGrid
+from ._path_grid import _PathGrid, FlowField, DistanceMap, PathRequest
 from .sprite import Sprite, OpenableSprite
     
 class LOCATION_STATUS(enum.Enum):
@@ -45,10 +46,10 @@ class Map:
         self._grid: list[ list[MapLocation] ] = []
 
         self._edgeLocation = MapLocation(None, LOCATION_STATUS.BLOCKED, is_edge=True)
-        self._width = size.window
-        self._height = size.window
-        self._cols = math.floor(size.window / size.tile)
-        self._rows = math.floor(size.window / size.tile)
+        self._width = size.world_size
+        self._height = size.world_size
+        self._cols = math.floor(size.world_size / size.tile)
+        self._rows = math.floor(size.world_size / size.tile)
 
         self._path_grid = _PathGrid(self._cols, self._rows)
 
@@ -304,6 +305,151 @@ class Map:
 
         return self._path_grid.find_path(frm, to, allow_diagonal)
 
+    def find_paths(self, sources: list[coord], to: coord, allow_diagonal: bool|None = None) -> list[list[coord]|None]:
+        """ 
+            Find the paths from many locations to a single location, for example from every spawn point to a base.
+
+            All of the paths are found with one search outwards from `to`, rather than one search per source.
+
+            Args:
+                sources (list[coord]): The starting locations
+                to (coord): The ending location
+                allow_diagonal (bool, optional): Whether to allow diagonal movement.
+
+            Returns:
+                list[list[coord]|None]: The path from each of `sources`, in the same order, or `None` where no path exists.
+        """
+        if self.is_blocked(to):
+            log_error(f"Map.find_paths() cannot find paths to blocked location {to}")
+            return [None] * len(sources)
+
+        for frm in sources:
+            if self.is_blocked(frm):
+                log_error(f"Map.find_paths() cannot find path from blocked location {frm}")
+
+        return self._path_grid.find_paths(sources, to, allow_diagonal)
+
+    def distances_from(self, frm: coord, allow_diagonal: bool|None = None) -> DistanceMap|None:
+        """
+            Return the path costs from a location to every other location, for example from the player to every enemy.
+
+            The distance map is computed with one search and is only recomputed after the map's blocked/open locations change, 
+            see `DistanceMap.distance_to` and `DistanceMap.path_to`.
+
+            Args:
+                frm (coord): The starting location
+                allow_diagonal (bool, optional): Whether to allow diagonal movement.
+
+            Returns:
+                DistanceMap: The distances from `frm` or `None` if `frm` is blocked.
+        """
+        if self.is_blocked(frm):
+            log_error(f"Map.distances_from() cannot find distances from blocked location {frm}")
+            return None
+
+        return self._path_grid.distances_from(frm, allow_diagonal)
+
+    def flow_field(self, to: coord, allow_diagonal: bool|None = None) -> FlowField|None:
+        """
+            Return a flow field towards a target location.
+
+            Flow fields are cached per target and are only recomputed once the map's blocked/open locations change.
+            This makes them much cheaper than `find_path` when many actors are heading towards the same few targets, 
+            see `MovableActor.follow_flow_field`.
+
+            Args:
+                to (coord): The target location
+                allow_diagonal (bool, optional): Whether to allow diagonal movement.
+
+            Returns:
+                FlowField: The flow field towards `to` or `None` if `to` is blocked.
+        """
+        if self.is_blocked(to):
+            log_error(f"Map.flow_field() cannot create flow field to blocked location {to}")
+            return None
+
+        return self._path_grid.flow_field(to, allow_diagonal)
+
+    def request_path(self, frm: coord, to: coord, callback: Callable[[list[coord]|None], None], allow_diagonal: bool|None = None) -> PathRequest|None:
+        """
+            Queue a path request which is solved over the next frames rather than immediately.
+
+            Requests are worked through in order at the start of each update, for at most 
+            `GameSettings.pathfinding.frame_budget_ms` per frame, so that many or long searches do not stall a frame.
+
+            Args:
+                frm (coord): The starting location
+                to (coord): The ending location
+                callback (Callable[[list[coord]|None], None]): Called with the path, or `None` if no path exists, once the request is solved
+                allow_diagonal (bool, optional): Whether to allow diagonal movement.
+
+            Returns:
+                PathRequest: The queued request, which can be cancelled, or `None` if either location is blocked.
+        """
+        if self.is_blocked(frm):
+            log_error(f"Map.request_path() cannot find path from blocked location {frm}")
+            callback(None)
+            return None
+        
+        if self.is_blocked(to):
+            log_error(f"Map.request_path() cannot find path to blocked location {to}")
+            callback(None)
+            return None
+
+        return self._path_grid.request_path(frm, to, allow_diagonal, callback)
+
+    def find_path_async(self, frm: coord, to: coord, callback: Callable[[list[coord]|None], None]|None = None, allow_diagonal: bool|None = None) -> PathRequest|None:
+        """
+            Find a path on a background worker thread.
+
+            The search runs on a snapshot of the map, so it does not hold up the game loop. The result is handed back at the
+            start of a later update, by calling `callback` and sending `MAP.PATH_READY`. If the map's blocked/open locations 
+            changed while searching, the stale result is dropped and the search is repeated.
+
+            Args:
+                frm (coord): The starting location
+                to (coord): The ending location
+                callback (Callable[[list[coord]|None], None], optional): Called with the path, or `None` if no path exists
+                allow_diagonal (bool, optional): Whether to allow diagonal movement.
+
+            Returns:
+                PathRequest: The request, which can be cancelled, or `None` if either location is blocked.
+
+            Signals:
+                - MAP.PATH_READY: Emitted with the PathRequest as sender and the path, or `None`, as value
+        """
+        if self.is_blocked(frm):
+            log_error(f"Map.find_path_async() cannot find path from blocked location {frm}")
+            if callback:
+                callback(None)
+            return None
+        
+        if self.is_blocked(to):
+            log_error(f"Map.find_path_async() cannot find path to blocked location {to}")
+            if callback:
+                callback(None)
+            return None
+
+        return self._path_grid.find_path_async(frm, to, allow_diagonal, callback)
+
+    @property
+    def pending_path_requests(self) -> int:
+        """Number of `request_path` and `find_path_async` requests which are still pending"""
+        return len(self._path_grid._requests) + len(self._path_grid._async_requests)
+
+    def _update(self):
+        self._path_grid._update()
+
+    @property
+    def path_cache_hits(self) -> int:
+        """Number of `find_path` calls answered from the path cache"""
+        return self._path_grid._path_cache_hits
+
+    @property
+    def path_cache_misses(self) -> int:
+        """Number of `find_path` calls which required a new search"""
+        return self._path_grid._path_cache_misses
+
     @property
     def height(self) -> int:
         "Height of the map"
@@ -334,20 +480,29 @@ class Map:
         """Bottom-most `y` point of the map"""
         return self._height
 
-    def _draw_debug(self, settings: GameSettings):
+    def _draw_debug(self, settings: GameSettings, view: tuple[int, int, int, int]|None = None):
         size = settings.size.tile
 
-        for c in range(0, self._cols):
+        # Only the locations within the view (x, y, width, height) are drawn, labelled along its top and left edges
+        left, top = 0, 0
+        from_col, to_col = 0, self._cols
+        from_row, to_row = 0, self._rows
+        if view:
+            left, top, width, height = view
+            from_col, to_col = max(from_col, left // size), min(to_col, math.ceil((left + width) / size))
+            from_row, to_row = max(from_row, top // size), min(to_row, math.ceil((top + height) / size))
+
+        for c in range(from_col, to_col):
             x = c * size
-            pyxel.text(x, 0, str(c+1), settings.colours.debug)
+            pyxel.text(x, top, str(c+1), settings.colours.debug)
 
-            for r in range(0, self._rows):
+            for r in range(from_row, to_row):
                 location = self._grid[c][r]
                 if location.status == LOCATION_STATUS.BLOCKED:
                     
                     y = r * size
                     pyxel.rectb(x, y, size, size, settings.colours.debug)
 
-        for r in range(0, self._rows):
+        for r in range(from_row, to_row):
             y = r * size
-            pyxel.text(0, y, str(r+1), settings.colours.debug)
+            pyxel.text(left, y, str(r+1), settings.colours.debug)
@@ -0,0 +1,130 @@
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any
+
+@dataclass
+class LAYER:
+    """The names of the render layers every `Game` has, from the bottom up"""
+    BACKGROUND = "background"
+    STATIC = "static"
+    ACTORS = "actors"
+    PROJECTILES = "projectiles"
+    OVERLAY = "overlay"
+
+# (name, z, static) of the layers every Game starts with, leaving room for layers in between
+_DEFAULT_LAYERS = (
+    (LAYER.BACKGROUND, 0, True),
+    (LAYER.STATIC, 100, True),
+    (LAYER.ACTORS, 200, False),
+    (LAYER.PROJECTILES, 300, False),
+    (LAYER.OVERLAY, 400, False),
+)
+
+class RenderLayer:
+    """
+    A named group of sprites which are drawn together, layers with a higher `z` are drawn over those with a lower `z`.
+
+    Within a layer sprites are drawn in order of their own `z`, and sprites with the same `z` in the order they were added.
+    The sprites are kept in that order as they are added, using a binary search, so drawing never sorts.
+
+    Create layers with `Game.add_layer` and look them up with `Game.layer`.
+
+    Attributes:
+        name (str): the name of the layer
+        z (int): read-only, the position of the layer in the drawing order
+        visible (bool): whether the sprites of the layer are drawn, defaults to True
+        updates (bool): whether the animations of the sprites of the layer are updated, defaults to True
+        static (bool): whether the sprites of the layer are baked into a single image, see `Game.invalidate_static`.
+            Only the static layers below every other layer are baked. Defaults to True for `LAYER.BACKGROUND` and `LAYER.STATIC`
+    """
+    def __init__(self, name: str, z: int, static: bool = False):
+        self.name = name
+        self._z = z
+        self.visible = True
+        self.updates = True
+        self.static = static
+
+        # (sprite z, order added) of each sprite, parallel to self._sprites
+        self._keys: list[tuple[int, int]] = []
+        self._sprites: list[Any] = []
+
+    @property
+    def z(self) -> int:
+        return self._z
+
+    @property
+    def sprites(self) -> list[Any]:
+        """A copy of the sprites of the layer in drawing order"""
+        return list(self._sprites)
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def _insert(self, sprite: Any, key: tuple[int, int]):
+        index = bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._sprites.insert(index, sprite)
+
+    def _remove(self, sprite: Any, key: tuple[int, int]):
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._sprites[index] is sprite:
+            del self._keys[index]
+            del self._sprites[index]
+
+    def _remove_ids(self, sprite_ids: set[int]):
+        """Remove the sprites with any of `sprite_ids` in one pass, keeping the order of the rest"""
+        kept = 0
+        for index, sprite in enumerate(self._sprites):
+            if sprite._id in sprite_ids:
+                continue
+            self._sprites[kept] = sprite
+            self._keys[kept] = self._keys[index]
+            kept += 1
+        del self._sprites[kept:]
+        del self._keys[kept:]
+
+    def _clear(self):
+        self._keys.clear()
+        self._sprites.clear()
+
+# A rectangle (x, y, width, height) in pixels
+_Rect = tuple[float, float, float, float]
+
+def _draw_bounds(sprite: Any) -> _Rect:
+    """The rectangle covered when `sprite` is drawn, pyxel scales and rotates sprites around their center"""
+    position = sprite._position
+    width = sprite._width
+    height = sprite._height
+    scale = getattr(sprite, "scale", None)
+    rotation = getattr(sprite, "rotation", None)
+    if not scale and not rotation:
+        return (position._x, position._y, width, height)
+
+    half_width = width * (scale or 1) / 2
+    half_height = height * (scale or 1) / 2
+    if rotation:
+        angle = math.radians(rotation)
+        cos = abs(math.cos(angle))
+        sin = abs(math.sin(angle))
+        half_width, half_height = half_width * cos + half_height * sin, half_width * sin + half_height * cos
+
+    center_x = position._x + width / 2
+    center_y = position._y + height / 2
+    return (center_x - half_width, center_y - half_height, half_width * 2, half_height * 2)
+
+def _overlaps(rect: _Rect, other: _Rect) -> bool:
+    return (rect[0] < other[0] + other[2] and other[0] < rect[0] + rect[2] and
+            rect[1] < other[1] + other[3] and other[1] < rect[1] + rect[3])
+
+def _in_view(sprite: Any, view: _Rect, indexed: set[int]|None = None) -> bool:
+    """
+    Whether any part of `sprite` is drawn within `view`.
+    `indexed` is the ids of the sprites the SpatialIndex found in `view`, by their unscaled and unrotated bounding box,
+    which only sprites that are scaled or rotated need to be checked against `view` again.
+    """
+    if indexed is not None and id(sprite) in indexed:
+        return True
+    if indexed is not None and not getattr(sprite, "scale", None) and not getattr(sprite, "rotation", None):
+        return False
+    return _overlaps(_draw_bounds(sprite), view)
@@ -3,7 +3,8 @@ from typing import Callable
 from pyke_pyxel import GameSettings, DIRECTION, coord, log_debug, log_error
 from pyke_pyxel.sprite import Sprite, MovableSprite
 from pyke_pyxel.signals import Signals
-from pyke_pyxel.map import Map
+from pyke_pyxel.map import Map, FlowField, PathRequest
+from pyke_pyxel.render import LAYER
 
 from ._projectile import Projectile
 
@@ -54,7 +55,7 @@ class Actor:
         projectile = Projectile(sprite, speed_px_per_second, direction)
         self._projectiles.append(projectile)
         
-        Signals.send_add_sprite(sprite)
+        Signals.send_add_sprite(sprite, LAYER.PROJECTILES)
 
     def remove(self):
         """Remove this actor from the game"""
@@ -107,6 +108,8 @@ class MovableActor(Actor):
         self._px_counter = 0
         self._move_to: coord|None = None
         self._move_path: list[coord]|None = None
+        self._flow_field: FlowField|None = None
+        self._path_request: PathRequest|None = None
         self._blocked_by: coord|None = None
 
         # The direction in which the sprite is moving
@@ -135,10 +138,12 @@ class MovableActor(Actor):
 
         self._move_to = None
         self._move_path = None
+        self._flow_field = None
+        self._cancel_path_request()
         self._blocked_by = None
         self._px_counter = 0
 
-    def move_to(self, position: coord, pathfinder: Map|None = None, allow_diagonal: bool|None = None):
+    def move_to(self, position: coord, pathfinder: Map|None = None, allow_diagonal: bool|None = None, deferred: bool|None = None):
         """
         Move to the provided coordinate.
 
@@ -146,14 +151,26 @@ class MovableActor(Actor):
             position (coord): The coordinate to move to
             pathfinder (Map|None): the Map to use for pathfinding
             allow_diagonal (bool, optional): Whether to allow diagonal movement.
+            deferred (bool, optional): Whether to queue the path with `Map.request_path` rather than finding it immediately.
+                The actor starts moving, and `ACTOR.PATH_READY` is sent, once the path is ready. Defaults to `GameSettings.pathfinding.deferred`
+
+        Signals:
+            - ACTOR.PATH_READY: Emitted with the path, or `None`, when a deferred path is ready
         """
+        self._flow_field = None
+        self._cancel_path_request()
         if pathfinder:
-            self._move_path = pathfinder.find_path(self.position, position, allow_diagonal)
-            if self._move_path:
-                self._move_to = self._move_path.pop(0)
+            if deferred is None:
+                deferred = GameSettings.get().pathfinding.deferred
+
+            if deferred:
+                self._move_to = None
+                self._move_path = None
+                self._path_request = pathfinder.request_path(
+                    self.position, position, lambda path: self._path_ready(position, path), allow_diagonal
+                )
             else:
-                log_error(f"MovableActor.move_to() cannot find path from {self.position} to {position}")
-                self._move_to = position
+                self._follow_path(position, pathfinder.find_path(self.position, position, allow_diagonal))
         else:
             self._move_path = None
             self._move_to = position
@@ -161,6 +178,24 @@ class MovableActor(Actor):
         self.active_dir = None
         self._px_counter = 0
 
+    def _follow_path(self, position: coord, path: list[coord]|None):
+        self._move_path = path
+        if path:
+            self._move_to = path.pop(0)
+        else:
+            log_error(f"MovableActor.move_to() cannot find path from {self.position} to {position}")
+            self._move_to = position
+
+    def _path_ready(self, position: coord, path: list[coord]|None):
+        self._path_request = None
+        self._follow_path(position, list(path) if path else None)
+        Signals.send_with(Signals.ACTOR.PATH_READY, self, path)
+
+    def _cancel_path_request(self):
+        if request := self._path_request:
+            request.cancel()
+            self._path_request = None
+
     def move_along_path(self, path: list[coord]):
         """
         Move along the provided path.
@@ -170,16 +205,41 @@ class MovableActor(Actor):
         """
         self._move_path = path
         self._move_to = self._move_path.pop(0)
+        self._flow_field = None
+        self._cancel_path_request()
+        self.active_dir = None
+        self._px_counter = 0
+
+    def follow_flow_field(self, field: FlowField):
+        """
+        Move towards the target of a shared flow field, see `Map.flow_field`.
+        Each step is looked up from the flow field so the cost does not depend on how many actors follow it.
+
+        Args:
+            field (FlowField): The flow field to follow
+        """
+        self._move_path = None
+        self._cancel_path_request()
+        self._flow_field = field
+        self._move_to = field.next_step(self.position)
+        if not self._move_to:
+            if self.position.is_same_grid_location(field.target):
+                self._flow_field = None
+            else:
+                log_error(f"MovableActor.follow_flow_field() cannot find path from {self.position} to {field.target}")
+                self._flow_field = None
+                self._move_to = field.target
+
         self.active_dir = None
         self._px_counter = 0
 
     @property
     def is_moving(self) -> bool:
         """Return True if the actor is moving"""
-        return self.active_dir is not None or self._move_to is not None or self._move_path is not None
+        return self.active_dir is not None or self._move_to is not None or self._move_path is not None or self._flow_field is not None or self._path_request is not None
 
     def _update(self, map: Map):
-        if self.active_dir or self._move_to or self._move_path:
+        if self.active_dir or self._move_to or self._move_path or self._flow_field:
             if self._move(map):
                 pass
                 # TODO - if, in future we want to send this signal
@@ -218,7 +278,7 @@ class MovableActor(Actor):
         # The problem with checking collissions on a path is it breaks sprite.position.clone_towards() 
         # since the path allows corner-hopping
         # TODO - is this ok?
-        skip_collission_check = self._move_path is not None
+        skip_collission_check = self._move_path is not None or self._flow_field is not None
         
         if skip_collission_check or map.sprite_can_move_to(next_pos):
             self._sprite.set_position(next_pos)
@@ -255,6 +315,10 @@ class MovableActor(Actor):
                 self._move_to = self._move_path.pop(0)
                 if len(self._move_path) == 0:
                     self._move_path = None
+            elif field := self._flow_field: # Next step on the flow field
+                self._move_to = field.next_step(move_to)
+                if not self._move_to:
+                    self._flow_field = None
             else: # Done
                 self._move_to = None
 
@@ -33,6 +33,8 @@ class RPGGame(Game):
 
         self._actor_id = 0
         self._actors: list[Actor] = []
+        # id(sprite) -> actor, to find the actors of the sprites returned by the spatial index
+        self._sprite_actors: dict[int, Actor] = {}
         Signals.connect("enemy_added", self.add_actor)
         Signals.connect("enemy_removed", self.remove_actor)
         Signals.connect("actor_added", self.add_actor)
@@ -57,7 +59,7 @@ class RPGGame(Game):
 
         self._player = Player(sprite, speed_px_per_second)
 
-        self._sprites.append(sprite)
+        self.add_sprite(sprite)
 
         self.add_actor(self.player)
 
@@ -67,6 +69,7 @@ class RPGGame(Game):
         """Clear all sprites, TileMap, HUD and FX"""
         super().clear_all()
         self._actors.clear()
+        self._sprite_actors.clear()
         self.player = None # type: ignore
 
     def add_actor(self, actor: Actor):
@@ -79,6 +82,7 @@ class RPGGame(Game):
         self._actor_id += 1
         actor._id = self._actor_id
         self._actors.append(actor)
+        self._sprite_actors[id(actor._sprite)] = actor
 
     def remove_actor(self, actor: Actor):
         """
@@ -89,6 +93,8 @@ class RPGGame(Game):
         """
         if actor in self._actors:
             self._actors.remove(actor)
+            if self._sprite_actors.get(id(actor._sprite)) is actor:
+                del self._sprite_actors[id(actor._sprite)]
 
     def enemies_at(self, position: coord|area, tolerance: float = 0.0) -> list[Enemy]:
         """
@@ -100,17 +106,29 @@ class RPGGame(Game):
         Returns:
             list[Enemy]: the enemies that are at the provided position
         """
-        enemies: list[Enemy] = []
-
+        # The grid location of a position is rounded from its pixels, so look up the sprites within a tile
+        # either side of the location and then check each enemy's grid location exactly
         if isinstance(position, coord):
-            for actor in self._actors:
-                if isinstance(actor, Enemy) and actor.position.is_same_grid_location(position):
-                    enemies.append(actor)
+            size = position.size
+            x = (position._col - 2) * size
+            y = (position._row - 2) * size
+            width = height = size * 3
+            matches = position.is_same_grid_location
         else:
-            for actor in self._actors:
-                if isinstance(actor, Enemy) and position.contains(actor.position):
-                    enemies.append(actor)
+            size = position.tile_size
+            x = (position._from_col - 2) * size
+            y = (position._from_row - 2) * size
+            width = (position._to_col - position._from_col + 3) * size
+            height = (position._to_row - position._from_row + 3) * size
+            matches = position.contains
+
+        enemies: list[Enemy] = []
+        for sprite in self._spatial.query_rect(x, y, width, height):
+            actor = self._sprite_actors.get(id(sprite))
+            if isinstance(actor, Enemy) and matches(actor.position):
+                enemies.append(actor)
 
+        enemies.sort(key=lambda e: e._id)
         return enemies
 
     @property
@@ -129,10 +147,13 @@ class RPGGame(Game):
         self._keyboard._update(self)
 
         if self._paused:
+            self._remove_sprites()
             return
 
         self._update_timer()
 
+        self._update_map()
+
         Signals.send(Signals.GAME.UPDATE, self)
 
         to_remove: list[Actor] = []
@@ -145,7 +166,12 @@ class RPGGame(Game):
         for a in to_remove:
             # if a in self._actors: - should not be necessary
             self._actors.remove(a)
+            self._sprite_actors.pop(id(a._sprite), None)
+
+        self._update_collisions()
 
         self._update_fx()
 
-        self._update_animations()
\ No newline at end of file
+        self._update_animations()
+
+        self._remove_sprites()
\ No newline at end of file
@@ -3,6 +3,7 @@ from pyke_pyxel import coord
 from pyke_pyxel.map import Map
 from pyke_pyxel.sprite import Sprite, OpenableSprite, MovableSprite
 from pyke_pyxel.signals import Signals
+from pyke_pyxel.render import LAYER
 from .actor import Actor, MovableActor
 from .enemy import Enemy
 
@@ -27,7 +28,7 @@ class Room:
             sprite = sprite()
         sprite.set_position(coord(col, row))
         
-        Signals.send_add_sprite(sprite)
+        Signals.send_add_sprite(sprite, LAYER.STATIC)
 
         # TODO - should we check if there's an existing sprite at this col/row 
         # and then warn/replace the existing sprite?
@@ -13,12 +13,20 @@ class Signals:
         GAME: Dataclass containing game-level signal constants
             - WILL_START: Signal emitted before game initialization, Game instance is passed as the sender
             - UPDATE: Signal emitted on each game update cycle, Game instance is passed as the sender
+        COLLISION: Dataclass containing collision signal constants, see `Collisions`
+            - ENTER: Signal emitted when two sprites start to overlap, Game instance and a tuple (sprite, other) is passed
+            - STAY: Signal emitted on every update two sprites still overlap, Game instance and a tuple (sprite, other) is passed
+            - EXIT: Signal emitted when two sprites stop overlapping, Game instance and a tuple (sprite, other) is passed
+        MAP: Dataclass containing map signal constants
+            - PATH_READY: Signal emitted when a `Map.find_path_async` search is delivered, the PathRequest and the path (or `None`) is passed
         MOUSE: Dataclass containing mouse input signal constants
             - DOWN: Signal emitted on mouse button down, Game instance and a tuple (x, y) is passed
             - UP: Signal emitted on mouse button up
             - MOVE: Signal emitted on mouse movement, Game instance and a tuple (x, y) is passed
         
     RPG-Specific Attributes:   
+        ACTOR: Dataclass containing actor-related signal constants
+            - PATH_READY: Signal emitted when a deferred `MovableActor.move_to` path is ready, the actor and the path (or `None`) is passed
         PLAYER: Dataclass containing player-related signal constants
             - BLOCKED: Signal emitted when player movement is blocked
             - INTERACT_OPENABLE: Signal emitted when player can interact with openable objects
@@ -32,6 +40,16 @@ class Signals:
         WILL_START = "game_will_start"
         UPDATE = "game_update"
 
+    @dataclass
+    class COLLISION:
+        ENTER = "collision_enter"
+        STAY = "collision_stay"
+        EXIT = "collision_exit"
+
+    @dataclass
+    class MAP:
+        PATH_READY = "map_path_ready"
+
     @dataclass
     class MOUSE:
         DOWN = "mouse_down"
@@ -71,15 +89,19 @@ class Signals:
 
 
     @staticmethod
-    def send_add_sprite(sprite):
+    def send_add_sprite(sprite, layer: Optional[str] = None):
         """
         Globally-available signal to notify the game that a Sprite should been added to the game.
         This can be used as a loosely-coupled alternative to `Game.add_sprite`
 
         Args:
             sprite (Sprite | CompoundSprite ): The sprite to be added to the game.
+            layer (str, optional): The name of the render layer to draw the sprite in, defaults to `LAYER.ACTORS`
         """
-        signal("sprite_added").send(sprite)
+        if layer is None:
+            signal("sprite_added").send(sprite)
+        else:
+            signal("sprite_added").send(sprite, layer=layer)
 
     @staticmethod
     def send_remove_sprite(sprite):
@@ -94,6 +116,10 @@ class Signals:
 
 
     # TODO - the below are RPG-specific signals, move them
+    @dataclass
+    class ACTOR:
+        PATH_READY = "actor_path_ready"
+
     @dataclass
     class PLAYER:
         MOVED = "player_moved"
@@ -0,0 +1,259 @@
+import math
+from typing import Any, Callable, Optional
+
+from ._types import GameSettings, coord
+
+# (first column, first row, last column, last row) of the grid cells an item overlaps
+_Span = tuple[int, int, int, int]
+
+class SpatialIndex:
+    """
+    A uniform grid of the positions of sprites, or anything else with a `_position` coord and a `_width` and `_height`.
+
+    Each item is filed under every grid cell its bounding box overlaps, so queries only look at the items in the
+    cells they touch rather than at every item. Items are kept up to date automatically, both when they are moved
+    with `set_position` and when their position is moved in place with `coord.move_by`.
+
+    `Game` keeps an index of all of its sprites, see `Game.spatial`.
+
+    Args:
+        cell_size (int, optional): the size in pixels of a grid cell. Defaults to `GameSettings.size.tile`.
+    """
+    def __init__(self, cell_size: Optional[int] = None):
+        self._cell_size = cell_size or GameSettings.get().size.tile
+
+        self._cells: dict[tuple[int, int], dict[int, Any]] = {}
+        # id(item) -> (item, span, the coord being watched)
+        self._items: dict[int, tuple[Any, _Span|None, coord|None]] = {}
+        self._filed = 0
+        # Called with each item after it is filed or moves, Game uses this to notice static sprites moving
+        self._on_update: Callable[[Any], None]|None = None
+
+    def insert(self, item: Any):
+        """Add `item` to the index, an item without a position yet is filed once its position is set"""
+        if id(item) in self._items:
+            return
+        self._items[id(item)] = (item, None, None)
+        item._spatial = self
+        self._update(item)
+
+    def remove(self, item: Any):
+        """Remove `item` from the index"""
+        entry = self._items.pop(id(item), None)
+        if entry is None:
+            return
+        _, span, watched = entry
+        if span:
+            self._unfile(item, span)
+            self._filed -= 1
+        if watched is not None:
+            _unwatch(watched, item)
+        item._spatial = None
+
+    def clear(self):
+        """Remove every item from the index"""
+        for item, _, watched in self._items.values():
+            if watched is not None:
+                _unwatch(watched, item)
+            item._spatial = None
+        self._items.clear()
+        self._cells.clear()
+        self._filed = 0
+
+    def query_rect(self, x: int, y: int, width: int, height: int) -> list[Any]:
+        """
+        Return the items whose bounding box overlaps the rectangle with top-left (x, y) and size `width` x `height`.
+
+        Args:
+            x (int): the left of the rectangle in pixels
+            y (int): the top of the rectangle in pixels
+            width (int): the width of the rectangle in pixels
+            height (int): the height of the rectangle in pixels
+        """
+        if width <= 0 or height <= 0:
+            return []
+
+        found: list[Any] = []
+        for item in self._candidates(self._span(x, y, width, height)):
+            position = item._position
+            if (position._x < x + width and x < position._x + _width(item) and
+                    position._y < y + height and y < position._y + _height(item)):
+                found.append(item)
+        return found
+
+    def query_radius(self, x: int, y: int, radius: float) -> list[Any]:
+        """
+        Return the items whose center is within `radius` pixels of (x, y), closest first.
+
+        Args:
+            x (int): the x of the center in pixels
+            y (int): the y of the center in pixels
+            radius (float): the distance in pixels
+        """
+        if radius < 0:
+            return []
+
+        reach = math.floor(radius)
+        found: list[tuple[float, Any]] = []
+        for item in self._candidates(self._span(x - reach, y - reach, reach * 2 + 1, reach * 2 + 1)):
+            distance = _distance(item, x, y)
+            if distance <= radius:
+                found.append((distance, item))
+        found.sort(key=lambda f: f[0])
+        return [ item for _, item in found ]
+
+    def nearest(self, x: int, y: int, k: int = 1, max_distance: Optional[float] = None,
+                where: Optional[Callable[[Any], bool]] = None) -> list[Any]:
+        """
+        Return up to `k` items whose center is closest to (x, y), closest first.
+
+        The grid is searched in rings of cells outwards from (x, y), stopping as soon as no unsearched
+        cell could hold anything closer than the items already found.
+
+        Args:
+            x (int): the x in pixels
+            y (int): the y in pixels
+            k (int): the number of items to return
+            max_distance (float, optional): ignore items further than this from (x, y)
+            where (Callable[[Any], bool], optional): only return items for which this returns True
+        """
+        if k <= 0 or not self._cells:
+            return []
+
+        size = self._cell_size
+        cx = int(x // size)
+        cy = int(y // size)
+
+        found: list[tuple[float, Any]] = []
+        seen: set[int] = set()
+        ring = 0
+        while True:
+            for key in _ring_cells(cx, cy, ring):
+                for item_id, item in self._cells.get(key, {}).items():
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    if where and not where(item):
+                        continue
+                    distance = _distance(item, x, y)
+                    if max_distance is None or distance <= max_distance:
+                        found.append((distance, item))
+
+            # Anything in the cells beyond this ring is further than `searched`
+            searched = ring * size
+            found.sort(key=lambda f: f[0])
+            if len(found) >= k and found[k - 1][0] <= searched:
+                break
+            if len(seen) >= self._filed:
+                break
+            if max_distance is not None and searched >= max_distance:
+                break
+            ring += 1
+
+        return [ item for _, item in found[:k] ]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Any) -> bool:
+        return id(item) in self._items
+
+    @property
+    def cell_size(self) -> int:
+        """The size in pixels of a grid cell"""
+        return self._cell_size
+
+    def _update(self, item: Any):
+        """Re-file `item` after its position has changed"""
+        entry = self._items.get(id(item))
+        if entry is None:
+            return
+        _, span, watched = entry
+
+        position: coord|None = getattr(item, "_position", None)
+        if position is not watched:
+            if watched is not None:
+                _unwatch(watched, item)
+            if position is not None:
+                _watch(position, item)
+
+        new_span = None
+        if position is not None:
+            new_span = self._span(position._x, position._y, _width(item), _height(item))
+
+        if new_span != span:
+            if span:
+                self._unfile(item, span)
+                self._filed -= 1
+            if new_span:
+                self._file(item, new_span)
+                self._filed += 1
+        self._items[id(item)] = (item, new_span, position)
+
+        if self._on_update is not None:
+            self._on_update(item)
+
+    def _span(self, x: int, y: int, width: int, height: int) -> _Span:
+        size = self._cell_size
+        return (int(x // size), int(y // size), int((x + width - 1) // size), int((y + height - 1) // size))
+
+    def _file(self, item: Any, span: _Span):
+        key = id(item)
+        for col in range(span[0], span[2] + 1):
+            for row in range(span[1], span[3] + 1):
+                self._cells.setdefault((col, row), {})[key] = item
+
+    def _unfile(self, item: Any, span: _Span):
+        key = id(item)
+        for col in range(span[0], span[2] + 1):
+            for row in range(span[1], span[3] + 1):
+                cell = self._cells.get((col, row))
+                if cell is not None:
+                    cell.pop(key, None)
+                    if not cell:
+                        del self._cells[(col, row)]
+
+    def _candidates(self, span: _Span) -> list[Any]:
+        """The items filed in the cells of `span`, each listed once"""
+        candidates: dict[int, Any] = {}
+        for col in range(span[0], span[2] + 1):
+            for row in range(span[1], span[3] + 1):
+                cell = self._cells.get((col, row))
+                if cell:
+                    candidates.update(cell)
+        return list(candidates.values())
+
+def _ring_cells(cx: int, cy: int, ring: int) -> list[tuple[int, int]]:
+    """The cells at exactly `ring` cells (Chebyshev distance) from (cx, cy)"""
+    if ring == 0:
+        return [ (cx, cy) ]
+    cells = [ (col, cy - ring) for col in range(cx - ring, cx + ring + 1) ]
+    cells += [ (col, cy + ring) for col in range(cx - ring, cx + ring + 1) ]
+    cells += [ (cx - ring, row) for row in range(cy - ring + 1, cy + ring) ]
+    cells += [ (cx + ring, row) for row in range(cy - ring + 1, cy + ring) ]
+    return cells
+
+def _width(item: Any) -> int:
+    return max(getattr(item, "_width", 0), 1)
+
+def _height(item: Any) -> int:
+    return max(getattr(item, "_height", 0), 1)
+
+def _distance(item: Any, x: int, y: int) -> float:
+    position = item._position
+    return math.hypot(position._x + _width(item) / 2 - x, position._y + _height(item) / 2 - y)
+
+def _watch(position: coord, item: Any):
+    if position._watchers is None:
+        position._watchers = []
+    position._watchers.append(item)
+
+def _unwatch(position: coord, item: Any):
+    watchers = position._watchers
+    if watchers:
+        for i, w in enumerate(watchers):
+            if w is item:
+                del watchers[i]
+                break
+        if not watchers:
+            position._watchers = None
@@ -28,6 +28,9 @@ class CompoundSprite:
 
         self._img: pyxel.Image|None = None
 
+        # The SpatialIndex this sprite is filed in, see Game.spatial
+        self._spatial = None
+
     def fill(self, tile_cols: list[int], tile_rows: list[int]):
         """Fill the sprite with a grid of tiles, iterating over the provided columns and rows"""
 
@@ -107,16 +110,19 @@ class CompoundSprite:
         """Reset the colour replacement specified in `replace_colour`."""
         self._replace_colour = None
 
-    def _draw(self, settings: GameSettings):
+    def _draw(self, settings: GameSettings, target: pyxel.Image|None = None):
         # PERFORMANCE: use an in-memory pyxel Image to cache the rendered sprite
         # However, if we want to add animation to CompoundSprite does that mean that we need to store an Image per frame?
         if not self._img:
             self._img = self._render_image(settings)
+
+        # Draw to the screen unless a target image is given, pyxel and pyxel.Image share the drawing functions
+        canvas = pyxel if target is None else target
         
         if self._replace_colour:
-            pyxel.pal(self._replace_colour[0], self._replace_colour[1])
+            canvas.pal(self._replace_colour[0], self._replace_colour[1])
 
-        pyxel.blt(x=self.position.x, 
+        canvas.blt(x=self.position.x, 
                   y=self.position.y, 
                   img=self._img, 
                   u=0, 
@@ -130,7 +136,7 @@ class CompoundSprite:
                 case "rect":
                     x = self._position.x + g[1]
                     y = self._position.y + g[2]
-                    pyxel.rect(x,y,g[3],g[4],g[5])
+                    canvas.rect(x,y,g[3],g[4],g[5])
                 case "tri":
                     x1 = self._position.x + g[1]
                     y1 = self._position.y + g[2]
@@ -139,12 +145,12 @@ class CompoundSprite:
                     x3 = self._position.x + g[5]
                     y3 = self._position.y + g[6]
                     col = g[7]
-                    pyxel.tri(x1,y1,x2,y2,x3,y3,col)
+                    canvas.tri(x1,y1,x2,y2,x3,y3,col)
                 case _:
                     log_error(f"CompoundSprite.draw() invalid graphics type {g[0]}")
 
         if self._replace_colour:
-            pyxel.pal()
+            canvas.pal()
 
     def _render_image(self, settings: GameSettings) -> pyxel.Image:
         total_width = len(self.cols) * settings.size.tile
@@ -185,6 +191,8 @@ class CompoundSprite:
             position (coord): The new coordinate for the sprite's top-left corner.
         """
         self._position = position
+        if self._spatial is not None:
+            self._spatial._update(self)
 
     @property
     def position(self) -> coord:
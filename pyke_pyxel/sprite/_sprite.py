@@ -46,6 +46,9 @@ class Sprite:
 
         self._replace_colour: tuple[int,int]|None = None
 
+        # The SpatialIndex this sprite is filed in, see Game.spatial
+        self._spatial = None
+
     def add_animation(self, name: str, animation: Animation):
         """Add an animation to the sprite.
         
@@ -125,6 +128,8 @@ class Sprite:
                 s._position.move_by(diff[0], diff[1])
 
         self._position = position # .clone()
+        if self._spatial is not None:
+            self._spatial._update(self)
 
     def set_rotation(self, rotation: float|None):
         """Sets the rotation (in degrees) of the sprite."""
@@ -231,7 +236,9 @@ class Sprite:
         else:
             self.active_frame = self.default_frame
 
-    def _draw(self, settings: GameSettings):
+    def _draw(self, settings: GameSettings, target: pyxel.Image|None = None):
+        # Draw to the screen unless a target image is given, pyxel and pyxel.Image share the drawing functions
+        canvas = pyxel if target is None else target
         frame = self.active_frame
         position = self._position
 
@@ -241,9 +248,9 @@ class Sprite:
                 width *= -1
 
         if self._replace_colour:
-            pyxel.pal(self._replace_colour[0], self._replace_colour[1])
+            canvas.pal(self._replace_colour[0], self._replace_colour[1])
 
-        pyxel.blt(x=position.x,
+        canvas.blt(x=position.x,
                 y=position.y,
                 img=self._resource_image_index,
                 u=frame.x,
@@ -255,7 +262,7 @@ class Sprite:
                 colkey=settings.colours.sprite_transparency)
         
         if self._replace_colour:
-            pyxel.pal()
+            canvas.pal()
 
         # rp = self.rotated_position()
         # pyxel.circ(rp.x, rp.y, 1, 8)
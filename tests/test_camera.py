@@ -0,0 +1,71 @@
+import pytest
+
+from pyke_pyxel.camera import Camera
+from pyke_pyxel.sprite._sprite import Sprite
+from pyke_pyxel._types import coord
+
+
+@pytest.fixture
+def world(reset_game_settings):
+    reset_game_settings.size.world = 800
+    return reset_game_settings
+
+
+class TestCamera:
+    """Tests for moving the camera over the world."""
+
+    def test_world_size_defaults_to_the_window(self, reset_game_settings):
+        assert reset_game_settings.size.world_size == 160
+
+        reset_game_settings.size.world = 800
+        assert reset_game_settings.size.world_size == 800
+
+    def test_starts_at_the_origin(self, world):
+        camera = Camera(world)
+
+        assert camera.view == (0, 0, 160, 160)
+
+    def test_move_to_is_clamped_to_the_world(self, world):
+        camera = Camera(world)
+
+        camera.move_to(100, 200)
+        assert (camera.x, camera.y) == (100, 200)
+
+        camera.move_to(-10, 1000)
+        assert (camera.x, camera.y) == (0, 640)
+
+    def test_never_moves_in_a_world_no_larger_than_the_window(self, reset_game_settings):
+        camera = Camera(reset_game_settings)
+
+        camera.move_to(50, 50)
+        assert camera.view == (0, 0, 160, 160)
+
+    def test_center_on(self, world):
+        camera = Camera(world)
+
+        camera.center_on(400, 300)
+        assert (camera.x, camera.y) == (320, 220)
+
+    def test_follow(self, world):
+        camera = Camera(world)
+        sprite = Sprite("player", coord(1, 1))
+        sprite.set_position(coord.with_xy(396, 296))
+
+        camera.follow(sprite)
+        assert (camera.x, camera.y) == (320, 220)
+
+        sprite.position.move_by(16, 0)
+        camera._update()
+        assert (camera.x, camera.y) == (336, 220)
+
+        camera.follow(None)
+        sprite.position.move_by(16, 0)
+        camera._update()
+        assert camera.x == 336
+
+    def test_screen_and_world_conversion(self, world):
+        camera = Camera(world)
+        camera.move_to(100, 50)
+
+        assert camera.to_world(10, 20) == (110, 70)
+        assert camera.to_screen(110, 70) == (10, 20)
@@ -0,0 +1,151 @@
+import pytest
+
+from pyke_pyxel.collisions import Collisions
+from pyke_pyxel.signals import Signals
+from pyke_pyxel.spatial import SpatialIndex
+from pyke_pyxel.sprite._sprite import Sprite
+from pyke_pyxel._types import coord
+
+
+class _Game:
+    """The part of Game used by Collisions"""
+    def __init__(self):
+        self.spatial = SpatialIndex()
+
+
+def _sprite(game: _Game, name: str, x: int, y: int) -> Sprite:
+    sprite = Sprite(name, coord(1, 1))
+    sprite.set_position(coord.with_xy(x, y))
+    game.spatial.insert(sprite)
+    return sprite
+
+
+@pytest.fixture
+def events():
+    received: list[tuple[str, str, str]] = []
+
+    def _listener(kind):
+        def _received(sender, value):
+            received.append((kind, value[0].name, value[1].name))
+        return _received
+
+    listeners = { name: _listener(kind) for name, kind in
+                  ((Signals.COLLISION.ENTER, "enter"), (Signals.COLLISION.STAY, "stay"), (Signals.COLLISION.EXIT, "exit")) }
+    for name, listener in listeners.items():
+        Signals.connect(name, listener)
+    yield received
+    for name, listener in listeners.items():
+        Signals.disconnect(name, listener)
+
+
+class TestCollisions:
+    """Tests for the enter, stay and exit signals."""
+
+    def test_enter_stay_exit(self, reset_game_settings, events):
+        game = _Game()
+        collisions = Collisions(game)
+        a = _sprite(game, "a", 0, 0)
+        b = _sprite(game, "b", 20, 0)
+        collisions.add(a)
+        collisions.add(b)
+
+        collisions._update()
+        assert events == []
+
+        b.position.move_by(-16, 0)
+        collisions._update()
+        collisions._update()
+        assert events == [("enter", "a", "b"), ("stay", "a", "b")]
+        assert collisions.is_colliding(b, a)
+        assert collisions.colliding_with(b) == [a]
+
+        b.set_position(coord.with_xy(8, 0)) # Touching edges do not overlap
+        collisions._update()
+        assert events[-1] == ("exit", "a", "b")
+        assert not collisions.is_colliding(a, b)
+
+    def test_pair_is_passed_in_the_order_added(self, reset_game_settings, events):
+        game = _Game()
+        collisions = Collisions(game)
+        a = _sprite(game, "a", 0, 0)
+        b = _sprite(game, "b", 4, 4)
+        collisions.add(b)
+        collisions.add(a)
+
+        collisions._update()
+        assert events == [("enter", "b", "a")]
+
+    def test_layers_and_masks(self, reset_game_settings, events):
+        game = _Game()
+        collisions = Collisions(game)
+        player = _sprite(game, "player", 0, 0)
+        bullet = _sprite(game, "bullet", 2, 2)
+        enemy = _sprite(game, "enemy", 4, 4)
+        collisions.add(player, layer=1, mask=4)
+        collisions.add(bullet, layer=2, mask=4)
+        collisions.add(enemy, layer=4, mask=1|2)
+
+        collisions._update()
+        assert sorted(events) == [("enter", "bullet", "enemy"), ("enter", "player", "enemy")]
+
+    def test_only_added_sprites_collide(self, reset_game_settings, events):
+        game = _Game()
+        collisions = Collisions(game)
+        a = _sprite(game, "a", 0, 0)
+        _sprite(game, "wall", 2, 2)
+        collisions.add(a)
+
+        collisions._update()
+        assert events == []
+
+    def test_sprites_spanning_cells_are_reported_once(self, reset_game_settings, events):
+        game = _Game()
+        collisions = Collisions(game)
+        a = _sprite(game, "a", 4, 4)
+        b = _sprite(game, "b", 6, 6)
+        collisions.add(a)
+        collisions.add(b)
+
+        collisions._update()
+        assert events == [("enter", "a", "b")]
+
+    def test_remove_sends_exit(self, reset_game_settings, events):
+        game = _Game()
+        collisions = Collisions(game)
+        a = _sprite(game, "a", 0, 0)
+        b = _sprite(game, "b", 2, 0)
+        collisions.add(a)
+        collisions.add(b)
+        collisions._update()
+
+        collisions.remove(b)
+        assert events == [("enter", "a", "b"), ("exit", "a", "b")]
+        assert b not in collisions
+
+        collisions._update()
+        assert len(events) == 2
+
+    def test_listener_removing_a_sprite(self, reset_game_settings, events):
+        game = _Game()
+        collisions = Collisions(game)
+        bullet = _sprite(game, "bullet", 0, 0)
+        first = _sprite(game, "first", 2, 0)
+        second = _sprite(game, "second", 4, 0)
+        collisions.add(bullet)
+        collisions.add(first)
+        collisions.add(second)
+
+        def _hit(sender, value):
+            collisions.remove(bullet)
+        Signals.connect(Signals.COLLISION.ENTER, _hit)
+        try:
+            collisions._update()
+        finally:
+            Signals.disconnect(Signals.COLLISION.ENTER, _hit)
+
+        # The bullet is removed by the first enter, its pair with the second sprite is never announced
+        bullet_events = [ e for e in events if "bullet" in e ]
+        assert bullet_events[0][0] == "enter"
+        assert bullet_events[-1][0] == "exit"
+        assert len(bullet_events) == 2
+        assert collisions.colliding_with(first) == [second]
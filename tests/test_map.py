@@ -37,6 +37,14 @@ class TestMapCreation:
         assert game_map.width == 160
         assert game_map.height == 160
 
+    def test_world_larger_than_the_window(self, reset_game_settings):
+        reset_game_settings.size.world = 800
+        game_map = Map(reset_game_settings)
+
+        assert game_map.width == 800
+        assert game_map._cols == 100
+        assert game_map.location_at(coord(100, 100)).is_edge is False
+
 
 class TestMapLocationAt:
     """Tests for location_at method."""
@@ -623,6 +631,210 @@ class TestMapFindPath:
         assert len(path) == 2
 
 
+    def test_find_path_cache_counters(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+        game_map.find_path(coord(1, 1), coord(5, 5))
+        game_map.find_path(coord(1, 1), coord(5, 5))
+        game_map.find_path(coord(1, 1), coord(6, 5))
+
+        assert game_map.path_cache_hits == 1
+        assert game_map.path_cache_misses == 2
+
+
+class TestMapBatchPaths:
+    """Tests for many-to-one and one-to-many path queries."""
+
+    def test_find_paths_matches_find_path_costs(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        for r in range(1, 10):
+            game_map.mark_blocked(coord(5, r), sprite)
+
+        target = coord(10, 1)
+        sources = [coord(1, 1), coord(3, 8), coord(8, 2)]
+        paths = game_map.find_paths(sources, target)
+
+        assert len(paths) == 3
+        for source, path in zip(sources, paths):
+            assert path is not None
+            assert path[0].is_same_grid_location(source)
+            assert path[-1].is_same_grid_location(target)
+            assert not any(game_map.is_blocked(p) for p in path)
+            expected = game_map.find_path(source, target)
+            assert expected is not None
+            assert len(path) == len(expected)
+
+    def test_find_paths_unreachable_source(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        for r in range(1, game_map._rows + 1):
+            game_map.mark_blocked(coord(5, r), sprite)
+
+        paths = game_map.find_paths([coord(1, 1), coord(8, 1)], coord(10, 10))
+
+        assert paths[0] is None
+        assert paths[1] is not None
+
+    def test_find_paths_to_blocked_returns_none(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        game_map.mark_blocked(coord(5, 5), sprite)
+
+        assert game_map.find_paths([coord(1, 1), coord(2, 2)], coord(5, 5)) == [None, None]
+
+    def test_distances_from(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        game_map.mark_blocked(coord(2, 1), sprite)
+        distances = game_map.distances_from(coord(1, 1))
+        assert distances is not None
+
+        # Three AVAILABLE steps
+        assert distances.distance_to(coord(1, 4)) == 6
+        assert distances.distance_to(coord(1, 1)) == 0
+        assert distances.distance_to(coord(2, 1)) is None
+
+        path = distances.path_to(coord(3, 1))
+        assert path is not None
+        assert path[0].is_same_grid_location(coord(1, 1))
+        assert path[-1].is_same_grid_location(coord(3, 1))
+        assert len(path) == 5
+
+    def test_distances_from_updates_when_map_changes(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        distances = game_map.distances_from(coord(1, 1))
+        assert distances is not None
+        assert distances.distance_to(coord(3, 1)) == 4
+
+        game_map.mark_blocked(coord(2, 1), sprite)
+
+        assert distances.distance_to(coord(3, 1)) == 8
+
+
+class TestMapRequestPath:
+    """Tests for queued path requests."""
+
+    def test_request_path_is_solved_on_update(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+        results = []
+        request = game_map.request_path(coord(1, 1), coord(5, 5), results.append)
+
+        assert request is not None
+        assert game_map.pending_path_requests == 1
+        assert results == []
+
+        game_map._update()
+
+        assert game_map.pending_path_requests == 0
+        assert request.is_done
+        assert len(results) == 1
+        assert results[0][-1].is_same_grid_location(coord(5, 5))
+
+    def test_request_path_to_blocked_returns_none(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        game_map.mark_blocked(coord(5, 5), sprite)
+        results = []
+
+        assert game_map.request_path(coord(1, 1), coord(5, 5), results.append) is None
+        assert results == [None]
+        assert game_map.pending_path_requests == 0
+
+
+    def test_find_path_async_to_blocked_returns_none(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        game_map.mark_blocked(coord(5, 5), sprite)
+        results = []
+
+        assert game_map.find_path_async(coord(1, 1), coord(5, 5), results.append) is None
+        assert results == [None]
+
+
+class TestMapFlowField:
+    """Tests for shared flow fields."""
+
+    def test_flow_field_leads_to_target(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        for r in range(1, 10):
+            game_map.mark_blocked(coord(5, r), sprite)
+
+        target = coord(10, 1)
+        field = game_map.flow_field(target)
+        assert field is not None
+
+        position = coord(1, 1)
+        steps = 0
+        while (step := field.next_step(position)) is not None:
+            assert not game_map.is_blocked(step)
+            position = step
+            steps += 1
+            assert steps < 100
+
+        assert position.is_same_grid_location(target)
+
+    def test_flow_field_is_cached_per_target(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+
+        assert game_map.flow_field(coord(5, 5)) is game_map.flow_field(coord(5, 5))
+        assert game_map.flow_field(coord(5, 5)) is not game_map.flow_field(coord(6, 5))
+
+    def test_flow_field_updates_when_map_changes(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        field = game_map.flow_field(coord(3, 1))
+        assert field is not None
+
+        assert field.next_step(coord(1, 1)).is_same_grid_location(coord(2, 1))
+
+        game_map.mark_blocked(coord(2, 1), sprite)
+
+        step = field.next_step(coord(1, 1))
+        assert step is not None
+        assert step.is_same_grid_location(coord(1, 2))
+
+    def test_flow_field_distance(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        game_map = Map(reset_game_settings)
+        field = game_map.flow_field(coord(4, 1))
+        assert field is not None
+
+        # Three AVAILABLE steps
+        assert field.distance_at(coord(1, 1)) == 6
+        assert field.distance_at(coord(4, 1)) == 0
+
+    def test_flow_field_to_blocked_returns_none(self, reset_game_settings):
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        game_map.mark_blocked(coord(5, 5), sprite)
+
+        assert game_map.flow_field(coord(5, 5)) is None
+
+    def test_unreachable_location_has_no_step(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        game_map = Map(reset_game_settings)
+        sprite = MagicMock(spec=Sprite)
+        for r in range(1, game_map._rows + 1):
+            game_map.mark_blocked(coord(5, r), sprite)
+
+        field = game_map.flow_field(coord(10, 10))
+        assert field is not None
+
+        assert field.next_step(coord(1, 1)) is None
+        assert field.distance_at(coord(1, 1)) is None
+
+
 class TestMapRandomLocation:
     """Tests for random_location method."""
 
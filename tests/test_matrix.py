@@ -0,0 +1,797 @@
+import gc
+import weakref
+import numpy as np
+import pytest
+
+from pyke_pyxel._types import coord
+from pyke_pyxel.cell_auto.matrix import Matrix, Cell
+from pyke_pyxel.cell_auto.cell_types import CellTypes
+from pyke_pyxel.cell_auto.rules import PropagateRule, DecayRule, RingStampRule
+from pyke_pyxel.cell_auto.snapshot import MatrixSnapshot, SnapshotRing
+
+
+class TestMatrixCreation:
+    """Tests for Matrix creation and clearing."""
+
+    def test_cells_start_empty(self):
+        matrix = Matrix(10, 8)
+        cell = matrix.cell_at(3, 4)
+        assert cell is not None
+        assert cell.is_empty
+        assert cell.type == Cell.TYPE_EMPTY
+        assert cell.colour == 0
+        assert cell.power == 0
+        assert cell.can_propogate is False
+        assert cell.tag is None
+
+    def test_clear_resets_state(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(1, 1)
+        cell.type = "fungus"
+        cell.colour = 3
+        cell.power = 5
+        cell.store_state()
+
+        matrix.clear()
+
+        assert cell.is_empty
+        assert cell.colour == 0
+        assert cell.power == 0
+        assert matrix._img.pget(1, 1) == 0
+        cell.recall_state()
+        assert cell.is_empty
+
+
+class TestCellTypes:
+    """Tests for the interned cell type registry."""
+
+    def test_empty_type(self):
+        assert CellTypes.id_of(Cell.TYPE_EMPTY) == CellTypes.EMPTY
+        assert CellTypes.name_of(CellTypes.EMPTY) == Cell.TYPE_EMPTY
+
+    def test_ids_are_stable(self):
+        type_id = CellTypes.id_of("test_fungus")
+        assert type_id != CellTypes.EMPTY
+        assert CellTypes.id_of("test_fungus") == type_id
+        assert CellTypes.name_of(type_id) == "test_fungus"
+
+    def test_cell_type_id(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(1, 1)
+        cell.type_id = CellTypes.id_of("test_meteor")
+
+        assert cell.type == "test_meteor"
+        assert not cell.is_empty
+        cell.type = "test_fungus"
+        assert cell.type_id == CellTypes.id_of("test_fungus")
+
+
+class TestCellView:
+    """Tests for Cell views onto the matrix arrays."""
+
+    def test_views_share_state(self):
+        matrix = Matrix(10, 10)
+        matrix.cell_at(2, 3).type = "fungus"
+        matrix.cell_at(2, 3).power = 2.5
+        matrix.cell_at(2, 3).tag = "left"
+
+        cell = matrix.cell_at(2, 3)
+        assert cell.type == "fungus"
+        assert cell.power == 2.5
+        assert cell.tag == "left"
+        assert not cell.is_empty
+
+    def test_views_compare_equal(self):
+        matrix = Matrix(10, 10)
+        cells = [matrix.cell_at(1, 1), matrix.cell_at(2, 1)]
+
+        assert matrix.cell_at(1, 1) == cells[0]
+        assert matrix.cell_at(1, 1) in cells
+        assert matrix.cell_at(1, 2) not in cells
+        assert Matrix(10, 10).cell_at(1, 1) != cells[0]
+
+    def test_tags_are_kept_by_identity(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(1, 1)
+        first, second = [1], [1]
+
+        cell.tag = first
+        assert cell.tag is first
+        cell.tag = second
+        assert cell.tag is second # Equal, but not the same object
+        for _ in range(10):
+            cell.tag = second
+        assert len(matrix._tag_values) == 3
+
+    def test_unused_tags_are_freed(self):
+        class Tag:
+            pass
+
+        matrix = Matrix(10, 10)
+        kept = Tag()
+        matrix.cell_at(0, 0).tag = kept
+        first = Tag()
+        matrix.cell_at(5, 5).tag = first
+        dropped = weakref.ref(first)
+        del first
+        for _ in range(300):
+            tag = Tag()
+            matrix.cell_at(5, 5).tag = tag
+        matrix.step()
+
+        assert dropped() is None
+        assert len(matrix._tag_values) - len(matrix._free_tags) == 3 # None, kept and the last tag
+        assert matrix.cell_at(0, 0).tag is kept
+        assert matrix.cell_at(5, 5).tag is tag
+
+        # Freed ids are reused
+        size = len(matrix._tag_values)
+        matrix.cell_at(2, 2).tag = Tag()
+        assert len(matrix._tag_values) == size
+
+    def test_colour_is_written_to_image_on_flush(self):
+        matrix = Matrix(10, 10)
+        matrix.cell_at(4, 5).colour = 7
+        assert matrix._img.pget(4, 5) == 0
+
+        assert matrix._flush() == 1
+        assert matrix._img.pget(4, 5) == 7
+
+    def test_store_and_recall_state(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(1, 1)
+        cell.type = "fungus"
+        cell.colour = 3
+        cell.power = 4
+        cell.tag = "up"
+        cell.store_state()
+
+        cell.type = "meteor"
+        cell.colour = 8
+        cell.power = 10
+        cell.tag = None
+        cell.recall_state()
+
+        assert cell.type == "fungus"
+        assert cell.colour == 3
+        assert cell.power == 4
+        assert cell.tag == "up"
+
+        # Stored slots are cleared after a recall
+        cell.recall_state()
+        assert cell.is_empty
+
+    def test_reset(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(1, 1)
+        cell.type = "fungus"
+        cell.can_propogate = True
+        cell.reset()
+
+        assert cell.is_empty
+        assert cell.can_propogate is False
+
+    def test_set_cells(self):
+        matrix = Matrix(10, 10)
+        cells = [matrix.cell_at(1, 1), matrix.cell_at(4, 2), matrix.cell_at(1, 1)]
+        matrix.set_cells(cells, type="fungus", colour=3, power=2, tag="up")
+
+        assert [(c.type, c.colour, c.power, c.tag, c.can_propogate) for c in cells[:2]] == [("fungus", 3, 2, "up", False)] * 2
+        assert matrix.active_count() == 2 # Listed twice, counted once
+        assert matrix._flush() == 2
+
+        # Only the given attributes change
+        matrix.set_cells(cells, can_propogate=True)
+        assert cells[0].type == "fungus" and cells[0].can_propogate and cells[0].tag == "up"
+
+    def test_reset_cells(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(2, 2)
+        cell.type = "fungus"
+        cell.power = 3
+        cell.store_state()
+
+        matrix.reset_cells([cell])
+        assert cell.is_empty and cell.power == 0 and cell.tag is None
+        assert matrix.active_count() == 0
+        cell.recall_state()
+        assert cell.is_empty
+
+
+class TestMatrixQueries:
+    """Tests for neighbour, region and line queries."""
+
+    def test_cell_at_out_of_bounds(self):
+        matrix = Matrix(10, 10)
+        assert matrix.cell_at(-1, 0) is None
+        assert matrix.cell_at(0, 10) is None
+
+    def test_neighbours(self):
+        matrix = Matrix(10, 10)
+        assert len(matrix.neighbours(matrix.cell_at(5, 5))) == 8
+        assert len(matrix.neighbours(matrix.cell_at(0, 0))) == 3
+        assert len(matrix.neighbours(matrix.cell_at(9, 5))) == 5
+
+    def test_neighbours_filter_for_type(self):
+        matrix = Matrix(10, 10)
+        matrix.cell_at(4, 4).type = "fungus"
+        matrix.cell_at(6, 6).type = "fungus"
+
+        fungus = matrix.neighbours(matrix.cell_at(5, 5), filter_for_type="fungus")
+        empty = matrix.neighbours(matrix.cell_at(5, 5), filter_for_type=Cell.TYPE_EMPTY)
+
+        assert sorted((c.x, c.y) for c in fungus) == [(4, 4), (6, 6)]
+        assert len(empty) == 6
+        assert matrix.neighbours(matrix.cell_at(5, 5), filter_for_type="unknown") == []
+        assert len(matrix.neighbours(matrix.cell_at(5, 5), filter_for_type=CellTypes.id_of("fungus"))) == 2
+
+    def test_neighbours_order_and_edges(self):
+        matrix = Matrix(10, 10)
+        around = [(c.x, c.y) for c in matrix.neighbours(matrix.cell_at(5, 5))]
+        corner = [(c.x, c.y) for c in matrix.neighbours(matrix.cell_at(9, 9))]
+
+        # N, NW, NE, S, SW, SE, E, W
+        assert around == [(5, 4), (4, 4), (6, 4), (5, 6), (4, 6), (6, 6), (6, 5), (4, 5)]
+        assert corner == [(9, 8), (8, 8), (8, 9)]
+
+    def test_neighbours_are_shared_views(self):
+        matrix = Matrix(10, 10)
+        north = matrix.neighbours(matrix.cell_at(5, 5))[0]
+        assert north is matrix.cell_at(5, 4)
+        assert north is matrix.neighbour_N(matrix.cell_at(5, 5))
+
+    def test_directional_neighbours(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(5, 5)
+
+        assert (matrix.neighbour_N(cell).x, matrix.neighbour_N(cell).y) == (5, 4)
+        assert (matrix.neighbour_SE(cell).x, matrix.neighbour_SE(cell).y) == (6, 6)
+        assert matrix.neighbour_W(matrix.cell_at(0, 5)) is None
+
+    def test_cells_at(self):
+        matrix = Matrix(20, 20)
+        matrix.cell_at(5, 5).type = "fungus"
+        matrix.cell_at(15, 15).type = "fungus"
+        position = coord.with_xy(4, 4) # an 8x8 area
+
+        assert len(matrix.cells_at(position, include_empty=True)) == 64
+        cells = matrix.cells_at(position)
+        assert [(c.x, c.y) for c in cells] == [(5, 5)]
+
+    def test_cells_in_line(self):
+        matrix = Matrix(20, 20)
+        line = matrix.cells_in_line(coord.with_xy(0, 0), coord.with_xy(5, 5))
+
+        assert [(c.x, c.y) for c in line] == [(i, i) for i in range(6)]
+
+    def test_cells_in_line_extended(self):
+        matrix = Matrix(20, 10)
+        line = matrix.cells_in_line(coord.with_xy(0, 0), coord.with_xy(2, 1), extend_to_matrix_end=True)
+
+        assert (line[0].x, line[0].y) == (0, 0)
+        assert line[-1].y == 9
+        assert len(line) == 20
+
+    def test_cells_in_line_is_cached(self):
+        matrix = Matrix(20, 20)
+        first = matrix.cells_in_line(coord.with_xy(0, 0), coord.with_xy(15, 4))
+        second = matrix.cells_in_line(coord.with_xy(0, 0), coord.with_xy(15, 4))
+
+        assert first == second
+        assert matrix.line_cache_misses == 1
+        assert matrix.line_cache_hits == 1
+
+        # Each call returns a new list
+        second.clear()
+        assert len(matrix.cells_in_line(coord.with_xy(0, 0), coord.with_xy(15, 4))) == 16
+
+    def test_cells_in_lines_matches_cells_in_line(self):
+        matrix = Matrix(30, 20)
+        lines = [
+            (coord.with_xy(0, 0), coord.with_xy(25, 7)),
+            (coord.with_xy(29, 19), coord.with_xy(3, 2)),
+            (coord.with_xy(-5, 4), coord.with_xy(40, 12)),
+            (coord.with_xy(6, 6), coord.with_xy(6, 6)),
+        ]
+
+        for extend in (False, True):
+            batch = Matrix(30, 20).cells_in_lines(lines, extend_to_matrix_end=extend)
+            for (frm, to), cells in zip(lines, batch):
+                expected = matrix.cells_in_line(frm, to, extend_to_matrix_end=extend)
+                assert [(c.x, c.y) for c in cells] == [(c.x, c.y) for c in expected]
+
+    def test_cells_in_ring(self):
+        matrix = Matrix(20, 20)
+        ring = matrix.cells_in_ring(10, 10, 1)
+        assert sorted((c.x, c.y) for c in ring) == sorted(
+            (10 + dx, 10 + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)
+        )
+
+        # Rings of consecutive radii cover the disc without gaps or overlaps
+        disc = { (c.x, c.y) for c in matrix.cells_in_disc(10, 10, 5) }
+        rings = [ (c.x, c.y) for r in range(1, 6) for c in matrix.cells_in_ring(10, 10, r) ]
+        assert len(rings) == len(set(rings))
+        assert set(rings) | {(10, 10)} == disc
+
+    def test_cells_in_annulus_is_clipped(self):
+        matrix = Matrix(20, 20)
+        cells = matrix.cells_in_annulus(0, 0, 2, 4)
+        assert cells
+        for c in cells:
+            assert 4 < c.x * c.x + c.y * c.y <= 16
+
+        assert matrix.cells_in_disc(100, 100, 3) == []
+
+class TestMatrixActiveCells:
+    """Tests for the incrementally maintained set of non-empty cells."""
+
+    def test_count_tracks_type_changes(self):
+        matrix = Matrix(40, 10)
+        assert matrix.active_count() == 0
+
+        cell = matrix.cell_at(20, 3)
+        cell.type = "fungus"
+        cell.type = "rock" # still active
+        assert matrix.active_count() == 1
+
+        cell.reset()
+        assert matrix.active_count() == 0
+
+        cell.type_id = CellTypes.id_of("fungus")
+        cell.store_state()
+        cell.type = Cell.TYPE_EMPTY
+        assert matrix.active_count() == 0
+        cell.recall_state()
+        assert matrix.active_count() == 1
+
+    def test_active_cells_in_region(self):
+        matrix = Matrix(40, 40)
+        for x, y in [(1, 1), (17, 2), (33, 30), (5, 5)]:
+            matrix.cell_at(x, y).type = "fungus"
+
+        assert [(c.x, c.y) for c in matrix.active_cells()] == [(1, 1), (17, 2), (5, 5), (33, 30)]
+        position = coord.with_xy(0, 0) # an 8x8 area
+        assert [(c.x, c.y) for c in matrix.active_cells(position)] == [(1, 1), (5, 5)]
+        assert matrix.active_count(position) == 2
+        assert matrix.active_count(coord.with_xy(100, 100)) == 0
+
+    def test_rules_update_active_cells(self):
+        matrix = Matrix(20, 20)
+        source = matrix.cell_at(10, 10)
+        source.type = "fungus"
+        source.can_propogate = True
+        source.power = 5
+
+        matrix.apply(PropagateRule("fungus", colour=3, probability=1, power=1))
+        assert matrix.active_count() == 9
+
+        matrix.apply(DecayRule("fungus", amount=1))
+        assert matrix.active_count() == 1 # only the source has power left
+        assert matrix.active_count() == int(np.count_nonzero(matrix._types))
+
+    def test_region_aggregates(self):
+        matrix = Matrix(20, 20)
+        for x, y, power in [(1, 1, 2), (5, 6, 3), (12, 12, 7)]:
+            cell = matrix.cell_at(x, y)
+            cell.type = "fungus"
+            cell.power = power
+        position = coord.with_xy(0, 0) # an 8x8 area
+
+        assert matrix.active_count(position) == 2
+        assert matrix.power_in(position) == 5
+        assert matrix.power_in(coord.with_xy(100, 100)) == 0
+
+        matrix.cell_at(5, 6).power = 1
+        assert matrix.power_in(position) == 3
+        matrix.cell_at(1, 1).reset()
+        assert matrix.active_count(position) == 1
+        assert matrix.power_in(position) == 1
+
+    def test_region_aggregates_follow_rules(self):
+        matrix = Matrix(20, 20)
+        matrix.apply(RingStampRule("fire", 10, 10, colour=8, power=4, radius=2))
+        position = coord.with_xy(0, 0)
+        position.move_by(4, 4) # 4..11 in both directions
+        expected = [c for c in matrix.active_cells() if 4 <= c.x < 12 and 4 <= c.y < 12]
+        assert matrix.active_count(position) == len(expected) > 0
+
+        matrix.apply(DecayRule("fire", amount=1))
+        assert matrix.power_in(position) == 3 * len(expected)
+
+    def test_clear_resets_active_cells(self):
+        matrix = Matrix(10, 10)
+        matrix.cell_at(2, 2).type = "fungus"
+        matrix.clear()
+        assert matrix.active_count() == 0
+        assert matrix.active_cells() == []
+
+
+class TestMatrixFlush:
+    """Tests for the dirty row spans written to the image."""
+
+    def test_flush_writes_row_spans(self):
+        matrix = Matrix(20, 10)
+        matrix.cell_at(2, 1).colour = 3
+        matrix.cell_at(6, 1).colour = 4
+        matrix.cell_at(9, 5).colour = 5
+
+        # Row 1 spans x 2..6, row 5 is a single pixel
+        assert matrix._flush() == 6
+        assert matrix.pixels_written == 6
+        assert matrix._img.pget(2, 1) == 3
+        assert matrix._img.pget(6, 1) == 4
+        assert matrix._img.pget(9, 5) == 5
+
+    def test_flush_is_empty_when_clean(self):
+        matrix = Matrix(10, 10)
+        matrix.cell_at(1, 1).colour = 3
+        matrix._flush()
+
+        assert matrix._flush() == 0
+        assert matrix.pixels_written == 0
+
+    def test_rule_colours_are_flushed(self):
+        matrix = Matrix(21, 21)
+        matrix.apply(RingStampRule("meteor", 10, 10, colour=8, power=5, radius=5, degrees_step=90))
+
+        matrix._flush()
+
+        assert matrix._img.pget(15, 10) == 8
+        assert matrix._img.pget(10, 5) == 8
+
+
+class TestMatrixRules:
+    """Tests for vectorised whole-field rules."""
+
+    def test_propagate_into_empty_neighbours(self):
+        matrix = Matrix(10, 10)
+        source = matrix.cell_at(5, 5)
+        source.type = "fungus"
+        source.can_propogate = True
+        matrix.cell_at(4, 4).type = "rock"
+
+        matrix.add_rule(PropagateRule("fungus", colour=3, probability=1, power=2))
+        matrix.step()
+
+        grown = matrix.neighbours(source, filter_for_type="fungus")
+        assert len(grown) == 7
+        assert all(c.can_propogate and c.power == 2 and c.colour == 3 for c in grown)
+        assert matrix.cell_at(4, 4).type == "rock"
+        assert source.can_propogate is False
+        matrix._flush()
+        assert matrix._img.pget(6, 6) == 3
+
+    def test_propagate_probability_zero(self):
+        matrix = Matrix(10, 10)
+        source = matrix.cell_at(5, 5)
+        source.type = "fungus"
+        source.can_propogate = True
+
+        matrix.apply(PropagateRule("fungus", colour=3, probability=0))
+
+        assert matrix.neighbours(source, filter_for_type="fungus") == []
+
+    def test_decay_resets_expired_cells(self):
+        matrix = Matrix(10, 10)
+        strong = matrix.cell_at(1, 1)
+        weak = matrix.cell_at(2, 2)
+        for cell, power in ((strong, 10), (weak, 3)):
+            cell.type = "meteor"
+            cell.colour = 8
+            cell.power = power
+
+        matrix.apply(DecayRule("meteor", 4, palette=[(8, 8), (0, 9)]))
+
+        assert strong.power == 6
+        assert strong.colour == 9
+        assert weak.is_empty
+        assert weak.colour == 0
+
+    def test_decay_recalls_stored_state(self):
+        matrix = Matrix(10, 10)
+        cell = matrix.cell_at(1, 1)
+        cell.type = "fungus"
+        cell.colour = 3
+        cell.store_state()
+        cell.type = "meteor"
+        cell.power = 1
+
+        matrix.apply(DecayRule("meteor", 4, recall_state=True))
+
+        assert cell.type == "fungus"
+        assert cell.colour == 3
+
+    def test_decay_mask(self):
+        matrix = Matrix(10, 10)
+        owned = matrix.cell_at(1, 1)
+        other = matrix.cell_at(2, 2)
+        for cell in (owned, other):
+            cell.type = "meteor"
+            cell.power = 10
+
+        mask = matrix.new_mask([owned])
+        matrix.apply(DecayRule("meteor", 4, mask=mask))
+
+        assert owned.power == 6
+        assert other.power == 10
+
+    def test_ring_stamp_grows(self):
+        matrix = Matrix(21, 21)
+        mask = matrix.new_mask()
+        ring = matrix.add_rule(RingStampRule("meteor", 10, 10, colour=8, power=5, radius=3, mask=mask))
+        matrix.cell_at(10, 7).type = "fungus"
+        matrix.cell_at(10, 7).colour = 3
+
+        matrix.step()
+
+        assert matrix.cell_at(13, 10).type == "meteor"
+        assert matrix.cell_at(10, 10).is_empty
+        assert matrix.cell_at(11, 10).is_empty
+        assert matrix.cell_at(10, 7).type == "meteor"
+        assert ring.radius == 4
+        assert mask[7 * 21 + 10]
+
+        # The overwritten state was stored
+        matrix.cell_at(10, 7).recall_state()
+        assert matrix.cell_at(10, 7).type == "fungus"
+
+    def test_ring_stamp_is_gap_free(self):
+        matrix = Matrix(30, 30)
+        rule = RingStampRule("fire", 12, 14, colour=8, power=4, radius=1, store_state=False)
+        for _ in range(6):
+            matrix.apply(rule)
+
+        ys, xs = np.nonzero(matrix._types.reshape(30, 30))
+        distances = (xs - 12) ** 2 + (ys - 14) ** 2
+        assert len(xs) == np.count_nonzero((np.arange(30)[None, :] - 12) ** 2 + (np.arange(30)[:, None] - 14) ** 2 <= 6.5 ** 2) - 1
+        assert distances.min() > 0 and distances.max() <= 6.5 ** 2
+
+    def test_ring_stamp_with_degrees_step(self):
+        matrix = Matrix(21, 21)
+        matrix.apply(RingStampRule("meteor", 10, 10, colour=8, power=5, radius=5, degrees_step=90))
+
+        stamped = [ (i % 21, i // 21) for i in np.flatnonzero(matrix._types) ]
+        assert sorted(stamped) == [(5, 10), (10, 5), (10, 15), (15, 10)]
+
+    def test_done_rules_are_removed(self):
+        matrix = Matrix(10, 10)
+        ring = matrix.add_rule(RingStampRule("meteor", 5, 5, colour=8, power=5, radius=20))
+
+        matrix.step()
+
+        assert ring.is_done
+        assert matrix._rules == []
+
+
+class TestMatrixLayers:
+    """Tests for overlaying cells with layers and restoring what was underneath."""
+
+    def _fungus(self, matrix: Matrix, x: int, y: int) -> Cell:
+        cell = matrix.cell_at(x, y)
+        cell.type = "fungus"
+        cell.colour = 3
+        cell.power = 2
+        cell.tag = "a"
+        return cell
+
+    def test_remove_restores_underneath(self):
+        matrix = Matrix(10, 10)
+        fungus = self._fungus(matrix, 2, 2)
+        empty = matrix.cell_at(3, 3)
+
+        layer = matrix.new_layer()
+        layer.cover([fungus, empty])
+        for c in (fungus, empty):
+            c.type = "fire"
+            c.colour = 8
+            c.power = 9
+        assert matrix.active_count() == 2
+
+        layer.remove()
+        assert (fungus.type, fungus.colour, fungus.power, fungus.tag) == ("fungus", 3, 2, "a")
+        assert empty.is_empty and empty.colour == 0
+        assert matrix.active_count() == 1
+        assert not layer.any()
+        assert layer not in matrix._layers
+
+    def test_cover_keeps_first_saved_state(self):
+        matrix = Matrix(10, 10)
+        fungus = self._fungus(matrix, 2, 2)
+        layer = matrix.new_layer()
+        layer.cover([fungus])
+        fungus.type = "fire"
+        layer.cover([fungus]) # Already covered
+
+        layer.uncover([fungus])
+        assert fungus.type == "fungus"
+
+    def test_overlapping_layers_restore_in_any_order(self):
+        for first_removed in (0, 1):
+            matrix = Matrix(10, 10)
+            fungus = self._fungus(matrix, 2, 2)
+            layers = [matrix.new_layer(), matrix.new_layer()]
+
+            layers[0].cover([fungus])
+            fungus.type = "fire"
+            layers[1].cover([fungus])
+            fungus.type = "meteor"
+
+            layers[first_removed].remove()
+            # Only the lower layer's cell is restored once the upper layer is removed
+            assert fungus.type == ("meteor" if first_removed == 0 else "fire")
+
+            layers[1 - first_removed].remove()
+            assert fungus.type == "fungus"
+
+    def test_rules_with_layer(self):
+        matrix = Matrix(20, 20)
+        fungus = self._fungus(matrix, 11, 10)
+        layer = matrix.new_layer()
+
+        matrix.apply(RingStampRule("fire", 10, 10, colour=8, power=2, radius=1, layer=layer))
+        assert fungus.type == "fire"
+        assert np.count_nonzero(layer.mask) == 8
+
+        decay = DecayRule("fire", amount=1, layer=layer)
+        matrix.apply(decay)
+        assert layer.any()
+        matrix.apply(decay)
+        assert not layer.any()
+        assert fungus.type == "fungus" and fungus.power == 2
+        assert matrix.active_count() == 1
+
+    def test_layer_holds_only_covered_cells(self):
+        matrix = Matrix(200, 200)
+        layer = matrix.new_layer()
+        cells = [matrix.cell_at(5, 7), matrix.cell_at(1, 1), matrix.cell_at(150, 3)]
+        layer.cover(cells)
+        assert len(layer._indices) == 3 and len(layer._types) == 3
+        assert list(layer._indices) == sorted(c._index for c in cells)
+
+        layer.uncover(cells[:1])
+        assert len(layer._indices) == 2
+        assert np.count_nonzero(layer.mask) == 2 and not layer.mask[cells[0]._index]
+
+    def test_clear_empties_layers(self):
+        matrix = Matrix(10, 10)
+        layer = matrix.new_layer()
+        layer.cover(matrix.new_mask([matrix.cell_at(1, 1)]))
+        matrix.clear()
+        assert not layer.any()
+
+    def test_layer_outlives_replaced_matrix(self):
+        matrix = Matrix(10, 10)
+        fungus = self._fungus(matrix, 2, 2)
+        layer = matrix.new_layer()
+        layer.cover([fungus])
+        fungus.reset()
+        del matrix, fungus
+        gc.collect()
+
+        layer.remove()
+        assert not layer.any()
+
+    def test_matrix_does_not_keep_layers_alive(self):
+        matrix = Matrix(10, 10)
+        layer = matrix.new_layer()
+        layer.cover([matrix.cell_at(1, 1)])
+        dropped = weakref.ref(layer)
+        del layer
+
+        assert dropped() is None
+        assert len(matrix._layers) == 0
+
+class TestMatrixSnapshots:
+    """Tests for snapshots, their serialisation and the snapshot ring file."""
+
+    def _populated(self) -> Matrix:
+        matrix = Matrix(30, 20)
+        for x, y, type, tag in [(1, 1, "fungus", "a"), (5, 7, "fire", None), (29, 19, "fungus", ("b", 1))]:
+            cell = matrix.cell_at(x, y)
+            cell.type = type
+            cell.colour = 8
+            cell.power = x + 0.25
+            cell.can_propogate = True
+            cell.tag = tag
+        return matrix
+
+    def _assert_same(self, a: Matrix, b: Matrix):
+        a._fold_pending()
+        b._fold_pending()
+        for name in ("_types", "_colours", "_can_propogate", "_powers", "_active"):
+            assert np.array_equal(getattr(a, name), getattr(b, name)), name
+        for x, y in [(1, 1), (5, 7), (29, 19), (0, 0)]:
+            assert a.cell_at(x, y).tag == b.cell_at(x, y).tag
+
+    def test_restore_snapshot(self):
+        matrix = self._populated()
+        snapshot = matrix.snapshot()
+        copy = self._populated()
+
+        matrix.clear()
+        matrix.cell_at(3, 3).type = "rock"
+        assert matrix.restore(snapshot)
+        self._assert_same(matrix, copy)
+        assert matrix.active_count(coord.with_xy(0, 0)) == 2
+
+        # The whole image is redrawn
+        assert matrix._flush() == 30 * 20
+
+    def test_restore_wrong_size(self):
+        assert not Matrix(10, 10).restore(self._populated().snapshot())
+
+    def test_bytes_round_trip(self):
+        matrix = self._populated()
+        data = matrix.snapshot().to_bytes()
+        assert len(data) < 30 * 20
+
+        restored = Matrix(30, 20)
+        assert restored.restore(MatrixSnapshot.from_bytes(data))
+        self._assert_same(restored, matrix)
+
+    def test_ring(self, tmp_path):
+        path = str(tmp_path / "field.snapshots")
+        matrix = self._populated()
+        ring = SnapshotRing(path, slots=3, slot_size=SnapshotRing.slot_size_for(30, 20))
+        for frame in (10, 20, 30, 40):
+            matrix.cell_at(frame // 10, 10).type = "fungus"
+            assert ring.write(frame, matrix.snapshot())
+        assert ring.frames() == [20, 30, 40]
+        ring.close()
+
+        ring = SnapshotRing(path)
+        assert len(ring) == 3
+        assert ring.at(15) is None
+
+        restored = Matrix(30, 20)
+        assert restored.restore(ring.at(35))
+        assert restored.cell_at(3, 10).type == "fungus"
+        assert restored.cell_at(4, 10).is_empty
+        assert restored.restore(ring.latest())
+        self._assert_same(restored, matrix)
+        ring.close()
+
+class TestMatrixProcesses:
+    """Tests for stepping the rules in bands, in a pool of processes."""
+
+    def _run(self, processes: int, probability: float = 1, seed: int = 1) -> Matrix:
+        matrix = Matrix(32, 32)
+        if processes:
+            matrix.use_processes(processes, bands=3, seed=seed)
+        for x, y in [(5, 5), (20, 10), (12, 21), (30, 31)]:
+            cell = matrix.cell_at(x, y)
+            cell.type = "fungus"
+            cell.can_propogate = True
+            cell.power = 3
+
+        mask = matrix.new_mask()
+        matrix.add_rule(PropagateRule("fungus", colour=3, probability=probability, power=5))
+        matrix.add_rule(RingStampRule("fire", 16, 16, colour=8, power=4, mask=mask))
+        matrix.add_rule(DecayRule("fire", amount=1, recall_state=True, mask=mask, palette=[(3, 9), (1, 10)]))
+        for _ in range(10):
+            matrix.step()
+        return matrix
+
+    def test_bands_match_single_process(self):
+        single = self._run(0)
+        banded = self._run(2)
+        try:
+            for name in ("_types", "_colours", "_powers", "_can_propogate", "_stored_types", "_active", "_dirty_min_x", "_dirty_max_x"):
+                assert np.array_equal(getattr(single, name), getattr(banded, name)), name
+            assert banded.active_count(coord.with_xy(8, 8)) == single.active_count(coord.with_xy(8, 8))
+        finally:
+            banded.use_processes(0)
+
+        # The matrix keeps its own arrays, only the bands are in shared memory
+        banded.cell_at(0, 0).type = "fungus"
+        assert banded.cell_at(0, 0).type == "fungus"
+
+    def test_seeded_bands_are_reproducible(self):
+        first = self._run(2, probability=0.3, seed=7)
+        second = self._run(2, probability=0.3, seed=7)
+        try:
+            assert np.array_equal(first._types, second._types)
+            assert first.active_count() > 4
+        finally:
+            first.use_processes(0)
+            second.use_processes(0)
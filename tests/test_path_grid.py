@@ -1,8 +1,10 @@
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
-from pyke_pyxel._path_grid import _PathGrid, PATH_STATUS
+from pyke_pyxel._path_grid import _PathGrid, PATH_STATUS, _MAX_RESTARTS
 from pyke_pyxel._types import coord, GameSettings
+from pyke_pyxel.signals import Signals
 
 
 class TestPathGridCreation:
@@ -254,3 +256,368 @@ class TestPathStatus:
         assert PATH_STATUS.BLOCKED < PATH_STATUS.PREFERRED
         assert PATH_STATUS.BLOCKED < PATH_STATUS.AVAILABLE
         assert PATH_STATUS.BLOCKED < PATH_STATUS.AVOID
+
+
+class TestPathGridNativeEngine:
+    """Tests for the native A* engine and its persistent cost grid."""
+
+    def test_costs_mirror_grid_after_block_and_open(self, reset_game_settings):
+        reset_game_settings.pathfinding.reduce_hugging = True
+        grid = _PathGrid(cols=10, rows=10)
+        grid.block(coord(5, 5))
+        grid.block(coord(6, 5))
+        grid.open(coord(5, 5))
+
+        for r in range(10):
+            for c in range(10):
+                assert grid._costs[r * 10 + c] == grid._grid[r][c]
+
+    def test_open_with_reduce_hugging_restores_neighbours(self, reset_game_settings):
+        reset_game_settings.pathfinding.reduce_hugging = True
+        grid = _PathGrid(cols=10, rows=10)
+        grid.block(coord(5, 5))
+        grid.open(coord(5, 5))
+
+        assert grid._grid[4][3] == PATH_STATUS.AVAILABLE  # left
+        assert grid._grid[4][5] == PATH_STATUS.AVAILABLE  # right
+        assert grid._grid[3][4] == PATH_STATUS.AVAILABLE  # up
+        assert grid._grid[5][4] == PATH_STATUS.AVAILABLE  # down
+
+    def test_path_steps_are_adjacent(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        grid = _PathGrid(cols=10, rows=10)
+        for r in range(1, 9):
+            grid.block(coord(5, r))
+
+        path = grid.find_path(coord(1, 1), coord(10, 1))
+
+        assert path is not None
+        for a, b in zip(path, path[1:]):
+            assert abs(a.col - b.col) + abs(a.row - b.row) == 1
+            assert grid._grid[b.row - 1][b.col - 1] != PATH_STATUS.BLOCKED
+
+    def test_path_reflects_later_changes(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _PathGrid(cols=5, rows=5)
+        for r in range(1, 6):
+            grid.block(coord(3, r))
+        assert grid.find_path(coord(1, 1), coord(5, 1)) is None
+
+        grid.open(coord(3, 5))
+        path = grid.find_path(coord(1, 1), coord(5, 1))
+
+        assert path is not None
+        assert any(p.is_same_grid_location(coord(3, 5)) for p in path)
+
+    def test_repeated_searches_reuse_buffers(self):
+        grid = _PathGrid(cols=10, rows=10)
+        g = grid._nodes.g
+        first = grid.find_path(coord(1, 1), coord(10, 10))
+        second = grid.find_path(coord(1, 1), coord(10, 10))
+
+        assert grid._nodes.g is g
+        assert first is not None and second is not None
+        assert [str(p) for p in first] == [str(p) for p in second]
+
+    def test_matches_pathfinding_engine_cost(self, reset_game_settings):
+        pytest.importorskip("pathfinding")
+        import random
+        rnd = random.Random(7)
+
+        for allow_diagonal in (True, False):
+            reset_game_settings.pathfinding.engine = "native"
+            native = _PathGrid(cols=15, rows=15)
+            reset_game_settings.pathfinding.engine = "pathfinding"
+            library = _PathGrid(cols=15, rows=15)
+
+            for _ in range(40):
+                position = coord(rnd.randint(2, 14), rnd.randint(2, 14))
+                native.block(position)
+                library.block(position)
+
+            def cost(path):
+                total = 0.0
+                for a, b in zip(path, path[1:]):
+                    step = 1.0 if a.col == b.col or a.row == b.row else 2 ** 0.5
+                    total += step * native._grid[b.row - 1][b.col - 1]
+                return total
+
+            expected = library.find_path(coord(1, 1), coord(15, 15), allow_diagonal)
+            actual = native.find_path(coord(1, 1), coord(15, 15), allow_diagonal)
+
+            assert (expected is None) == (actual is None)
+            if expected and actual:
+                assert cost(actual) == pytest.approx(cost(expected))
+
+    def test_missing_pathfinding_package_falls_back_to_native(self, reset_game_settings):
+        reset_game_settings.pathfinding.engine = "pathfinding"
+        with patch('pyke_pyxel._path_grid._HAS_PATHFINDING', False):
+            grid = _PathGrid(cols=5, rows=5)
+
+        assert grid._engine == "native"
+        assert grid.find_path(coord(1, 1), coord(5, 5)) is not None
+
+
+class TestPathGridCache:
+    """Tests for the revision-keyed path cache."""
+
+    def test_revision_bumped_by_changes_only(self, reset_game_settings):
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _PathGrid(cols=10, rows=10)
+        revision = grid._revision
+
+        grid.open(coord(5, 5)) # Already available
+        assert grid._revision == revision
+
+        grid.block(coord(5, 5))
+        assert grid._revision > revision
+
+    def test_repeated_path_is_cached(self):
+        grid = _PathGrid(cols=10, rows=10)
+        grid.find_path(coord(1, 1), coord(10, 10))
+        grid.find_path(coord(1, 1), coord(10, 10))
+
+        assert grid._path_cache_misses == 1
+        assert grid._path_cache_hits == 1
+
+    def test_cached_path_is_a_fresh_copy(self):
+        grid = _PathGrid(cols=10, rows=10)
+        first = grid.find_path(coord(1, 1), coord(10, 10))
+        assert first is not None
+        first.pop(0)
+        first[0].move_by(3, 3)
+
+        second = grid.find_path(coord(1, 1), coord(10, 10))
+
+        assert second is not None
+        assert second[0].is_same_grid_location(coord(1, 1))
+        assert len(second) == len(first) + 1
+
+    def test_change_invalidates_cached_path(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _PathGrid(cols=5, rows=5)
+        grid.find_path(coord(1, 1), coord(3, 1))
+
+        grid.block(coord(2, 1))
+        path = grid.find_path(coord(1, 1), coord(3, 1))
+
+        assert grid._path_cache_misses == 2
+        assert path is not None
+        assert not any(p.is_same_grid_location(coord(2, 1)) for p in path)
+
+    def test_cache_is_bounded(self, reset_game_settings):
+        reset_game_settings.pathfinding.cache_size = 3
+        grid = _PathGrid(cols=10, rows=10)
+        for col in range(1, 8):
+            grid.find_path(coord(1, 1), coord(col, 10))
+
+        assert len(grid._path_cache) == 3
+
+    def test_cache_disabled(self, reset_game_settings):
+        reset_game_settings.pathfinding.cache_size = 0
+        grid = _PathGrid(cols=10, rows=10)
+        grid.find_path(coord(1, 1), coord(10, 10))
+        grid.find_path(coord(1, 1), coord(10, 10))
+
+        assert grid._path_cache_hits == 0
+        assert len(grid._path_cache) == 0
+
+
+class TestPathGridRequests:
+    """Tests for queued, time-sliced path requests."""
+
+    def _walled_grid(self) -> _PathGrid:
+        grid = _PathGrid(cols=20, rows=20)
+        for r in range(1, 20):
+            grid.block(coord(10, r))
+        return grid
+
+    def test_request_is_solved_over_several_updates(self, reset_game_settings):
+        reset_game_settings.pathfinding.frame_budget_ms = 0
+        grid = self._walled_grid()
+        results = []
+        request = grid.request_path(coord(1, 1), coord(20, 1), None, results.append)
+
+        updates = 0
+        while not request.is_done:
+            grid._update()
+            updates += 1
+            assert updates < 100
+
+        assert updates > 1
+        assert len(results) == 1
+        expected = grid.find_path(coord(1, 1), coord(20, 1))
+        assert expected is not None
+        assert [(p.col, p.row) for p in results[0]] == [(p.col, p.row) for p in expected]
+
+    def test_solved_request_is_cached(self, reset_game_settings):
+        grid = self._walled_grid()
+        request = grid.request_path(coord(1, 1), coord(20, 1), None, lambda path: None)
+        grid._update()
+        assert request.is_done
+
+        grid.find_path(coord(1, 1), coord(20, 1))
+        assert grid._path_cache_hits == 1
+
+    def test_cached_request_completes_on_next_update(self, reset_game_settings):
+        reset_game_settings.pathfinding.frame_budget_ms = 0
+        grid = self._walled_grid()
+        grid.find_path(coord(1, 1), coord(20, 1))
+
+        results = []
+        grid.request_path(coord(1, 1), coord(20, 1), None, results.append)
+        grid._update()
+
+        assert len(results) == 1
+        assert results[0] is not None
+
+    def test_cancelled_request_is_not_called_back(self, reset_game_settings):
+        grid = self._walled_grid()
+        results = []
+        request = grid.request_path(coord(1, 1), coord(20, 1), None, results.append)
+        request.cancel()
+        grid._update()
+
+        assert results == []
+        assert not request.is_done
+        assert len(grid._requests) == 0
+
+    def test_search_restarts_when_grid_changes(self, reset_game_settings):
+        reset_game_settings.pathfinding.frame_budget_ms = 0
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = self._walled_grid()
+        request = grid.request_path(coord(1, 1), coord(20, 1), None, lambda path: None)
+        grid._update()
+        assert not request.is_done
+
+        grid.block(coord(10, 20))
+        while grid._requests:
+            grid._update()
+
+        assert request.is_done
+        assert request.path is None
+
+    def test_request_finishes_when_grid_changes_every_update(self, reset_game_settings):
+        reset_game_settings.pathfinding.frame_budget_ms = 0
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = self._walled_grid()
+        request = grid.request_path(coord(1, 1), coord(20, 1), None, lambda path: None)
+
+        updates = 0
+        while not request.is_done:
+            grid._update()
+            updates += 1
+            assert updates <= _MAX_RESTARTS + 1
+            # Away from the route, but enough to restart a search
+            grid.block(coord(1 + updates % 5, 15))
+
+        assert request.path is not None
+        assert request.path[-1].col == 20
+
+    def test_searches_between_updates_do_not_restart_request(self, reset_game_settings):
+        reset_game_settings.pathfinding.frame_budget_ms = 0
+        grid = self._walled_grid()
+        alone = grid.request_path(coord(1, 1), coord(20, 1), None, lambda path: None)
+        updates_alone = 0
+        while not alone.is_done:
+            grid._update_requests()
+            updates_alone += 1
+
+        grid = self._walled_grid()
+        request = grid.request_path(coord(1, 1), coord(20, 1), None, lambda path: None)
+        updates = 0
+        while not request.is_done:
+            grid._update_requests()
+            updates += 1
+            assert updates <= updates_alone
+            # A different, uncached, search every frame
+            assert grid.find_path(coord(1, 1 + updates % 19), coord(9, 20 - updates % 19)) is not None
+
+        assert updates == updates_alone
+        assert request.path is not None
+        assert request.path[-1].col == 20
+
+    def test_unreachable_request(self, reset_game_settings):
+        grid = _PathGrid(cols=10, rows=10)
+        for r in range(1, 11):
+            grid.block(coord(5, r))
+        results = []
+        grid.request_path(coord(1, 1), coord(10, 10), None, results.append)
+        while grid._requests:
+            grid._update()
+
+        assert results == [None]
+
+
+class TestPathGridAsync:
+    """Tests for background path searches."""
+
+    def _wait(self, grid: _PathGrid, request):
+        for _ in range(1000):
+            grid._update()
+            if request.is_done:
+                return
+            time.sleep(0.001)
+
+    def test_result_is_delivered_on_update(self):
+        grid = _PathGrid(cols=20, rows=20)
+        results = []
+        request = grid.find_path_async(coord(1, 1), coord(20, 20), None, results.append)
+        assert results == []
+
+        self._wait(grid, request)
+
+        assert request.is_done
+        assert len(results) == 1
+        assert results[0][-1].is_same_grid_location(coord(20, 20))
+        assert len(grid._async_requests) == 0
+
+    def test_result_is_cached(self):
+        grid = _PathGrid(cols=20, rows=20)
+        request = grid.find_path_async(coord(1, 1), coord(20, 20), None, None)
+        self._wait(grid, request)
+
+        grid.find_path(coord(1, 1), coord(20, 20))
+        assert grid._path_cache_hits == 1
+
+    def test_stale_result_is_dropped(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _PathGrid(cols=10, rows=10)
+        request = grid.find_path_async(coord(1, 1), coord(10, 1), None, None)
+        grid.block(coord(5, 1))
+
+        self._wait(grid, request)
+
+        assert request.path is not None
+        assert not any(p.is_same_grid_location(coord(5, 1)) for p in request.path)
+
+    def test_cancelled_request_is_not_delivered(self):
+        grid = _PathGrid(cols=10, rows=10)
+        results = []
+        request = grid.find_path_async(coord(1, 1), coord(10, 10), None, results.append)
+        request.cancel()
+        time.sleep(0.01)
+        grid._update()
+
+        assert results == []
+        assert len(grid._async_requests) == 0
+
+    def test_path_ready_signal(self):
+        grid = _PathGrid(cols=10, rows=10)
+        received = []
+        def on_ready(sender, value):
+            received.append((sender, value))
+
+        Signals.connect(Signals.MAP.PATH_READY, on_ready)
+        try:
+            request = grid.find_path_async(coord(1, 1), coord(10, 10), None, None)
+            self._wait(grid, request)
+        finally:
+            Signals.disconnect(Signals.MAP.PATH_READY, on_ready)
+
+        assert len(received) == 1
+        assert received[0][0] is request
+        assert received[0][1] is request.path
@@ -0,0 +1,177 @@
+import random
+
+import pytest
+
+from pyke_pyxel._path_grid import _PathGrid, PATH_STATUS
+from pyke_pyxel._types import coord, GameSettings
+
+
+def _hierarchical_grid(settings: GameSettings, cols: int, rows: int, cluster_size: int = 5) -> _PathGrid:
+    settings.pathfinding.engine = "hierarchical"
+    settings.pathfinding.cluster_size = cluster_size
+    settings.pathfinding.cache_size = 0
+    return _PathGrid(cols, rows)
+
+
+def _assert_valid_path(grid: _PathGrid, path: list[coord], allow_diagonal: bool):
+    for a, b in zip(path, path[1:]):
+        d_c = abs(a.col - b.col)
+        d_r = abs(a.row - b.row)
+        assert max(d_c, d_r) == 1
+        if not allow_diagonal:
+            assert d_c + d_r == 1
+        assert grid._grid[b.row - 1][b.col - 1] != PATH_STATUS.BLOCKED
+
+
+class TestPathHierarchyCreation:
+    """Tests for building the cluster abstraction."""
+
+    def test_hierarchy_only_created_for_hierarchical_engine(self, reset_game_settings):
+        assert _PathGrid(cols=10, rows=10)._hierarchy is None
+        assert _hierarchical_grid(reset_game_settings, 10, 10)._hierarchy is not None
+
+    def test_cluster_count(self, reset_game_settings):
+        grid = _hierarchical_grid(reset_game_settings, 12, 12, cluster_size=5)
+        hierarchy = grid._hierarchy
+        assert hierarchy is not None
+
+        # 12 / 5 rounded up
+        assert hierarchy._clusters_x == 3
+        assert hierarchy._clusters_y == 3
+
+    def test_open_border_has_wide_entrance(self, reset_game_settings):
+        grid = _hierarchical_grid(reset_game_settings, 20, 20, cluster_size=10)
+        hierarchy = grid._hierarchy
+        assert hierarchy is not None
+        hierarchy._rebuild()
+
+        # A fully open 10-tile border gets a transition at each end
+        assert len(hierarchy._borders[(0, 1)]) == 2
+
+    def test_blocked_border_has_no_entrance(self, reset_game_settings):
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _hierarchical_grid(reset_game_settings, 20, 20, cluster_size=10)
+        for r in range(1, 11):
+            grid.block(coord(10, r))
+        hierarchy = grid._hierarchy
+        assert hierarchy is not None
+        hierarchy._rebuild()
+
+        assert hierarchy._borders[(0, 1)] == []
+
+
+class TestPathHierarchyUpdates:
+    """Tests for local updates of the abstraction."""
+
+    def test_change_only_dirties_its_cluster(self, reset_game_settings):
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _hierarchical_grid(reset_game_settings, 20, 20, cluster_size=5)
+        hierarchy = grid._hierarchy
+        assert hierarchy is not None
+        hierarchy._rebuild()
+
+        grid.block(coord(12, 12))
+
+        assert hierarchy._dirty == {hierarchy._cluster_at(11, 11)}
+
+    def test_path_avoids_newly_blocked_location(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = False
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _hierarchical_grid(reset_game_settings, 20, 20, cluster_size=5)
+        assert grid.find_path(coord(1, 3), coord(20, 3)) is not None
+
+        for r in range(1, 20):
+            grid.block(coord(10, r))
+        path = grid.find_path(coord(1, 3), coord(20, 3))
+
+        assert path is not None
+        assert any(p.is_same_grid_location(coord(10, 20)) for p in path)
+        _assert_valid_path(grid, path, allow_diagonal=False)
+
+
+class TestPathHierarchyFindPath:
+    """Tests for hierarchical path searches."""
+
+    def test_same_location(self, reset_game_settings):
+        grid = _hierarchical_grid(reset_game_settings, 20, 20)
+        path = grid.find_path(coord(3, 3), coord(3, 3))
+
+        assert path is not None
+        assert len(path) == 1
+
+    def test_within_one_cluster(self, reset_game_settings):
+        grid = _hierarchical_grid(reset_game_settings, 20, 20)
+        path = grid.find_path(coord(1, 1), coord(3, 4))
+
+        assert path is not None
+        assert path[0].is_same_grid_location(coord(1, 1))
+        assert path[-1].is_same_grid_location(coord(3, 4))
+
+    @pytest.mark.parametrize("allow_diagonal", [True, False])
+    def test_matches_reachability_of_full_search(self, reset_game_settings, allow_diagonal):
+        reset_game_settings.pathfinding.allow_diagonal = allow_diagonal
+        rnd = random.Random(3)
+
+        for _ in range(5):
+            reset_game_settings.pathfinding.engine = "native"
+            native = _PathGrid(30, 30)
+            hierarchical = _hierarchical_grid(reset_game_settings, 30, 30, cluster_size=6)
+
+            for _ in range(200):
+                position = coord(rnd.randint(1, 30), rnd.randint(1, 30))
+                native.block(position)
+                hierarchical.block(position)
+
+            for _ in range(10):
+                frm = coord(rnd.randint(1, 30), rnd.randint(1, 30))
+                to = coord(rnd.randint(1, 30), rnd.randint(1, 30))
+                if native._grid[frm.row - 1][frm.col - 1] == PATH_STATUS.BLOCKED:
+                    continue
+
+                expected = native.find_path(frm, to)
+                hierarchy = hierarchical._hierarchy
+                assert hierarchy is not None
+                actual = hierarchical._to_coords(
+                    hierarchy.find_path(hierarchical._index(frm), hierarchical._index(to)), frm, to)
+
+                assert (expected is None) == (actual is None)
+                if actual:
+                    assert actual[0].is_same_grid_location(frm)
+                    assert actual[-1].is_same_grid_location(to)
+                    _assert_valid_path(hierarchical, actual, allow_diagonal)
+
+    def test_diagonal_step_between_blocked_cells_crosses_border(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = True
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _hierarchical_grid(reset_game_settings, 10, 10, cluster_size=5)
+        # The only way from the left to the right clusters is a diagonal step from (5, 3) to (6, 4)
+        for r in range(1, 11):
+            if r != 3:
+                grid.block(coord(5, r))
+            if r != 4:
+                grid.block(coord(6, r))
+        hierarchy = grid._hierarchy
+        assert hierarchy is not None
+
+        path = hierarchy.find_path(grid._index(coord(1, 1)), grid._index(coord(10, 10)))
+
+        assert path is not None
+        assert grid._index(coord(5, 3)) in path
+        assert grid._index(coord(6, 4)) in path
+
+    def test_diagonal_step_across_cluster_corner(self, reset_game_settings):
+        reset_game_settings.pathfinding.allow_diagonal = True
+        reset_game_settings.pathfinding.reduce_hugging = False
+        grid = _hierarchical_grid(reset_game_settings, 10, 10, cluster_size=5)
+        # Wall off the top left cluster except for its bottom right corner
+        for i in range(1, 6):
+            grid.block(coord(6, i))
+            grid.block(coord(i, 6))
+        hierarchy = grid._hierarchy
+        assert hierarchy is not None
+
+        path = hierarchy.find_path(grid._index(coord(1, 1)), grid._index(coord(10, 10)))
+
+        assert path is not None
+        assert grid._index(coord(5, 5)) in path
+        assert grid._index(coord(6, 6)) in path
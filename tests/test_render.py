@@ -0,0 +1,228 @@
+import pytest
+
+from pyke_pyxel.render import RenderLayer, LAYER, _DEFAULT_LAYERS, _draw_bounds, _in_view
+from pyke_pyxel.sprite._sprite import Sprite
+from pyke_pyxel._types import coord
+
+
+class _Sprite:
+    def __init__(self, sprite_id: int):
+        self._id = sprite_id
+
+
+class TestRenderLayer:
+    """Tests for the drawing order of the sprites of a RenderLayer."""
+
+    def test_default_layers_in_drawing_order(self):
+        names = [ name for name, _, _ in sorted(_DEFAULT_LAYERS, key=lambda l: l[1]) ]
+        assert names == [LAYER.BACKGROUND, LAYER.STATIC, LAYER.ACTORS, LAYER.PROJECTILES, LAYER.OVERLAY]
+
+    def test_insert_orders_by_z_then_order_added(self):
+        layer = RenderLayer("actors", 200)
+        a, b, c, d = _Sprite(1), _Sprite(2), _Sprite(3), _Sprite(4)
+        layer._insert(a, (0, 1))
+        layer._insert(b, (5, 2))
+        layer._insert(c, (0, 3))
+        layer._insert(d, (-1, 4))
+
+        assert layer.sprites == [d, a, c, b]
+        assert len(layer) == 4
+
+    def test_remove(self):
+        layer = RenderLayer("actors", 200)
+        a, b, c = _Sprite(1), _Sprite(2), _Sprite(3)
+        layer._insert(a, (0, 1))
+        layer._insert(b, (0, 2))
+        layer._insert(c, (0, 3))
+
+        layer._remove(b, (0, 2))
+        assert layer.sprites == [a, c]
+
+        layer._remove(b, (0, 2)) # Already removed
+        assert layer.sprites == [a, c]
+
+    def test_remove_ids_keeps_order(self):
+        layer = RenderLayer("actors", 200)
+        sprites = [ _Sprite(i) for i in range(1, 8) ]
+        for i, s in enumerate(sprites):
+            layer._insert(s, (i % 2, i))
+
+        layer._remove_ids({ 2, 3, 6 })
+
+        assert [ s._id for s in layer.sprites ] == [1, 5, 7, 4]
+        assert layer._keys == sorted(layer._keys)
+
+    def test_sprites_is_a_copy(self):
+        layer = RenderLayer("actors", 200)
+        layer._insert(_Sprite(1), (0, 1))
+
+        layer.sprites.clear()
+        assert len(layer) == 1
+
+    def test_toggles_default_on(self):
+        layer = RenderLayer("overlay", 400)
+
+        assert layer.visible
+        assert layer.updates
+        assert layer.z == 400
+
+    def test_only_the_bottom_default_layers_are_static(self):
+        static = { name: is_static for name, _, is_static in _DEFAULT_LAYERS }
+
+        assert static[LAYER.BACKGROUND] and static[LAYER.STATIC]
+        assert not (static[LAYER.ACTORS] or static[LAYER.PROJECTILES] or static[LAYER.OVERLAY])
+        assert not RenderLayer("custom", 50).static
+
+
+def _positioned(x: int, y: int) -> Sprite:
+    sprite = Sprite("s", coord(1, 1))
+    sprite.set_position(coord.with_xy(x, y))
+    return sprite
+
+
+_pyxel_ready = False
+
+def _game(settings, monkeypatch):
+    """A Game, pyxel can only be initialised once so the Games after the first share it"""
+    from pathlib import Path
+    import pyxel
+    from pyke_pyxel.game import Game
+
+    global _pyxel_ready
+    if _pyxel_ready:
+        monkeypatch.setattr(pyxel, "init", lambda *args, **kwargs: None)
+        monkeypatch.setattr(pyxel, "load", lambda *args, **kwargs: None)
+    _pyxel_ready = True
+
+    resources = Path(__file__).parent.parent / "games" / "simple" / "assets" / "resources.pyxres"
+    return Game(settings, "test", str(resources))
+
+
+class TestCulling:
+    """Tests for the bounds used to cull sprites outside of the view."""
+
+    VIEW = (0, 0, 160, 160)
+
+    def test_bounds_of_plain_sprite(self, reset_game_settings):
+        assert _draw_bounds(_positioned(10, 20)) == (10, 20, 8, 8)
+
+    def test_bounds_scale_around_center(self, reset_game_settings):
+        sprite = _positioned(10, 20)
+        sprite.set_scale(2)
+
+        assert _draw_bounds(sprite) == (6, 16, 16, 16)
+
+    def test_bounds_of_rotated_sprite(self, reset_game_settings):
+        sprite = _positioned(0, 0)
+        sprite.set_rotation(45)
+
+        x, y, width, height = _draw_bounds(sprite)
+        assert width == pytest.approx(8 * 2 ** 0.5)
+        assert x + width / 2 == pytest.approx(4)
+        assert y + height / 2 == pytest.approx(4)
+
+    def test_in_view(self, reset_game_settings):
+        assert _in_view(_positioned(0, 0), self.VIEW)
+        assert _in_view(_positioned(-7, 152), self.VIEW)
+        assert not _in_view(_positioned(-8, 0), self.VIEW) # Touching the edge
+        assert not _in_view(_positioned(200, 40), self.VIEW)
+
+    def test_in_view_trusts_the_index_for_plain_sprites(self, reset_game_settings):
+        inside = _positioned(0, 0)
+        outside = _positioned(500, 500)
+
+        assert _in_view(outside, self.VIEW, { id(outside) })
+        assert not _in_view(inside, self.VIEW, set())
+
+    def test_in_view_checks_scaled_sprites_missing_from_the_index(self, reset_game_settings):
+        sprite = _positioned(-12, 0)
+        sprite.set_scale(3) # Covers -20 to 4
+
+        assert _in_view(sprite, self.VIEW, set())
+
+    def test_world_within_window_draws_every_sprite(self, reset_game_settings, monkeypatch):
+        game = _game(reset_game_settings, monkeypatch)
+        game.add_sprite(_positioned(0, 0), LAYER.ACTORS)
+        game.add_sprite(_positioned(500, 500), LAYER.ACTORS)
+        monkeypatch.setattr(game._spatial, "query_rect", None)
+
+        game._draw_sprites()
+        assert game.culled_sprites == 0
+
+    def test_few_sprites_are_culled_without_the_index(self, reset_game_settings, monkeypatch):
+        reset_game_settings.size.world = 800
+        game = _game(reset_game_settings, monkeypatch)
+        game.add_sprite(_positioned(0, 0), LAYER.ACTORS)
+        game.add_sprite(_positioned(500, 500), LAYER.ACTORS)
+        queries = []
+        monkeypatch.setattr(game._spatial, "query_rect", lambda *rect: queries.append(rect) or [])
+
+        game._draw_sprites()
+        assert game.culled_sprites == 1
+        assert queries == []
+
+    def test_many_sprites_are_culled_with_the_index(self, reset_game_settings, monkeypatch):
+        reset_game_settings.size.world = 800
+        game = _game(reset_game_settings, monkeypatch)
+        game.add_sprite(_positioned(0, 0), LAYER.ACTORS)
+        for i in range(500):
+            game.add_sprite(_positioned(400 + i % 40, 400), LAYER.ACTORS)
+
+        game._draw_sprites()
+        assert game.culled_sprites == 500
+
+
+class TestStaticBaking:
+    """Tests for the sprites of the static layers baked into one image by the Game."""
+
+    def test_removing_animating_static_sprite_rebakes(self, reset_game_settings, monkeypatch):
+        from pyke_pyxel.sprite._anim import Animation
+
+        game = _game(reset_game_settings, monkeypatch)
+
+        still = Sprite("still", coord(1, 1))
+        moving = Sprite("moving", coord(1, 1))
+        moving.add_animation("walk", Animation(coord(1, 2), frames=2))
+        moving.activate_animation("walk")
+        still.set_position(coord(2, 2))
+        moving.set_position(coord(4, 4))
+        game.add_sprite(still, LAYER.STATIC)
+        game.add_sprite(moving, LAYER.STATIC)
+
+        game._bake_static()
+        assert game._static_live == [moving]
+        assert not game._static_dirty
+
+        game.remove_sprite(moving)
+        assert game._static_dirty
+        game._update()
+        game._bake_static()
+        assert game._static_live == []
+
+
+class TestSpriteRemoval:
+    """Tests for sprites removed and added back to the Game within one update."""
+
+    def test_remove_then_add_in_one_update(self, reset_game_settings, monkeypatch):
+        game = _game(reset_game_settings, monkeypatch)
+        sprite = _positioned(0, 0)
+        other = _positioned(4, 4)
+        game.add_sprite(sprite, LAYER.ACTORS)
+        game.add_sprite(other, LAYER.ACTORS)
+        game.collisions.add(sprite, layer=2, mask=4)
+        game.collisions.add(other, layer=4, mask=2)
+
+        game.remove_sprite(sprite)
+        game.add_sprite(sprite, LAYER.OVERLAY)
+        game._update()
+
+        assert game._sprite_at(sprite._id) is sprite
+        assert game.collisions.is_colliding(sprite, other)
+        assert sprite in game.layer(LAYER.OVERLAY).sprites # type: ignore
+        assert sprite not in game.layer(LAYER.ACTORS).sprites # type: ignore
+
+        # Compacting the removals does not bring the collision layer and mask back later
+        game.remove_sprite(sprite)
+        game._update()
+        game.add_sprite(sprite)
+        assert sprite not in game.collisions
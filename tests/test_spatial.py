@@ -0,0 +1,178 @@
+import pytest
+import math
+import random
+
+from pyke_pyxel.spatial import SpatialIndex
+from pyke_pyxel.sprite._sprite import Sprite
+from pyke_pyxel._types import coord
+
+
+def _sprite(name: str, x: int, y: int, cols: int = 1, rows: int = 1) -> Sprite:
+    sprite = Sprite(name, coord(1, 1), cols, rows)
+    sprite.set_position(coord.with_xy(x, y))
+    return sprite
+
+
+def _names(items) -> list[str]:
+    return [ i.name for i in items ]
+
+
+class TestSpatialIndexFiling:
+    """Tests for adding, moving and removing items."""
+
+    def test_insert_and_remove(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = _sprite("a", 10, 10)
+
+        index.insert(sprite)
+        assert sprite in index
+        assert len(index) == 1
+
+        index.remove(sprite)
+        assert sprite not in index
+        assert len(index) == 0
+        assert index.query_rect(0, 0, 100, 100) == []
+
+    def test_insert_twice_is_noop(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = _sprite("a", 10, 10)
+
+        index.insert(sprite)
+        index.insert(sprite)
+        assert len(index) == 1
+        assert _names(index.query_rect(0, 0, 100, 100)) == ["a"]
+
+    def test_item_without_position_is_filed_when_set(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = Sprite("a", coord(1, 1))
+
+        index.insert(sprite)
+        assert index.query_rect(0, 0, 100, 100) == []
+
+        sprite.set_position(coord.with_xy(40, 40))
+        assert _names(index.query_rect(40, 40, 1, 1)) == ["a"]
+
+    def test_set_position_refiles(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = _sprite("a", 0, 0)
+        index.insert(sprite)
+
+        sprite.set_position(coord.with_xy(80, 80))
+        assert index.query_rect(0, 0, 8, 8) == []
+        assert _names(index.query_rect(80, 80, 8, 8)) == ["a"]
+
+    def test_move_by_refiles(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = _sprite("a", 0, 0)
+        index.insert(sprite)
+
+        sprite.position.move_by(50, 30)
+        assert index.query_rect(0, 0, 8, 8) == []
+        assert _names(index.query_rect(50, 30, 8, 8)) == ["a"]
+
+    def test_replaced_position_is_no_longer_watched(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = _sprite("a", 0, 0)
+        index.insert(sprite)
+
+        old = sprite.position
+        sprite.set_position(coord.with_xy(80, 80))
+        old.move_by(8, 8)
+
+        assert old._watchers is None
+        assert _names(index.query_rect(80, 80, 8, 8)) == ["a"]
+
+    def test_shared_position_moves_every_item(self, reset_game_settings):
+        index = SpatialIndex()
+        a = _sprite("a", 0, 0)
+        b = Sprite("b", coord(1, 1))
+        b.set_position(a.position)
+        index.insert(a)
+        index.insert(b)
+
+        a.position.move_by(40, 0)
+        assert sorted(_names(index.query_rect(40, 0, 8, 8))) == ["a", "b"]
+
+    def test_clear(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = _sprite("a", 0, 0)
+        index.insert(sprite)
+
+        index.clear()
+        assert len(index) == 0
+        assert sprite._spatial is None
+        assert sprite.position._watchers is None
+        assert index.nearest(0, 0) == []
+
+
+class TestSpatialIndexQueries:
+    """Tests for query_rect, query_radius and nearest."""
+
+    def test_query_rect_uses_bounding_boxes(self, reset_game_settings):
+        index = SpatialIndex()
+        index.insert(_sprite("big", 0, 0, cols=3, rows=3)) # 24 x 24
+        index.insert(_sprite("small", 40, 40))
+
+        assert _names(index.query_rect(20, 20, 2, 2)) == ["big"]
+        assert index.query_rect(24, 24, 10, 10) == []
+        assert sorted(_names(index.query_rect(0, 0, 48, 48))) == ["big", "small"]
+
+    def test_query_rect_empty_rect(self, reset_game_settings):
+        index = SpatialIndex()
+        index.insert(_sprite("a", 0, 0))
+
+        assert index.query_rect(0, 0, 0, 8) == []
+
+    def test_query_radius_by_center_closest_first(self, reset_game_settings):
+        index = SpatialIndex()
+        index.insert(_sprite("far", 36, 0)) # center (40, 4)
+        index.insert(_sprite("near", 12, 0)) # center (16, 4)
+        index.insert(_sprite("out", 100, 0))
+
+        assert _names(index.query_radius(4, 4, 36)) == ["near", "far"]
+        assert _names(index.query_radius(4, 4, 35)) == ["near"]
+
+    def test_nearest(self, reset_game_settings):
+        index = SpatialIndex()
+        index.insert(_sprite("a", 0, 0))
+        index.insert(_sprite("b", 60, 0))
+        index.insert(_sprite("c", 120, 120))
+
+        assert _names(index.nearest(70, 10)) == ["b"]
+        assert _names(index.nearest(70, 10, k=2)) == ["b", "a"]
+        assert _names(index.nearest(70, 10, k=5)) == ["b", "a", "c"]
+
+    def test_nearest_where_and_max_distance(self, reset_game_settings):
+        index = SpatialIndex()
+        index.insert(_sprite("a", 0, 0))
+        index.insert(_sprite("b", 60, 0))
+
+        assert _names(index.nearest(70, 10, where=lambda s: s.name == "a")) == ["a"]
+        assert index.nearest(0, 100, max_distance=50) == []
+        assert index.nearest(4, 4, k=0) == []
+
+    def test_nearest_matches_linear_scan(self, reset_game_settings):
+        rng = random.Random(7)
+        index = SpatialIndex()
+        sprites = [ _sprite(str(i), rng.randint(0, 300), rng.randint(0, 300)) for i in range(200) ]
+        for s in sprites:
+            index.insert(s)
+
+        for _ in range(20):
+            x = rng.randint(-20, 320)
+            y = rng.randint(-20, 320)
+            distance = lambda s: math.hypot(s.position.x + 4 - x, s.position.y + 4 - y)
+            expected = sorted(distance(s) for s in sprites)[:5]
+            found = [ distance(s) for s in index.nearest(x, y, k=5) ]
+            assert found == pytest.approx(expected)
+
+    def test_queries_follow_moving_sprites(self, reset_game_settings):
+        index = SpatialIndex()
+        sprite = _sprite("a", 0, 0)
+        index.insert(sprite)
+
+        for _ in range(20):
+            sprite.position.move_by(5, 3)
+
+        assert _names(index.nearest(100, 60)) == ["a"]
+        assert _names(index.query_radius(104, 64, 1)) == ["a"]